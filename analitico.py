@@ -0,0 +1,352 @@
+"""
+Estimaciones analiticas (sin simular) de los KPIs principales.
+
+La evaluacion del Equipo Profesional es una cola M/G/c: llegadas de
+Poisson con tasa_llegada, num_profesionales servidores y duracion
+max(0.5, Normal(1.5, 0.5)). Para esa etapa se usa Erlang-C con la
+correccion de Allen-Cunneen:
+
+    Wq ~ Wq(M/M/c) * (ca^2 + cs^2) / 2
+
+con ca^2 = 1 (Poisson) y cs^2 el coeficiente de variacion al cuadrado
+de la duracion. Si los profesionales estan saturados (ocupacion >= 1)
+no hay estado estacionario: la cola crece todo el horizonte, y la
+espera sale de una aproximacion de fluido, (rho - 1) * T / (2 rho),
+el promedio entre los niños que llegan a ser evaluados antes de T.
+Cerca de rho = 1 ninguna de las dos sirve (la corrida empieza vacia y
+la cola no llega a armarse), y se usa una aproximacion de difusion
+(ver espera_transitoria).
+
+Los voluntarios se aproximan mas grueso:
+  - con generalista, todos forman una sola cola M/G/c (cualquiera
+    atiende a cualquiera); sin generalista, una cola por area.
+  - la espera por voluntario no pasa de max_espera_vol (los que
+    esperan mas se van y no cuentan); saturados, se usa otra vez la
+    aproximacion de fluido.
+  - mal matching: un niño queda mal asignado si al llegar estan
+    ocupados todos los voluntarios de su area con expertise suficiente.
+    Se toma la cantidad de ocupados de la M/M/c y se supone que los
+    ocupados son cualquiera (ver prob_mal_match).
+
+Todo es aritmetica: menos de un milisegundo por config. Sirve para ver
+el orden de magnitud al mover parametros y para descartar configs
+obviamente malas antes de simularlas (cribar). validar() compara
+contra el simulador.
+
+Uso:
+    from analitico import estimar
+    estimar(ESCENARIO_BASE)["espera_prof"]
+
+Desde consola:
+    python analitico.py --escenario b
+    python analitico.py --validar --replicas 10
+"""
+
+import argparse
+import math
+import statistics
+
+from simulacion_apoyo_escolar import (
+    ESCENARIO_A,
+    ESCENARIO_B,
+    ESCENARIO_BASE,
+    ESCENARIO_BASE_ESTRICTO,
+    ESCENARIO_C,
+    ESCENARIO_D,
+    EVAL_DESVIO,
+    EVAL_MEDIA,
+    EVAL_MINIMO,
+    INTERV_DESVIO,
+    INTERV_MEDIA,
+    INTERV_MINIMO,
+)
+
+AREAS = ["matematica", "lectura", "grafismo"]
+# KPIs que estima estimar() y que compara validar()
+KPIS = ["espera_prof", "ocup_prof", "espera_vol", "ocup_vol", "mal_matching", "espera_prom"]
+
+
+# -- Duraciones --
+
+def momentos_duracion(media, desvio, minimo):
+    """
+    Primer y segundo momento de max(minimo, X) con X ~ Normal(media, desvio).
+    El primero es el mismo que media_duracion.
+    """
+    normal = statistics.NormalDist()
+    a = (minimo - media) / desvio
+    debajo, densidad = normal.cdf(a), normal.pdf(a)
+    m1 = minimo * debajo + media * (1 - debajo) + desvio * densidad
+    m2 = (minimo ** 2 * debajo + (media ** 2 + desvio ** 2) * (1 - debajo)
+          + desvio * (media + minimo) * densidad)
+    return m1, m2
+
+
+def cv2(m1, m2):
+    """Coeficiente de variacion al cuadrado a partir de los momentos."""
+    return m2 / m1 ** 2 - 1
+
+
+# -- Colas --
+
+def erlang_b(c, carga):
+    """Probabilidad de bloqueo de Erlang B (recurrencia estable)."""
+    b = 1.0
+    for k in range(1, c + 1):
+        b = carga * b / (k + carga * b)
+    return b
+
+
+def erlang_c(c, carga):
+    """Probabilidad de esperar en una M/M/c con carga = tasa * duracion."""
+    if carga >= c:
+        return 1.0
+    b = erlang_b(c, carga)
+    return b / (1 - carga / c * (1 - b))
+
+
+def espera_mgc(tasa, c, media, cs2, ca2=1.0):
+    """
+    Espera media en cola de una G/G/c (Allen-Cunneen; con ca2 = 1 es
+    una M/G/c). Infinita si la cola no es estable.
+    """
+    if c <= 0:
+        return math.inf
+    carga = tasa * media
+    if carga >= c:
+        return math.inf
+    return erlang_c(c, carga) * media / (c - carga) * (ca2 + cs2) / 2
+
+
+def espera_transitoria(tasa, c, media, cs2, ca2, T):
+    """
+    Espera media en [0, T] arrancando vacia, cerca de rho = 1: la cola
+    se comporta como un movimiento browniano reflejado con varianza
+    tasa * (ca2 + cs2) por semana, que a tiempo t mide en promedio
+    sqrt(2 var t / pi). Acota a Allen-Cunneen cuando rho se acerca a 1
+    (la cola no llega a armarse en el horizonte) y al fluido cuando
+    apenas pasa de 1.
+    """
+    varianza = tasa * (ca2 + cs2)
+    return 2 / 3 * math.sqrt(2 * varianza * T / math.pi) * media / c
+
+
+def espera_horizonte(tasa, c, media, cs2, T, ca2=1.0, tope=math.inf):
+    """
+    Espera media de una G/G/c que arranca vacia y corre T semanas, con
+    nadie esperando mas de `tope` (se va). Estable: Allen-Cunneen.
+    Saturada: la espera crece como (rho - 1) * t hasta `tope` (fluido),
+    promediada entre los que llegan a ser atendidos. Cerca de rho = 1
+    manda espera_transitoria.
+    """
+    if c <= 0:
+        return tope
+    rho = tasa * media / c
+    transitoria = espera_transitoria(tasa, c, media, cs2, ca2, T)
+    if rho < 1:
+        return min(espera_mgc(tasa, c, media, cs2, ca2), transitoria, tope)
+    if tope >= (rho - 1) * T / rho:
+        fluido = (rho - 1) * T / (2 * rho)
+    else:
+        llega_al_tope = tope / (rho - 1)
+        fluido = ((rho - 1) * llega_al_tope ** 2 / 2 + tope * (T - llega_al_tope)) / T
+    return min(max(fluido, transitoria), tope)
+
+
+def ocupados(c, carga):
+    """
+    Distribucion de servidores ocupados de una M/M/c: (probabilidades de
+    0..c-1 ocupados, probabilidad de que esten todos ocupados).
+    """
+    if carga >= c:
+        return [0.0] * c, 1.0
+    terminos = [1.0]
+    for k in range(1, c + 1):
+        terminos.append(terminos[-1] * carga / k)
+    todos = terminos[c] / (1 - carga / c)
+    total = sum(terminos[:c]) + todos
+    return [t / total for t in terminos[:c]], todos / total
+
+
+def prob_mal_match(c, carga, aptos):
+    """
+    Probabilidad de que un niño con `aptos` voluntarios aptos (de c) no
+    tenga un match optimo. Si al llegar hay k ocupados (al azar entre
+    los c) le falta uno apto con probabilidad C(k, aptos) / C(c, aptos);
+    si estan todos ocupados espera al primero que se libere, que es apto
+    con probabilidad aptos / c.
+    """
+    libres, todos = ocupados(c, carga)
+    prob = todos * (1 - aptos / c)
+    for k, p in enumerate(libres):
+        ninguno = 1.0
+        for j in range(aptos):
+            ninguno *= max(0, k - j) / (c - j)
+        prob += p * ninguno
+    return prob
+
+
+# -- Estimacion --
+
+def estimar(config):
+    """
+    KPIs aproximados de un config, con las mismas claves (y unidades)
+    que correr_simulacion: espera_prof, ocup_prof, espera_vol, ocup_vol,
+    mal_matching y espera_prom. Agrega rho_prof (ocupacion teorica de
+    los profesionales, puede pasar de 1) y saturado.
+    """
+    T = config["tiempo_simulacion"]
+    tasa = config["tasa_llegada"]
+    c = config["num_profesionales"]
+
+    # Etapa 1: Equipo Profesional
+    eval_m1, eval_m2 = momentos_duracion(EVAL_MEDIA, EVAL_DESVIO, EVAL_MINIMO)
+    eval_cv2 = cv2(eval_m1, eval_m2)
+    # Sin profesionales nadie se evalua: inestable, espera infinita
+    rho = tasa * eval_m1 / c if c > 0 else math.inf
+    saturado = rho >= 1
+    espera_prof = espera_horizonte(tasa, c, eval_m1, eval_cv2, T)
+    if c <= 0:
+        flujo, flujo_cv2 = 0.0, 1.0
+    elif saturado:
+        # Sale lo que dan los profesionales, casi a ritmo fijo: la suma de
+        # c renovaciones tiene la variabilidad de una evaluacion
+        flujo, flujo_cv2 = c / eval_m1, eval_cv2
+    else:
+        flujo, flujo_cv2 = tasa, 1.0
+
+    # Etapa 2: voluntarios. Los niños empiezan a llegar despues de la
+    # primera evaluacion, y lo que esta en curso al cierre no cuenta en
+    # la ocupacion (se suma al terminar cada intervencion).
+    int_m1, int_m2 = momentos_duracion(INTERV_MEDIA, INTERV_DESVIO, INTERV_MINIMO)
+    int_cv2 = cv2(int_m1, int_m2)
+    tope = config.get("max_espera_vol", 8)
+    voluntarios = config["voluntarios_spec"]
+    por_area = {a: [v["expertise"] for v in voluntarios if v["area"] == a] for a in AREAS}
+    n_vol = len(voluntarios)
+    carga_vol = flujo * int_m1
+    en_curso = int_m2 / (2 * int_m1)  # lo que lleva hecho una intervencion en curso
+    efectivo = max(0.0, T - 1 / tasa - eval_m1 - en_curso) / T
+    ocup_vol = min(1.0, carga_vol / n_vol) * efectivo if n_vol else 0.0
+
+    if config["permitir_generalista"]:
+        espera_vol = espera_horizonte(flujo, n_vol, int_m1, int_cv2, T, flujo_cv2, tope)
+        mal = 0.0
+        for a, p_area in zip(AREAS, config["prob_area"]):
+            for d, p_dif in enumerate(config["prob_dificultad"], start=1):
+                aptos = sum(1 for e in por_area[a] if e >= d)
+                mal += p_area * p_dif * (prob_mal_match(n_vol, carga_vol, aptos) if n_vol else 1)
+    else:
+        espera_vol, peso, ocupados_area = 0.0, 0.0, 0.0
+        for a, p_area in zip(AREAS, config["prob_area"]):
+            n_area = len(por_area[a])
+            if n_area:
+                # Separar el flujo por area al azar lo vuelve casi Poisson
+                espera_vol += p_area * espera_horizonte(
+                    flujo * p_area, n_area, int_m1, int_cv2, T, tope=tope)
+                peso += p_area
+                ocupados_area += min(n_area, carga_vol * p_area)
+        espera_vol = espera_vol / peso if peso else 0.0
+        ocup_vol = ocupados_area / n_vol * efectivo if n_vol else 0.0
+        mal = 0.0
+
+    return {
+        "espera_prof": espera_prof,
+        "ocup_prof": min(rho, 1.0) * 100 if c > 0 else 0.0,
+        "espera_vol": espera_vol,
+        "ocup_vol": ocup_vol * 100,
+        "mal_matching": mal * 100,
+        "espera_prom": espera_prof + eval_m1 + espera_vol,
+        "rho_prof": rho,
+        "saturado": saturado,
+    }
+
+
+def cribar(config, espera_max, margen=2.0):
+    """
+    False si la estimacion dice que la config no tiene chance de dejar
+    la espera promedio debajo de espera_max (con `margen` de tolerancia
+    por lo gruesa que es la aproximacion): no vale la pena simularla.
+    """
+    return estimar(config)["espera_prom"] <= espera_max * margen
+
+
+# -- Validacion contra el simulador --
+
+def configs_validacion():
+    """Los escenarios y variantes de cada uno con mas y menos profesionales."""
+    configs = []
+    for esc in [ESCENARIO_BASE, ESCENARIO_A, ESCENARIO_B, ESCENARIO_C,
+                ESCENARIO_D, ESCENARIO_BASE_ESTRICTO]:
+        configs.append(esc)
+        estable = math.floor(esc["tasa_llegada"] * EVAL_MEDIA) + 1
+        for c in sorted({estable, estable + 1, estable + 3} - {esc["num_profesionales"]}):
+            configs.append(dict(esc, nombre=f"{esc['nombre']} / {c} prof",
+                                num_profesionales=c))
+    return configs
+
+
+def validar(configs=None, replicas=10, workers=None, motor="rapido"):
+    """
+    Para cada config: estimacion analitica y media de `replicas`
+    simulaciones de cada KPI. Devuelve una fila por config.
+    """
+    from replicas import correr_replicas
+
+    filas = []
+    for config in configs or configs_validacion():
+        estimado = estimar(config)
+        simulado = correr_replicas(config, replicas, workers=workers, motor=motor)
+        fila = {"nombre": config["nombre"], "rho_prof": estimado["rho_prof"]}
+        for kpi in KPIS:
+            fila[kpi] = (estimado[kpi], simulado[kpi]["media"], simulado[kpi]["semi_ancho"])
+        filas.append(fila)
+    return filas
+
+
+def imprimir_validacion(filas):
+    print(f"\n  {'Config':<34} {'rho':>5} |" + "".join(
+        f" {kpi:>20} |" for kpi in KPIS))
+    print(f"  {'':<34} {'':>5} |" + f" {'analitico / simulado':>20} |" * len(KPIS))
+    print(f"  {'-' * (42 + 23 * len(KPIS))}")
+    for fila in filas:
+        celdas = "".join(f" {a:>8.2f} / {s:>6.2f}±{ic:<3.1f} |"
+                         for a, s, ic in (fila[kpi] for kpi in KPIS))
+        print(f"  {fila['nombre'][:34]:<34} {fila['rho_prof']:>5.2f} |{celdas}")
+
+    print("\n  Error absoluto medio:")
+    for kpi in KPIS:
+        errores = [abs(fila[kpi][0] - fila[kpi][1]) for fila in filas]
+        estables = [abs(fila[kpi][0] - fila[kpi][1]) for fila in filas if fila["rho_prof"] < 0.9]
+        print(f"    {kpi:<13} {statistics.mean(errores):>7.2f} (todas)"
+              + (f" | {statistics.mean(estables):>7.2f} (rho < 0.9)" if estables else ""))
+    print()
+
+
+def main(argv=None):
+    escenarios = {"base": ESCENARIO_BASE, "a": ESCENARIO_A, "b": ESCENARIO_B,
+                  "c": ESCENARIO_C, "d": ESCENARIO_D, "estricto": ESCENARIO_BASE_ESTRICTO}
+    parser = argparse.ArgumentParser(description="KPIs estimados con formulas de colas")
+    parser.add_argument("--escenario", type=str.lower, choices=list(escenarios), default="base")
+    parser.add_argument("--validar", action="store_true",
+                        help="comparar contra el simulador en escenarios y variantes")
+    parser.add_argument("--replicas", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.validar:
+        imprimir_validacion(validar(replicas=args.replicas, workers=args.workers))
+        return
+
+    config = escenarios[args.escenario]
+    e = estimar(config)
+    print(f"\n  ESTIMACION ANALITICA - {config['nombre']}")
+    print(f"  Equipo Profesional: ocupacion {e['ocup_prof']:.1f}% (rho {e['rho_prof']:.2f}"
+          f"{', saturado' if e['saturado'] else ''}), espera {e['espera_prof']:.2f} sem")
+    print(f"  Voluntarios: ocupacion {e['ocup_vol']:.1f}%, espera {e['espera_vol']:.2f} sem, "
+          f"mal matching {e['mal_matching']:.1f}%")
+    print(f"  Espera promedio total: {e['espera_prom']:.2f} sem\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,17 @@ Permite al docente (o cualquiera) ajustar parametros y ver resultados
 de forma visual sin tocar el codigo.
 """
 
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
 import streamlit as st
 import pandas as pd
+from analitico import estimar
+from cache_resultados import CacheResultados, clave_config, version_modelo
+from metamodelo import cargar_metamodelo
+from optimizador import AREAS, CELDAS, optimizar
+from replicas import configs_replicas, medias, resumir_replicas
 from simulacion_apoyo_escolar import (
     correr_simulacion,
     VOLUNTARIOS_BASE,
@@ -15,6 +24,7 @@ from simulacion_apoyo_escolar import (
     ESCENARIO_C,
     ESCENARIO_D,
     ESCENARIO_BASE_ESTRICTO,
+    generar_voluntarios,
 )
 
 
@@ -96,7 +106,7 @@ with st.sidebar:
 
     modo = st.radio(
         "Modo de simulacion",
-        ["Escenarios predefinidos", "Parametros custom"],
+        ["Escenarios predefinidos", "Parametros custom", "Optimizar dotacion"],
         index=0,
     )
 
@@ -107,6 +117,23 @@ with st.sidebar:
              "C - Reforzado", "D - Demanda baja", "Base (Estricto)"],
             default=["Base (Normal)", "A - Deficit", "B - Crecimiento"],
         )
+    elif modo == "Optimizar dotacion":
+        escenario_opt = st.selectbox(
+            "Demanda de", ["Base (Normal)", "A - Deficit", "B - Crecimiento",
+                           "D - Demanda baja", "Base (Estricto)"],
+            help="Se usan la demanda y la politica de matching del escenario",
+        )
+        espera_max = st.number_input(
+            "Espera promedio maxima (sem)", 0.5, 20.0, 2.5, 0.25,
+            help="Incluye la evaluacion (1.5 sem en promedio)",
+        )
+        mal_max = st.slider("Mal matching maximo (%)", 0, 100, 20, 5)
+        sin_atencion_max = st.slider(
+            "Sin atencion maxima (%)", 0, 50, 5, 1,
+            help="Niños que se van sin voluntario (la espera solo cuenta a los atendidos)",
+        )
+        prof_extra = st.slider("Profesionales extra a probar", 0, 3, 1,
+                               help="Ademas del minimo, para ver el canje con voluntarios")
     else:
         st.subheader("Llegada de niños")
         tasa = st.slider("Tasa de llegada (niños/sem)", 1.0, 15.0, 3.0, 0.5)
@@ -139,9 +166,19 @@ with st.sidebar:
         semilla = st.number_input("Semilla aleatoria", value=42, step=1)
 
     st.divider()
+    if modo == "Optimizar dotacion":
+        n_replicas = st.slider(
+            "Replicas maximas por candidato", 5, 40, 20, 5,
+            help="Cada candidato arranca con 5; solo los dudosos reciben mas",
+        )
+    else:
+        n_replicas = st.slider(
+            "Replicas por escenario", 1, 50, 1,
+            help="Con mas de una replica se muestran medias con IC 95%",
+        )
     boton = st.button(
-        "Simular", use_container_width=True, type="primary",
-        icon=":material/play_arrow:",
+        "Optimizar" if modo == "Optimizar dotacion" else "Simular",
+        use_container_width=True, type="primary", icon=":material/play_arrow:",
     )
 
 
@@ -173,14 +210,6 @@ MAPA_ESCENARIOS = {
 
 def construir_config_custom():
     """Arma un config dict con los parametros del sidebar custom."""
-    areas = ["matematica", "lectura", "grafismo"]
-    vols = []
-    for i in range(n_vol):
-        vols.append({
-            "nombre": f"Vol-{i+1:02d}",
-            "expertise": (i % 3) + 1,
-            "area": areas[i % 3],
-        })
     return {
         "nombre": "Custom",
         "tiempo_simulacion": semanas,
@@ -188,30 +217,101 @@ def construir_config_custom():
         "tasa_llegada": tasa,
         "prob_dificultad": [p_leve / 100, p_moderada / 100, p_grave / 100],
         "prob_area": [p_mate / 100, p_lect / 100, p_graf / 100],
-        "voluntarios_spec": vols,
+        "voluntarios_spec": generar_voluntarios(n_vol),
         "num_profesionales": n_prof,
         "permitir_generalista": permitir_gen,
         "max_espera_vol": 8,
     }
 
 
-def mostrar_metricas(r):
-    """Muestra las 4 metric cards principales."""
+def mostrar_estimacion(config):
+    """KPIs aproximados con formulas de colas: se actualizan al mover sliders."""
+    e = estimar(config)
+    with st.container(border=True):
+        st.markdown(f"{icon('bolt', color='#f9ab00')} **Estimacion instantanea** "
+                    "(formulas de colas, sin simular)", unsafe_allow_html=True)
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Espera promedio", f"~{e['espera_prom']:.1f} sem")
+        c2.metric("Espera Eq. Prof.", f"~{e['espera_prof']:.1f} sem")
+        c3.metric("Ocup. Eq. Profesional", f"~{e['ocup_prof']:.0f}%")
+        c4.metric("Mal matching", f"~{e['mal_matching']:.0f}%")
+        if e["saturado"]:
+            st.caption(f"El Equipo Profesional no alcanza (rho = {e['rho_prof']:.2f}): "
+                       "la cola crece toda la corrida.")
+        else:
+            st.caption("La etapa de voluntarios es una aproximacion gruesa; "
+                       "para numeros finos, simular.")
+
+
+@st.cache_resource
+def metamodelo():
+    """Metamodelo entrenado con metamodelo.py (None si no hay archivo)."""
+    return cargar_metamodelo()
+
+
+def mostrar_prediccion(config):
+    """
+    KPIs del metamodelo con su IC. Fuera de la region entrenada no hay
+    prediccion: se avisa y hay que simular con el boton (no se lanza
+    sola una corrida por cada movimiento de un slider).
+    """
+    modelo = metamodelo()
+    if modelo is None:
+        return
+    if not modelo.dentro(config):
+        st.warning("Estos parametros quedan fuera de la region del metamodelo: "
+                   "hace clic en **Simular** para simularlos de verdad.")
+        return
+    p = modelo.predecir(config)
+    with st.container(border=True):
+        st.markdown(f"{icon('model_training', color='#34a853')} **Prediccion del metamodelo** "
+                    "(entrenado con el simulador, IC 95%)", unsafe_allow_html=True)
+        c1, c2, c3, c4 = st.columns(4)
+        for col, kpi, titulo, fmt, unidad in [
+            (c1, "espera_prom", "Espera promedio", "{:.1f}", " sem"),
+            (c2, "espera_p90", "Espera p90", "{:.1f}", " sem"),
+            (c3, "ocup_prof", "Ocup. Eq. Profesional", "{:.0f}", "%"),
+            (c4, "mal_matching", "Mal matching", "{:.0f}", "%"),
+        ]:
+            col.metric(titulo, fmt.format(p[kpi]["media"]) + " ± "
+                       + fmt.format(p[kpi]["semi_ancho"]) + unidad)
+        if not modelo.vigente():
+            st.caption("El modelo de simulacion cambio desde el entrenamiento: "
+                       "volver a correr `python metamodelo.py`.")
+
+
+def mostrar_metricas(r, resumen=None):
+    """
+    Muestra las 4 metric cards principales. Si vienen de replicas
+    (resumen), se agrega el semiancho del IC 95%.
+    """
+    def valor(clave, fmt, unidad):
+        texto = fmt.format(r[clave])
+        if resumen is not None:
+            texto += " ± " + fmt.format(resumen[clave]["semi_ancho"])
+        return texto + unidad
+
     c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Espera promedio", f"{r['espera_prom']:.1f} sem", help="Tiempo medio en cola")
-    c2.metric("Mal matching", f"{r['mal_matching']:.0f}%", help="Asignaciones no optimas")
-    c3.metric("Ocup. Voluntarios", f"{r['ocup_vol']:.0f}%", help="Uso promedio de voluntarios")
-    c4.metric("Ocup. Eq. Profesional", f"{r['ocup_prof']:.0f}%", help="Uso del equipo evaluador")
+    c1.metric("Espera promedio", valor("espera_prom", "{:.1f}", " sem"), help="Tiempo medio en cola")
+    c2.metric("Mal matching", valor("mal_matching", "{:.0f}", "%"), help="Asignaciones no optimas")
+    c3.metric("Ocup. Voluntarios", valor("ocup_vol", "{:.0f}", "%"), help="Uso promedio de voluntarios")
+    c4.metric("Ocup. Eq. Profesional", valor("ocup_prof", "{:.0f}", "%"), help="Uso del equipo evaluador")
 
 
 def mostrar_detalle(r):
     """Tablas y graficos de detalle de un escenario."""
 
     c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Llegaron", r["llegaron"])
-    c2.metric("Atendidos", r["atendidos"])
-    c3.metric("Sin atencion", r["no_atendidos"])
-    c4.metric("En proceso", r["en_proceso"])
+    c1.metric("Llegaron", f"{r['llegaron']:.0f}")
+    c2.metric("Atendidos", f"{r['atendidos']:.0f}")
+    c3.metric("Sin atencion", f"{r['no_atendidos']:.0f}")
+    c4.metric("En proceso", f"{r['en_proceso']:.0f}")
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Espera p50", f"{r['espera_p50']:.1f} sem", help="Mediana de la espera")
+    c2.metric("Espera p90", f"{r['espera_p90']:.1f} sem", help="El 90% espera menos que esto")
+    c3.metric("Espera p99", f"{r['espera_p99']:.1f} sem")
+    c4.metric("Espera maxima", f"{r['espera_max']:.1f} sem")
 
     col_izq, col_der = st.columns(2)
 
@@ -238,7 +338,7 @@ def mostrar_detalle(r):
     vol_df = pd.DataFrame(r["voluntarios"])
     vol_df["etiqueta"] = (
         vol_df["nombre"] + " (E" +
-        vol_df["expertise"].astype(str) + ", " +
+        vol_df["expertise"].astype(int).astype(str) + ", " +
         vol_df["area"] + ")"
     )
     st.bar_chart(vol_df.set_index("etiqueta")["ocupacion"], height=280, color="#1e8e3e")
@@ -277,73 +377,304 @@ def mostrar_diagnostico(r):
         st.markdown(f"- {a}", unsafe_allow_html=True)
 
 
-# -- Ejecucion --
-if boton:
-    resultados = []
+# -- Ejecucion en segundo plano --
+
+@st.cache_resource(max_entries=1)
+def pool_simulacion(version):
+    """
+    Procesos que corren las simulaciones. Se crean una vez por version
+    del modelo: si se edita el codigo, los procesos viejos seguirian
+    corriendo el modelo viejo.
+    """
+    return ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+
+
+@st.cache_resource(max_entries=1)
+def cache_disco(version):
+    """Cache en disco de las corridas de esta version del modelo."""
+    return CacheResultados(version=version)
+
+
+@st.cache_resource
+def memoria_resultados():
+    """Resultados ya armados por escenario, compartidos entre reruns."""
+    return {}
+
+
+MAX_MEMORIA = 200
+
+# Se recalcula en cada rerun, asi un proceso de Streamlit que queda
+# abierto no sirve resultados de un modelo que ya cambio
+version = version_modelo()
+
+
+def lanzar(config, n):
+    """
+    Pone a correr un escenario con n replicas y devuelve su trabajo.
+
+    Primero se fija si ya esta armado en memoria; si no, busca cada
+    corrida en el cache en disco y solo manda al pool las que faltan.
+    Los trabajos en curso quedan en la sesion, asi un rerun (por mover
+    un widget) los retoma en vez de volver a lanzarlos.
+    """
+    clave = clave_config(config, f"{version}-app-{n}")
+    trabajo = {"clave": clave, "config": config, "n": n, "resultado": None}
+
+    memoria = memoria_resultados()
+    if clave in memoria:
+        trabajo["resultado"] = memoria[clave]
+        return trabajo
+
+    en_curso = st.session_state.setdefault("en_curso", {})
+    if clave in en_curso:
+        return en_curso[clave]
+
+    configs = configs_replicas(config, n) if n > 1 else [config]
+    guardados = cache_disco(version).obtener_muchos(configs)
+    trabajo["configs"] = configs
+    trabajo["guardados"] = guardados
+    try:
+        trabajo["futuros"] = enviar(configs, guardados)
+    except BrokenProcessPool:
+        # Un proceso murio en una corrida anterior: pool nuevo y de nuevo
+        pool_simulacion.clear()
+        trabajo["futuros"] = enviar(configs, guardados)
+    en_curso[clave] = trabajo
+    return trabajo
+
+
+def enviar(configs, guardados):
+    """Manda al pool las corridas que no estaban en el cache."""
+    pool = pool_simulacion(version)
+    return [None if g is not None else pool.submit(correr_simulacion, c, True)
+            for c, g in zip(configs, guardados)]
+
+
+def pendientes(trabajo):
+    if trabajo["resultado"] is not None or "error" in trabajo:
+        return []
+    return [f for f in trabajo["futuros"] if f is not None and not f.done()]
+
+
+def completar(trabajo):
+    """
+    Junta las corridas de un trabajo terminado, las guarda y lo resume.
+    Si alguna corrida fallo deja el error en trabajo["error"] y lo saca
+    de la sesion, asi el proximo rerun lo vuelve a lanzar.
+    """
+    try:
+        corridas = [g if f is None else f.result()
+                    for g, f in zip(trabajo["guardados"], trabajo["futuros"])]
+    except Exception as e:
+        if isinstance(e, BrokenProcessPool):
+            pool_simulacion.clear()
+        st.session_state["en_curso"].pop(trabajo["clave"], None)
+        trabajo["error"] = f"{type(e).__name__}: {e}"
+        return
+    nuevos = [i for i, g in enumerate(trabajo["guardados"]) if g is None]
+    if nuevos:
+        cache_disco(version).guardar_muchos(
+            [trabajo["configs"][i] for i in nuevos], [corridas[i] for i in nuevos]
+        )
+
+    if trabajo["n"] > 1:
+        resultado = resumir_replicas(corridas)
+        resultado["nombre"] = trabajo["config"]["nombre"]
+        resultado["replicas"] = trabajo["n"]
+    else:
+        resultado = corridas[0]
+
+    memoria = memoria_resultados()
+    if len(memoria) >= MAX_MEMORIA:
+        memoria.pop(next(iter(memoria)))
+    memoria[trabajo["clave"]] = resultado
+    st.session_state["en_curso"].pop(trabajo["clave"], None)
+    trabajo["resultado"] = resultado
+
+
+def separar(resultado):
+    """(valores para mostrar, resumen con IC o None)."""
+    if "replicas" in resultado:
+        return medias(resultado), resultado
+    return resultado, None
+
+
+def mostrar_comparativa(terminados):
+    """Tabla y grafico comparativo con los escenarios que ya terminaron."""
+    filas = [separar(t["resultado"])[0] for t in terminados]
+    comp_df = pd.DataFrame(filas)[
+        ["nombre", "llegaron", "atendidos", "no_atendidos",
+         "espera_prom", "espera_p90", "espera_max", "mal_matching", "ocup_vol", "ocup_prof"]
+    ]
+    comp_df.columns = [
+        "Escenario", "Llegaron", "Atendidos", "Sin atencion",
+        "Espera prom (sem)", "Espera p90 (sem)", "Espera max (sem)",
+        "Mal matching (%)", "Ocup. Vol (%)", "Ocup. Prof (%)",
+    ]
+    if terminados[0]["n"] > 1:
+        comp_df["± Espera (IC 95%)"] = [
+            t["resultado"]["espera_prom"]["semi_ancho"] for t in terminados
+        ]
+    tabla_ph.dataframe(comp_df.set_index("Escenario").round(2),
+                       use_container_width=True)
+
+    kpi_comp = comp_df.set_index("Escenario")[
+        ["Espera prom (sem)", "Mal matching (%)", "Ocup. Vol (%)", "Ocup. Prof (%)"]
+    ]
+    grafico_ph.bar_chart(kpi_comp, height=350)
+
+
+def correr_optimizacion():
+    """Corre el optimizador con los limites del sidebar, mostrando avance."""
+    base = dict(MAPA_ESCENARIOS[escenario_opt], motor="rapido")
+    with st.status("Buscando la dotacion minima...", expanded=True) as estado:
+        res = optimizar(base, espera_max, mal_max, replicas_max=n_replicas,
+                        profesionales_extra=prof_extra, ejecutor=pool_simulacion(version),
+                        cache=cache_disco(version), al_avanzar=st.write,
+                        sin_atencion_max=sin_atencion_max)
+        estado.update(label=f"Listo: {len(res['evaluados'])} candidatos, "
+                            f"{res['corridas']} corridas", state="complete",
+                      expanded=False)
+    res["objetivo"] = (escenario_opt, espera_max, mal_max, sin_atencion_max)
+    return res
+
+
+def mostrar_optimizacion(res):
+    """Mejor dotacion y frente de Pareto costo / espera / mal matching."""
+    escenario, espera_lim, mal_lim, sin_lim = res["objetivo"]
+    header_con_icono("savings", f"Dotacion minima: {escenario}")
+    st.caption(f"Objetivo: espera promedio <= {espera_lim} sem, mal matching "
+               f"<= {mal_lim}% y sin atencion <= {sin_lim}%. {res['corridas']} corridas (una grilla equivalente "
+               f"tendria {res['grilla']:.1e} candidatos).")
+    mejor = res["mejor"]
+    if mejor is None:
+        st.warning("Ningun candidato cumple el objetivo. Proba con limites mas holgados.")
+    else:
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Costo", f"{mejor['costo']:.1f}")
+        c2.metric("Profesionales", mejor["profesionales"])
+        c3.metric("Espera prom", f"{mejor['espera_prom']:.2f} sem",
+                  help=f"± {mejor['espera_ic']:.2f} (IC 95%, {mejor['replicas']} replicas)")
+        c4.metric("Mal matching", f"{mejor['mal_matching']:.1f}%",
+                  help=f"± {mejor['mal_matching_ic']:.1f} (IC 95%)")
+
+        header_con_icono("groups", f"Voluntarios ({mejor['voluntarios']})", nivel=5)
+        mezcla = pd.DataFrame(0, index=[a.capitalize() for a in AREAS],
+                              columns=["Expertise 1", "Expertise 2", "Expertise 3"])
+        for (area, exp), n in zip(CELDAS, mejor["cantidades"]):
+            mezcla.loc[area.capitalize(), f"Expertise {exp}"] = n
+        st.dataframe(mezcla, use_container_width=True)
+
+    header_con_icono("stacked_line_chart", "Frente de Pareto", nivel=5)
+    frente = pd.DataFrame(res["frente"])[
+        ["costo", "profesionales", "voluntarios", "espera_prom", "mal_matching",
+         "sin_atencion", "cumple", "mezcla"]
+    ]
+    frente.columns = ["Costo", "Profesionales", "Voluntarios", "Espera prom (sem)",
+                      "Mal matching (%)", "Sin atencion (%)", "Cumple", "Mezcla"]
+    st.scatter_chart(frente, x="Costo", y="Espera prom (sem)", color="Cumple",
+                     size="Mal matching (%)", height=320)
+    st.dataframe(frente.round(2), use_container_width=True, hide_index=True)
+
 
+# -- Ejecucion --
+if modo == "Parametros custom":
+    config_custom = construir_config_custom()
+    mostrar_estimacion(config_custom)
+    mostrar_prediccion(config_custom)
+
+if boton and modo == "Optimizar dotacion":
+    st.session_state["optimizacion"] = correr_optimizacion()
+elif boton:
     if modo == "Escenarios predefinidos":
         if not escenarios_sel:
             st.warning("Selecciona al menos un escenario.")
             st.stop()
+        configs = [MAPA_ESCENARIOS[nombre_esc] for nombre_esc in escenarios_sel]
+    else:
+        configs = [construir_config_custom()]
+    st.session_state["ultima_corrida"] = (configs, n_replicas)
 
-        with st.spinner("Corriendo simulacion..."):
-            for nombre_esc in escenarios_sel:
-                config = MAPA_ESCENARIOS[nombre_esc]
-                r = correr_simulacion(config, silencioso=True)
-                resultados.append(r)
+if modo == "Optimizar dotacion":
+    if "optimizacion" in st.session_state:
+        mostrar_optimizacion(st.session_state["optimizacion"])
     else:
-        with st.spinner("Corriendo simulacion..."):
-            config = construir_config_custom()
-            r = correr_simulacion(config, silencioso=True)
-            resultados.append(r)
+        st.info(
+            "Elegi la demanda y los limites en el panel izquierdo y hace clic en "
+            "**Optimizar** para buscar la combinacion mas barata de profesionales "
+            "y voluntarios que los cumple."
+        )
+
+elif "ultima_corrida" in st.session_state:
+    configs, n = st.session_state["ultima_corrida"]
+    trabajos = [lanzar(c, n) for c in configs]
 
-    st.success(f"Simulacion completa — {len(resultados)} escenario(s)")
+    estado = st.empty()
+    progreso = st.progress(0.0)
     st.divider()
 
-    # Tabla comparativa (si hay varios escenarios)
-    if len(resultados) > 1:
+    # Lugares fijos que se van llenando a medida que terminan escenarios
+    if len(trabajos) > 1:
         header_con_icono("compare_arrows", "Comparativa de Escenarios")
-
-        comp_df = pd.DataFrame(resultados)[
-            ["nombre", "llegaron", "atendidos", "no_atendidos",
-             "espera_prom", "espera_max", "mal_matching", "ocup_vol", "ocup_prof"]
-        ]
-        comp_df.columns = [
-            "Escenario", "Llegaron", "Atendidos", "Sin atencion",
-            "Espera prom (sem)", "Espera max (sem)",
-            "Mal matching (%)", "Ocup. Vol (%)", "Ocup. Prof (%)",
-        ]
-        st.dataframe(comp_df.set_index("Escenario"), use_container_width=True)
-
+        tabla_ph = st.empty()
         header_con_icono("monitoring", "KPIs Comparados")
-        kpi_comp = pd.DataFrame({
-            "Escenario": [r["nombre"] for r in resultados],
-            "Espera prom (sem)": [r["espera_prom"] for r in resultados],
-            "Mal matching (%)": [r["mal_matching"] for r in resultados],
-            "Ocup. Vol (%)": [r["ocup_vol"] for r in resultados],
-            "Ocup. Prof (%)": [r["ocup_prof"] for r in resultados],
-        })
-        st.bar_chart(kpi_comp.set_index("Escenario"), height=350)
+        grafico_ph = st.empty()
         st.divider()
-
-    # Detalle por escenario
-    if len(resultados) == 1:
-        r = resultados[0]
-        header_con_icono("analytics", f"Resultados: {r['nombre']}")
-        mostrar_metricas(r)
-        mostrar_detalle(r)
+        lugares = st.tabs([c["nombre"] for c in configs])
+    else:
+        header_con_icono("analytics", f"Resultados: {configs[0]['nombre']}")
+        lugares = [st.container()]
+
+    total = sum(len(t.get("futuros", [])) for t in trabajos) or 1
+    mostrados = set()
+    while True:
+        for i, t in enumerate(trabajos):
+            if i in mostrados:
+                continue
+            if t["resultado"] is None and not pendientes(t):
+                completar(t)
+            if "error" in t:
+                with lugares[i]:
+                    st.error(f"La simulacion de {t['config']['nombre']} fallo: "
+                             f"{t['error']}")
+                mostrados.add(i)
+            elif t["resultado"] is not None:
+                r, resumen = separar(t["resultado"])
+                with lugares[i]:
+                    mostrar_metricas(r, resumen)
+                    mostrar_detalle(r)
+                mostrados.add(i)
+                terminados = [t for t in trabajos if t["resultado"] is not None]
+                if len(trabajos) > 1:
+                    mostrar_comparativa(terminados)
+
+        faltan = [f for t in trabajos for f in pendientes(t)]
+        hechos = total - len(faltan)
+        progreso.progress(min(1.0, hechos / total))
+        if len(mostrados) == len(trabajos):
+            break
+        estado.info(f"Corriendo simulacion... {len(mostrados)}/{len(trabajos)} "
+                    f"escenario(s) listos")
+        if faltan:
+            wait(faltan, return_when=FIRST_COMPLETED)
+
+    progreso.empty()
+    fallados = sum("error" in t for t in trabajos)
+    if fallados:
+        estado.warning(f"{fallados} de {len(trabajos)} escenario(s) fallaron; "
+                       "volver a simular los relanza")
     else:
-        tabs = st.tabs([r["nombre"] for r in resultados])
-        for tab, r in zip(tabs, resultados):
-            with tab:
-                mostrar_metricas(r)
-                mostrar_detalle(r)
+        estado.success(f"Simulacion completa — {len(trabajos)} escenario(s)"
+                       + (f", {n} replicas c/u" if n > 1 else ""))
 
     # Diagnostico
     st.divider()
     header_con_icono("vital_signs", "Diagnostico")
-    for r in resultados:
-        with st.expander(f"**{r['nombre']}**", expanded=len(resultados) == 1):
+    for t in trabajos:
+        if t["resultado"] is None:
+            continue
+        r, _ = separar(t["resultado"])
+        with st.expander(f"**{r['nombre']}**", expanded=len(trabajos) == 1):
             mostrar_diagnostico(r)
 
 else:
@@ -0,0 +1,236 @@
+"""
+Asignacion por lotes: emparejar a todos los niños que esperan con todos
+los voluntarios libres a la vez.
+
+El matching comun (PoolVoluntarios.tomar) es goloso: cada niño, apenas
+lo evaluan, se lleva el mejor voluntario libre para el. Asi un experto
+puede terminar con un caso leve y el grave que llega un rato despues se
+queda con un generalista. Con config["matching"] = "lotes":
+
+  - Los niños evaluados esperan hasta la proxima epoca de matching (cada
+    config["epoca_matching"] semanas, 0.25 por defecto). Cuando se libera
+    un voluntario se empareja en el momento.
+  - En cada epoca se resuelve una asignacion de costo minimo entre los
+    voluntarios libres y los niños que esperan. Costo de cada par:
+    OPTIMO 0.5 por cada nivel de expertise de mas (para no gastar
+    expertos en casos leves), SUBOPTIMO 4 y GENERALISTA 6 (prohibidos con
+    politica estricta), menos lo que cuesta que el niño siga esperando:
+    1.5 + 6 * espera / paciencia. Asi un niño recien evaluado solo acepta
+    un match optimo y despues de config["paciencia"] semanas (1 por
+    defecto) acepta cualquiera. Los pares que no convienen quedan afuera.
+  - La asignacion se resuelve con el metodo hungaro en la version de
+    caminos mas cortos aumentantes (Jonker-Volgenant), con NumPy. Los
+    voluntarios de un mismo (area, expertise) son intercambiables, asi
+    que cada fila es un "lugar" de ese tipo y al final se toma el primero
+    libre de ese tipo, como en el matching comun.
+  - Arranque en caliente: los potenciales (duales) de cada niño quedan de
+    una epoca a la siguiente. Con ellos, la mayoria de las filas tiene su
+    columna mas barata libre y se asigna sin buscar caminos.
+    config["arranque_caliente"] = False lo apaga (para comparar).
+
+config["disciplina"] no aplica aca: el orden entre los que esperan lo
+decide el costo de espera. Una disciplina que no sea "fifo" (la de por
+defecto) da ValueError en vez de ignorarse sin avisar.
+bench/bench_matching.py lo compara con el matching goloso en mal
+matching, espera y tiempo de corrida.
+"""
+
+import numpy as np
+
+from motor_rapido import ABANDONO, SimulacionRapida
+from simulacion_apoyo_escolar import tipo_de_match
+
+AREAS = {"matematica": 0, "lectura": 1, "grafismo": 2}
+COSTO_SUBOPTIMO = 4.0
+COSTO_GENERALISTA = 6.0
+COSTO_EXPERTISE_DE_MAS = 0.5
+GRANDE = 1e9                      # par prohibido o que no conviene
+
+EPOCA = 4                         # tipo de evento: epoca de matching
+
+
+def _aumentar(costo, u, v, col_de_fila, fila_de_col, actual):
+    """
+    Camino mas corto aumentante desde la fila `actual` (Dijkstra sobre
+    costos reducidos, vectorizado sobre las columnas). Actualiza los
+    potenciales y la asignacion; devuelve las filas recorridas.
+    """
+    columnas = costo.shape[1]
+    distancia = np.full(columnas, np.inf)
+    camino = np.full(columnas, -1)
+    vistas = np.zeros(columnas, dtype=bool)
+    filas_vistas = []
+    i, minimo = actual, 0.0
+    while True:
+        filas_vistas.append(i)
+        d = minimo + costo[i] - u[i] - v
+        mejora = ~vistas & (d < distancia)
+        distancia[mejora] = d[mejora]
+        camino[mejora] = i
+        j = int(np.argmin(np.where(vistas, np.inf, distancia)))
+        minimo = distancia[j]
+        vistas[j] = True
+        if fila_de_col[j] == -1:
+            break
+        i = fila_de_col[j]
+
+    # Potenciales: los costos reducidos siguen >= 0 y 0 en lo asignado
+    u[actual] += minimo
+    for f in filas_vistas[1:]:
+        u[f] += minimo - distancia[col_de_fila[f]]
+    v[vistas] -= minimo - distancia[vistas]
+
+    # Invertir el camino
+    while True:
+        i = camino[j]
+        fila_de_col[j] = i
+        col_de_fila[i], j = j, col_de_fila[i]
+        if i == actual:
+            break
+    return len(filas_vistas)
+
+
+def resolver_asignacion(costo, v=None):
+    """
+    Asignacion de costo minimo de una matriz filas x columnas con
+    filas <= columnas: cada fila a una columna distinta.
+
+    Metodo hungaro por caminos mas cortos aumentantes (Jonker-Volgenant).
+    v son potenciales iniciales de las columnas (arranque en caliente):
+    las filas cuya columna mas barata en costo reducido esta libre se
+    asignan de una y solo las demas buscan camino. Para que cualquier v
+    inicial sirva se completa a cuadrada con filas de costo 0, que se
+    asignan al final a las columnas libres de potencial maximo (con v = 0
+    no buscan nunca y queda el algoritmo rectangular comun).
+
+    Devuelve (columna de cada fila, potenciales v, pasos de busqueda).
+    """
+    filas, columnas = costo.shape
+    v = np.zeros(columnas) if v is None else np.array(v, dtype=float)
+    u = np.zeros(columnas)
+    u[:filas] = (costo - v).min(axis=1)
+    col_de_fila = np.full(columnas, -1)
+    fila_de_col = np.full(columnas, -1)
+    costo = np.vstack([costo, np.zeros((columnas - filas, columnas))])
+
+    # Filas con su columna mas barata libre: quedan asignadas sin buscar
+    for i, j in enumerate((costo[:filas] - v).argmin(axis=1)):
+        if fila_de_col[j] == -1:
+            fila_de_col[j] = i
+            col_de_fila[i] = j
+    pasos = 0
+    for actual in np.flatnonzero(col_de_fila[:filas] == -1):
+        pasos += _aumentar(costo, u, v, col_de_fila, fila_de_col, actual)
+
+    # Relleno: a las libres de potencial maximo, el resto buscando
+    u[filas:] = -v.max()
+    libres = np.flatnonzero((fila_de_col == -1) & (v >= v.max()))
+    for i, j in zip(range(filas, columnas), libres):
+        fila_de_col[j] = i
+        col_de_fila[i] = j
+    for actual in range(filas + len(libres), columnas):
+        pasos += _aumentar(costo, u, v, col_de_fila, fila_de_col, actual)
+    return col_de_fila[:filas], v, pasos
+
+
+class SimulacionLotes(SimulacionRapida):
+    """Motor rapido con asignacion por lotes en vez del matching goloso."""
+
+    def __init__(self, config, verboso=False, traza=None):
+        disciplina = config.get("disciplina", "fifo")
+        if disciplina != "fifo":
+            raise ValueError(
+                f"matching='lotes' no usa disciplina={disciplina!r} (el orden lo decide "
+                "el costo de espera): usar disciplina='fifo' o matching='greedy'")
+        super().__init__(config, verboso, traza)
+        self.epoca = config.get("epoca_matching", 0.25)
+        self.paciencia = config.get("paciencia", 1.0)
+        self.arranque_caliente = config.get("arranque_caliente", True)
+        self.esperando = {}           # numero -> Nino evaluado sin voluntario
+        self._duales = {}             # numero -> potencial de su columna en la ultima resolucion
+        self.resoluciones = 0
+        self.pasos = 0
+        self.esperando_max = 0
+
+    def arrancar(self):
+        super().arrancar()
+        self._programar(self.epoca, EPOCA, None)
+
+    def _evento_extra(self, tipo, nino):
+        if tipo != EPOCA:
+            super()._evento_extra(tipo, nino)
+        self._emparejar()
+        self._programar(self.epoca, EPOCA, None)
+
+    def _buscar_voluntario(self, nino):
+        nino.t_fin_eval = self.ahora
+        self.esperando[nino.numero] = nino
+        self._programar(self.max_espera_vol, ABANDONO, nino)
+
+    def _voluntario_libre(self, voluntario):
+        self.pool.devolver(voluntario)
+        self._emparejar()
+
+    def _abandono(self, nino):
+        if self.esperando.pop(nino.numero, None) is not None:
+            self._registrar_abandono(nino)
+
+    def _emparejar(self):
+        """Resuelve la asignacion entre los niños que esperan y los libres."""
+        if not self.esperando or self.pool.cantidad_libres == 0:
+            return
+        ninos = list(self.esperando.values())
+        n = len(ninos)
+        self.esperando_max = max(self.esperando_max, n)
+        area_n = np.array([AREAS[x.area] for x in ninos])
+        dif_n = np.array([x.dificultad for x in ninos])
+        espera = self.ahora - np.array([x.t_fin_eval for x in ninos])
+
+        # Un lugar por voluntario libre de cada tipo (no hacen falta mas que niños)
+        lugares = [clave for clave, libres in self.pool.libres.items()
+                   for _ in range(min(len(libres), n))]
+        area_v = np.array([AREAS[a] for a, _ in lugares])
+        exp_v = np.array([e for _, e in lugares])
+
+        misma_area = area_v[:, None] == area_n[None, :]
+        alcanza = exp_v[:, None] >= dif_n[None, :]
+        costo = np.where(misma_area & alcanza,
+                         COSTO_EXPERTISE_DE_MAS * (exp_v[:, None] - dif_n[None, :]),
+                         np.where(misma_area, COSTO_SUBOPTIMO, COSTO_GENERALISTA))
+        if not self.permitir_generalista:
+            costo[~(misma_area & alcanza)] = GRANDE
+        costo = costo - (1.5 + 6.0 * espera / self.paciencia)[None, :]
+        costo[costo >= 0] = GRANDE
+
+        # Solo los niños con algun par que conviene, y a lo sumo los
+        # `filas` mas baratos de cada lugar (el resto nunca entra al optimo)
+        utiles = np.flatnonzero((costo < GRANDE).any(axis=0))
+        if len(utiles) == 0:
+            return
+        filas = len(lugares)
+        if len(utiles) > filas:
+            mejores = np.argpartition(costo[:, utiles], filas - 1, axis=1)[:, :filas]
+            utiles = utiles[np.unique(mejores)]
+        costo = costo[:, utiles]
+
+        # Una columna "quedar libre" por lugar, con costo 0
+        libre = np.full((filas, filas), GRANDE)
+        np.fill_diagonal(libre, 0.0)
+        costo = np.hstack([costo, libre])
+        numeros = [ninos[j].numero for j in utiles]
+        duales = self._duales if self.arranque_caliente else {}
+        v0 = [duales.get(numero, 0.0) for numero in numeros] + [0.0] * filas
+
+        columna, v, pasos = resolver_asignacion(costo, v0)
+        self.resoluciones += 1
+        self.pasos += pasos
+        self._duales = dict(zip(numeros, v[:len(numeros)]))
+
+        pares = sorted((j, i) for i, j in enumerate(columna)
+                       if j < len(utiles) and costo[i, j] < GRANDE)
+        for j, i in pares:
+            nino = ninos[utiles[j]]
+            del self.esperando[nino.numero]
+            voluntario = self.pool.tomar_de(lugares[i])
+            self._asignar(nino, voluntario,
+                          tipo_de_match(voluntario, nino.dificultad, nino.area))
@@ -0,0 +1,344 @@
+"""
+Barridos de parametros: muchas combinaciones de un escenario, cada una
+con replicas, en paralelo y retomables.
+
+Los puntos se arman sobre un escenario base cambiando claves del config.
+n_vol se traduce a voluntarios genericos con generar_voluntarios (los
+mismos que arma el modo custom del dashboard). Se pueden armar como
+grilla (todas las combinaciones de una lista de valores por clave) o
+como hipercubo latino (n puntos que cubren parejo cada rango).
+
+Cada punto corre sus replicas en un proceso del pool, y apenas termina
+se agrega como fila a un CSV (una fila por punto: parametros, media y
+semiancho del IC de cada KPI y la version del modelo). Si el barrido se
+corta, al volver a correrlo con el mismo archivo se saltean los puntos
+que ya estan. Un CSV con filas de otra version del modelo no se sigue:
+mezclaria resultados de dos modelos distintos.
+Todos los puntos usan las mismas semillas de replica, asi las
+diferencias entre puntos no son ruido (numeros aleatorios comunes).
+
+Uso:
+    from barrido import grilla, correr_barrido
+    puntos = grilla({"num_profesionales": [3, 4, 5], "n_vol": [9, 12, 15]})
+    filas = correr_barrido(puntos, ESCENARIO_BASE, replicas=10, salida="b.csv")
+
+Desde consola:
+    python barrido.py --tasa 2:6:5 --profesionales 3,4,5,6 --voluntarios 6:30:5 \\
+        --generalista si,no --replicas 10 --salida barrido.csv
+    python barrido.py --lhs 200 --tasa 2:8 --profesionales 2:10 --voluntarios 6:40 \\
+        --replicas 10 --salida lhs.csv
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from cache_resultados import clave_config, version_modelo
+from replicas import configs_replicas, resumir_replicas
+from simulacion_apoyo_escolar import (
+    ESCENARIO_A,
+    ESCENARIO_B,
+    ESCENARIO_BASE,
+    ESCENARIO_C,
+    ESCENARIO_D,
+    correr_simulacion,
+    generar_voluntarios,
+)
+
+# KPIs que van a la tabla (media y semiancho del IC de cada uno)
+KPIS = [
+    "llegaron", "atendidos", "no_atendidos", "espera_prom", "espera_p50",
+    "espera_p90", "espera_p99", "espera_max", "espera_prof", "espera_vol",
+    "mal_matching", "ocup_vol", "ocup_prof",
+]
+
+
+# -- Puntos del barrido --
+
+def nombre_punto(punto):
+    return ", ".join(f"{clave}={valor}" for clave, valor in punto.items())
+
+
+def config_punto(base, punto):
+    """Config del escenario base con los valores del punto."""
+    config = dict(base, nombre=nombre_punto(punto))
+    for clave, valor in punto.items():
+        if clave == "n_vol":
+            config["voluntarios_spec"] = generar_voluntarios(valor)
+        else:
+            config[clave] = valor
+    return config
+
+
+def grilla(valores):
+    """{clave: [valores]} -> un punto por cada combinacion."""
+    claves = list(valores)
+    return [dict(zip(claves, combinacion))
+            for combinacion in itertools.product(*(valores[c] for c in claves))]
+
+
+def hipercubo_latino(rangos, n, semilla=0):
+    """
+    n puntos por hipercubo latino: cada rango se parte en n franjas
+    iguales y cada franja se usa exactamente una vez, con las franjas
+    de las distintas claves mezcladas al azar.
+
+    rangos: {clave: (minimo, maximo)} para numeros (si los dos son
+    enteros, el valor sale entero) o {clave: [opciones]} para
+    categorias, por ejemplo {"permitir_generalista": [True, False]}.
+    """
+    rng = random.Random(semilla)
+    columnas = {}
+    for clave, rango in rangos.items():
+        franjas = list(range(n))
+        rng.shuffle(franjas)
+        u = [(k + rng.random()) / n for k in franjas]
+        if isinstance(rango, list):
+            columnas[clave] = [rango[min(int(x * len(rango)), len(rango) - 1)] for x in u]
+        else:
+            minimo, maximo = rango
+            if isinstance(minimo, int) and isinstance(maximo, int):
+                columnas[clave] = [min(maximo, minimo + int(x * (maximo - minimo + 1)))
+                                   for x in u]
+            else:
+                columnas[clave] = [round(minimo + x * (maximo - minimo), 4) for x in u]
+    return [{clave: columnas[clave][i] for clave in rangos} for i in range(n)]
+
+
+# -- Tabla de resultados --
+
+def fila_resultado(punto, clave, replicas, resumen, version):
+    fila = dict(punto, replicas=replicas)
+    for kpi in KPIS:
+        fila[f"{kpi}_media"] = round(resumen[kpi]["media"], 4)
+        fila[f"{kpi}_ic"] = round(resumen[kpi]["semi_ancho"], 4)
+    fila["clave"] = clave
+    fila["version"] = version
+    return fila
+
+
+def _valor_csv(texto):
+    if texto in ("True", "False"):
+        return texto == "True"
+    for tipo in (int, float):
+        try:
+            return tipo(texto)
+        except ValueError:
+            pass
+    return texto
+
+
+def leer_barrido(ruta):
+    """Filas de un CSV de barrido, con los numeros y booleanos convertidos."""
+    with open(ruta, newline="") as f:
+        lector = csv.DictReader(f)
+        filas = []
+        for fila in lector:
+            if None in fila.values():
+                continue  # ultima linea cortada por una interrupcion
+            filas.append({k: v if k in ("clave", "version") else _valor_csv(v)
+                          for k, v in fila.items()})
+    return filas
+
+
+def _agregar_fila(ruta, fila):
+    nuevo = not os.path.exists(ruta) or os.path.getsize(ruta) == 0
+    if not nuevo:
+        with open(ruta, newline="") as f:
+            columnas = next(csv.reader(f))
+        if columnas != list(fila):
+            raise ValueError(
+                f"{ruta} tiene otras columnas que este barrido; usar otro archivo")
+    with open(ruta, "a", newline="") as f:
+        escritor = csv.DictWriter(f, fieldnames=list(fila))
+        if nuevo:
+            escritor.writeheader()
+        escritor.writerow(fila)
+
+
+# -- Ejecucion --
+
+def _correr_punto(configs):
+    return [correr_simulacion(c, silencioso=True) for c in configs]
+
+
+def correr_barrido(puntos, base, replicas=10, workers=None, semilla=None,
+                   salida=None, nivel=0.95, al_terminar=None, filtro=None):
+    """
+    Corre cada punto con `replicas` replicas y devuelve una fila por
+    punto, en el orden de `puntos`.
+
+    filtro(config): si devuelve False el punto no se simula ni aparece
+    en el resultado (por ejemplo analitico.cribar, para saltear
+    configuraciones que las formulas ya dan por perdidas).
+
+    salida: CSV donde se va agregando cada punto apenas termina. Si ya
+    existe, los puntos que estan (mismo punto, escenario base, replicas
+    y semilla) no se vuelven a correr. Si tiene filas de otra version
+    del modelo (o de antes de que se guardara la version) da ValueError
+    sin correr nada: hay que usar otro archivo.
+
+    al_terminar(fila, hechos, total): se llama cada vez que termina un
+    punto (para mostrar avance).
+    """
+    if semilla is not None:
+        base = dict(base, semilla=semilla)
+    version = version_modelo()
+    anteriores = {}
+    if salida and os.path.exists(salida):
+        anteriores = {f["clave"]: f for f in leer_barrido(salida)}
+        otras = {f.get("version") or "sin version" for f in anteriores.values()} - {version}
+        if otras:
+            raise ValueError(
+                f"{salida} tiene filas de otra version del modelo ({', '.join(sorted(otras))}; "
+                f"la actual es {version}); usar otro archivo")
+
+    if filtro is not None:
+        puntos = [p for p in puntos if filtro(config_punto(base, p))]
+
+    claves = []
+    pendientes = []
+    for punto in puntos:
+        config = config_punto(base, punto)
+        clave = clave_config(dict(config, replicas=replicas), version)
+        claves.append(clave)
+        if clave not in anteriores:
+            pendientes.append((punto, clave, configs_replicas(config, replicas)))
+
+    filas = {clave: anteriores[clave] for clave in claves if clave in anteriores}
+    hechos = len(filas)
+
+    def terminar(punto, clave, corridas):
+        nonlocal hechos
+        fila = fila_resultado(punto, clave, replicas, resumir_replicas(corridas, nivel),
+                              version)
+        if salida:
+            _agregar_fila(salida, fila)
+        filas[clave] = fila
+        hechos += 1
+        if al_terminar is not None:
+            al_terminar(fila, hechos, len(puntos))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(pendientes))
+    if workers <= 1:
+        for punto, clave, configs in pendientes:
+            terminar(punto, clave, _correr_punto(configs))
+    else:
+        ejecutor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futuros = {ejecutor.submit(_correr_punto, configs): (punto, clave)
+                       for punto, clave, configs in pendientes}
+            while futuros:
+                listos, _ = wait(futuros, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    punto, clave = futuros.pop(futuro)
+                    terminar(punto, clave, futuro.result())
+        finally:
+            ejecutor.shutdown(wait=False, cancel_futures=True)
+
+    return [filas[clave] for clave in claves]
+
+
+# -- Consola --
+
+def parsear_valores(texto, tipo, como_rango=False):
+    """
+    "2,3,5" -> [2, 3, 5]; "2:6:5" -> 5 valores parejos de 2 a 6;
+    con como_rango=True, "2:6" -> (2, 6) para el hipercubo latino.
+    """
+    if tipo is bool:
+        opciones = {"si": True, "no": False}
+        return [opciones[t.strip().lower()] for t in texto.split(",")]
+    if ":" not in texto:
+        return [tipo(t) for t in texto.split(",")]
+    partes = texto.split(":")
+    if como_rango:
+        return (tipo(partes[0]), tipo(partes[1]))
+    minimo, maximo = float(partes[0]), float(partes[1])
+    n = int(partes[2]) if len(partes) > 2 else 5
+    valores = [minimo + (maximo - minimo) * i / max(n - 1, 1) for i in range(n)]
+    if tipo is int:
+        return sorted({round(v) for v in valores})
+    return [round(v, 4) for v in valores]
+
+
+def main(argv=None):
+    escenarios = {"base": ESCENARIO_BASE, "a": ESCENARIO_A, "b": ESCENARIO_B,
+                  "c": ESCENARIO_C, "d": ESCENARIO_D}
+    parser = argparse.ArgumentParser(description="Barrido de parametros del Centro de Apoyo Escolar")
+    parser.add_argument("--escenario", type=str.lower, choices=list(escenarios), default="base",
+                        help="escenario base (probabilidades, horizonte)")
+    parser.add_argument("--tasa", help="tasa_llegada: '2,3,4', '2:6:5' o con --lhs '2:6'")
+    parser.add_argument("--profesionales", help="num_profesionales")
+    parser.add_argument("--voluntarios", help="cantidad de voluntarios (n_vol)")
+    parser.add_argument("--generalista", help="permitir_generalista: 'si', 'no' o 'si,no'")
+    parser.add_argument("--lhs", type=int, default=None,
+                        help="hipercubo latino de N puntos en vez de grilla")
+    parser.add_argument("--replicas", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--semilla", type=int, default=None, help="semilla maestra de las replicas")
+    parser.add_argument("--tiempo", type=float, default=None, help="semanas a simular")
+    parser.add_argument("--motor", choices=["simpy", "rapido"], default="rapido")
+    parser.add_argument("--muestreo", choices=["estandar", "numpy"], default="estandar")
+    parser.add_argument("--salida", default="barrido.csv")
+    parser.add_argument("--cribar-espera", type=float, default=None, metavar="X",
+                        help="no simular los puntos cuya espera estimada con formulas "
+                             "de colas pasa de 2*X semanas")
+    args = parser.parse_args(argv)
+
+    base = dict(escenarios[args.escenario], motor=args.motor, muestreo=args.muestreo)
+    if args.tiempo is not None:
+        base["tiempo_simulacion"] = args.tiempo
+
+    especificacion = [("tasa_llegada", args.tasa, float),
+                      ("num_profesionales", args.profesionales, int),
+                      ("n_vol", args.voluntarios, int),
+                      ("permitir_generalista", args.generalista, bool)]
+    especificacion = [(clave, texto, tipo) for clave, texto, tipo in especificacion if texto]
+    if not especificacion:
+        parser.error("indicar al menos un parametro a barrer")
+
+    if args.lhs:
+        rangos = {clave: parsear_valores(texto, tipo, como_rango=True)
+                  for clave, texto, tipo in especificacion}
+        puntos = hipercubo_latino(rangos, args.lhs, semilla=args.semilla or 0)
+    else:
+        puntos = grilla({clave: parsear_valores(texto, tipo)
+                         for clave, texto, tipo in especificacion})
+
+    if args.cribar_espera is not None:
+        from analitico import cribar
+
+        total = len(puntos)
+        puntos = [p for p in puntos if cribar(config_punto(base, p), args.cribar_espera)]
+        print(f"\n  Cribado analitico: {total - len(puntos)} de {total} puntos descartados "
+              f"(espera estimada > {2 * args.cribar_espera:g} sem)")
+
+    print(f"\n  Barrido: {len(puntos)} puntos x {args.replicas} replicas "
+          f"({args.escenario}, motor {args.motor}) -> {args.salida}\n")
+    inicio = time.perf_counter()
+
+    def avance(fila, hechos, total):
+        punto = nombre_punto({clave: fila[clave] for clave, _, _ in especificacion})
+        print(f"  [{hechos:>4}/{total}] {punto:<60} espera {fila['espera_prom_media']:6.2f} "
+              f"+- {fila['espera_prom_ic']:.2f} | mal match {fila['mal_matching_media']:5.1f}% "
+              f"| ocup prof {fila['ocup_prof_media']:5.1f}%")
+
+    try:
+        filas = correr_barrido(puntos, base, replicas=args.replicas, workers=args.workers,
+                               semilla=args.semilla, salida=args.salida, al_terminar=avance)
+    except KeyboardInterrupt:
+        print(f"\n  Interrumpido. Lo hecho quedo en {args.salida}; correr el mismo "
+              "comando para seguir.\n")
+        return
+    print(f"\n  {len(filas)} puntos en {args.salida} ({time.perf_counter() - inicio:.1f} s)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Compara las disciplinas de la lista de espera de voluntarios.
+
+Corre las mismas replicas (mismas semillas) con FIFO, gravedad y
+envejecimiento y muestra la espera por voluntario de cada nivel de
+dificultad, con la diferencia contra FIFO de la espera de los Graves y
+su IC 95%. Despues mide cuanto cuesta estacionar y sacar niños de la
+lista con backlogs de mil a cien mil esperando: con los heaps tiene que
+crecer como log n, no como n.
+
+    python bench/bench_disciplinas.py [--replicas 30] [--ventaja 1.0]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replicas import comparar_pareado, kpi  # noqa: E402
+from simulacion_apoyo_escolar import (  # noqa: E402
+    DISCIPLINAS,
+    ESCENARIO_A,
+    ESCENARIO_B,
+    ESCENARIO_BASE,
+    ListaEspera,
+    Voluntario,
+)
+
+NIVELES = ["Leve", "Moderada", "Grave"]
+AREAS = ["matematica", "lectura", "grafismo"]
+
+
+def backlog(disciplina, n, semilla=1):
+    """Microsegundos por estacionar y por siguiente_para con n esperando."""
+    rng = random.Random(semilla)
+    lista = ListaEspera(disciplina)
+    ninos = [(rng.randint(1, 3), rng.choice(AREAS), rng.uniform(0, 52)) for _ in range(n)]
+    t0 = time.perf_counter()
+    for dificultad, area, ahora in ninos:
+        lista.estacionar(dificultad, area, None, ahora)
+    t_estacionar = (time.perf_counter() - t0) / n
+
+    voluntarios = [Voluntario(i, f"Vol-{i}", rng.randint(1, 3), rng.choice(AREAS))
+                   for i in range(n)]
+    t0 = time.perf_counter()
+    for voluntario in voluntarios:
+        lista.siguiente_para(voluntario, True)
+    t_sacar = (time.perf_counter() - t0) / n
+    return t_estacionar * 1e6, t_sacar * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--replicas", type=int, default=30)
+    parser.add_argument("--ventaja", type=float, default=1.0,
+                        help="semanas de antiguedad por nivel de dificultad "
+                             "(envejecimiento)")
+    args = parser.parse_args()
+
+    print(f"\n  Espera por voluntario (sem), {args.replicas} replicas, motor rapido\n")
+    print(f"  {'Escenario':<16} | {'Disciplina':<15} | {'Leve':>6} | {'Moderada':>8} | "
+          f"{'Grave':>6} | {'Total':>6} | Grave - FIFO (IC 95%)")
+    print(f"  {'-' * 100}")
+    for config in [ESCENARIO_A, ESCENARIO_BASE, ESCENARIO_B]:
+        fifo = dict(config, disciplina="fifo")
+        for disciplina in DISCIPLINAS:
+            otra = dict(config, disciplina=disciplina, ventaja_gravedad=args.ventaja)
+            r = comparar_pareado(fifo, otra, args.replicas, workers=1, motor="rapido")
+            esperas = [kpi(r["b"], f"espera_por_dificultad.{n}.promedio")["media"]
+                       for n in NIVELES]
+            dif = kpi(r["diferencia"], "espera_por_dificultad.Grave.promedio")
+            detalle = ("-" if disciplina == "fifo" else
+                       f"{dif['media']:+.2f} [{dif['ic_inf']:+.2f}, {dif['ic_sup']:+.2f}]")
+            print(f"  {config['nombre'][:16]:<16} | {disciplina:<15} | {esperas[0]:>6.2f} | "
+                  f"{esperas[1]:>8.2f} | {esperas[2]:>6.2f} | "
+                  f"{r['b']['espera_vol']['media']:>6.2f} | {detalle}")
+        print(f"  {'-' * 100}")
+
+    print(f"\n  Lista de espera con backlog grande (us por operacion)\n")
+    print(f"  {'Esperando':>10} | " +
+          " | ".join(f"{d:>22}" for d in DISCIPLINAS))
+    print(f"  {'':>10} | " + " | ".join(f"{'estacionar  siguiente':>22}" for _ in DISCIPLINAS))
+    print(f"  {'-' * 87}")
+    for n in (1_000, 10_000, 100_000):
+        celdas = []
+        for disciplina in DISCIPLINAS:
+            t_estacionar, t_sacar = backlog(disciplina, n)
+            celdas.append(f"{t_estacionar:>10.2f} {t_sacar:>10.2f}")
+        print(f"  {n:>10} | " + " | ".join(f"{c:>22}" for c in celdas))
+    print()
+
+
+if __name__ == "__main__":
+    main()
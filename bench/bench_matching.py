@@ -0,0 +1,124 @@
+"""
+Compara el matching goloso con la asignacion por lotes (asignacion_optima.py).
+
+Corre las mismas replicas (mismas semillas) con cada politica en el motor
+rapido y muestra mal matching, espera y tiempo por corrida, con la
+diferencia lotes - goloso y su IC 95%. Despues un caso de estres con
+miles de niños esperando voluntario (tiempo de corrida de cada politica)
+y una secuencia de asignaciones grandes resueltas en frio y con
+arranque en caliente (pasos de busqueda y tiempo por epoca).
+
+    python bench/bench_matching.py [--replicas 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asignacion_optima import resolver_asignacion  # noqa: E402
+from replicas import configs_replicas, diferencias, resumir_replicas  # noqa: E402
+from simulacion_apoyo_escolar import (  # noqa: E402
+    ESCENARIO_A,
+    ESCENARIO_B,
+    ESCENARIO_BASE,
+    ESCENARIO_BASE_ESTRICTO,
+    ESCENARIO_C,
+    correr_simulacion,
+    crear_simulacion,
+    generar_voluntarios,
+)
+
+KPIS = ["mal_matching", "espera_prom", "espera_vol"]
+
+
+def cronometrar(configs, matching):
+    t0 = time.perf_counter()
+    corridas = [correr_simulacion(dict(c, matching=matching), silencioso=True, motor="rapido")
+                for c in configs]
+    return (time.perf_counter() - t0) / len(configs), corridas
+
+
+def epocas(ninos=300, lugares=80, cantidad=20, semilla=1):
+    """
+    Secuencia de asignaciones como las de epocas seguidas: los mismos
+    niños esperando, la espera de todos sube 0.25 por epoca y cambian los
+    costos de un 10% de los lugares. Devuelve {caliente: (pasos, segundos)}.
+    """
+    rng = np.random.default_rng(semilla)
+    base = rng.integers(0, 8, (lugares, ninos)).astype(float)
+    espera = rng.uniform(0, 2, ninos)
+    totales = {False: [0, 0.0], True: [0, 0.0]}
+    v = None
+    for _ in range(cantidad):
+        costo = base - (1.5 + 6 * espera)[None, :]
+        for caliente in (False, True):
+            t0 = time.perf_counter()
+            _, duales, pasos = resolver_asignacion(costo, v if caliente else None)
+            totales[caliente][0] += pasos
+            totales[caliente][1] += time.perf_counter() - t0
+            if caliente:
+                siguiente = duales
+        v = siguiente
+        espera += 0.25
+        cambia = rng.random(lugares) < 0.1
+        base[cambia] = rng.integers(0, 8, (cambia.sum(), ninos))
+    return totales
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--replicas", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"\n  {'Escenario':<18} | {'Mal match %':>13} | {'Espera (sem)':>13} | "
+          f"{'ms/corrida':>13} | Dif. lotes - goloso (IC 95%)")
+    print(f"  {'':<18} | {'gol.':>6} {'lotes':>6} | {'gol.':>6} {'lotes':>6} | "
+          f"{'gol.':>6} {'lotes':>6} |")
+    print(f"  {'-' * 115}")
+    for config in [ESCENARIO_BASE, ESCENARIO_A, ESCENARIO_B, ESCENARIO_BASE_ESTRICTO,
+                   ESCENARIO_C]:
+        configs = configs_replicas(config, args.replicas)
+        t_goloso, c_goloso = cronometrar(configs, "greedy")
+        t_lotes, c_lotes = cronometrar(configs, "lotes")
+        goloso, lotes = resumir_replicas(c_goloso), resumir_replicas(c_lotes)
+        dif = resumir_replicas([diferencias(a, b) for a, b in zip(c_goloso, c_lotes)])
+        detalle = ", ".join(f"{k} {dif[k]['media']:+.2f}+-{dif[k]['semi_ancho']:.2f}"
+                            for k in KPIS)
+        print(f"  {config['nombre'][:18]:<18} | "
+              f"{goloso['mal_matching']['media']:>6.1f} {lotes['mal_matching']['media']:>6.1f} | "
+              f"{goloso['espera_prom']['media']:>6.2f} {lotes['espera_prom']['media']:>6.2f} | "
+              f"{t_goloso * 1000:>6.1f} {t_lotes * 1000:>6.1f} | {detalle}")
+
+    # Estres: pocos voluntarios para mucha demanda evaluada rapido, la
+    # lista de espera de voluntarios llega a miles de niños
+    config = dict(ESCENARIO_B, nombre="Estres", voluntarios_spec=generar_voluntarios(100),
+                  tasa_llegada=60, num_profesionales=120, max_espera_vol=52, motor="rapido")
+    print(f"\n  Estres: 100 voluntarios, {config['tasa_llegada']} niños/sem, "
+          f"{config['tiempo_simulacion']} semanas\n")
+    print(f"  {'Matching':<10} | {'ms/corrida':>10} | {'Resoluciones':>12} | "
+          f"{'Pasos':>7} | {'Esperando max':>13} | Mal match %")
+    print(f"  {'-' * 80}")
+    for matching in ("greedy", "lotes"):
+        sim = crear_simulacion(dict(config, matching=matching))
+        t0 = time.perf_counter()
+        r = sim.correr()
+        segundos = time.perf_counter() - t0
+        print(f"  {matching:<10} | {segundos * 1000:>10.0f} | "
+              f"{getattr(sim, 'resoluciones', 0):>12} | {getattr(sim, 'pasos', 0):>7} | "
+              f"{getattr(sim, 'esperando_max', '-'):>13} | {r['mal_matching']:.1f}")
+
+    print(f"\n  20 epocas seguidas de 300 niños x 80 lugares\n")
+    print(f"  {'Arranque':<10} | {'Pasos':>7} | {'ms/epoca':>8}")
+    print(f"  {'-' * 32}")
+    for caliente, (pasos, segundos) in epocas().items():
+        print(f"  {'caliente' if caliente else 'frio':<10} | {pasos:>7} | {segundos / 20 * 1000:>8.1f}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
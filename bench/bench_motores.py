@@ -0,0 +1,71 @@
+"""
+Compara el motor SimPy con el motor rapido (heapq).
+
+Mide el tiempo por corrida de cada motor en varios escenarios y
+horizontes, y verifica que los KPIs coincidan estadisticamente: corre
+las mismas replicas en ambos motores y muestra la diferencia media con
+su IC 95% (deberia contener al 0).
+
+    python bench/bench_motores.py [--replicas 30] [--muestreo numpy]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replicas import configs_replicas, diferencias, resumir_replicas  # noqa: E402
+from simulacion_apoyo_escolar import (  # noqa: E402
+    ESCENARIO_A,
+    ESCENARIO_B,
+    ESCENARIO_BASE,
+    ESCENARIO_BASE_ESTRICTO,
+    correr_simulacion,
+)
+
+KPIS = ["espera_prom", "espera_vol", "mal_matching", "ocup_vol", "ocup_prof"]
+
+
+def cronometrar(configs, motor):
+    t0 = time.perf_counter()
+    corridas = [correr_simulacion(c, silencioso=True, motor=motor) for c in configs]
+    return (time.perf_counter() - t0) / len(configs), corridas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--replicas", type=int, default=30)
+    parser.add_argument("--muestreo", choices=["estandar", "numpy"], default="estandar")
+    args = parser.parse_args()
+
+    casos = [
+        ("Base 52 sem", ESCENARIO_BASE),
+        ("Estricto 52 sem", ESCENARIO_BASE_ESTRICTO),
+        ("A 52 sem", ESCENARIO_A),
+        ("B 52 sem", ESCENARIO_B),
+        ("B 10 años", dict(ESCENARIO_B, tiempo_simulacion=520)),
+        ("B 10 años, 8 prof", dict(ESCENARIO_B, tiempo_simulacion=520,
+                                   num_profesionales=8)),
+    ]
+
+    print(f"\n  {'Caso':<20} | {'SimPy (ms)':>10} | {'Rapido (ms)':>11} | "
+          f"{'Speedup':>7} | Dif. rapido - simpy (IC 95%)")
+    print(f"  {'-' * 110}")
+    for nombre, config in casos:
+        configs = configs_replicas(dict(config, muestreo=args.muestreo), args.replicas)
+        t_simpy, c_simpy = cronometrar(configs, "simpy")
+        t_rapido, c_rapido = cronometrar(configs, "rapido")
+
+        dif = resumir_replicas([diferencias(a, b) for a, b in zip(c_simpy, c_rapido)])
+        detalle = ", ".join(
+            f"{k} {dif[k]['media']:+.2f}+-{dif[k]['semi_ancho']:.2f}" for k in KPIS[:3]
+        )
+        print(f"  {nombre:<20} | {t_simpy * 1000:>10.1f} | {t_rapido * 1000:>11.1f} | "
+              f"{t_simpy / t_rapido:>6.1f}x | {detalle}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
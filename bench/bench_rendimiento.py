@@ -0,0 +1,215 @@
+"""
+Rendimiento de correr_simulacion: escenarios, casos de estres y curvas.
+
+Mide cada caso en un proceso propio (asi el pico de memoria es el de ese
+caso y no el de todos los anteriores):
+
+  - tiempo por corrida (el mejor de --repeticiones)
+  - eventos del modelo por segundo (llegadas, evaluaciones,
+    asignaciones, abandonos y fines, contados con una corrida aparte
+    con traza) y niños por segundo
+  - pico de memoria (RSS) del proceso y cuanto crecio durante la corrida
+
+Casos: los seis escenarios predefinidos y tres curvas de estres que
+parten del Base: tasa de llegada x1/x10/x100, voluntarios de 100 a
+10.000 (con la demanda y los profesionales escalados para que esten igual
+de ocupados) y horizontes de 1 a 20 años. De cada curva se informa el
+exponente de escala (pendiente log-log del tiempo contra el parametro):
+1 es lineal.
+
+Los resultados se pueden guardar en JSON y comparar contra una base
+guardada; si algun caso tarda mas que la base por encima del umbral,
+el programa termina con codigo 1:
+
+    python bench/bench_rendimiento.py --salida bench/base.json
+    python bench/bench_rendimiento.py --comparar bench/base.json --umbral 0.15
+    python bench/bench_rendimiento.py --motor rapido --casos escenario,tasa
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_resultados import version_modelo  # noqa: E402
+from simulacion_apoyo_escolar import (  # noqa: E402
+    ESCENARIO_A,
+    ESCENARIO_B,
+    ESCENARIO_BASE,
+    ESCENARIO_BASE_ESTRICTO,
+    ESCENARIO_C,
+    ESCENARIO_D,
+    EVAL_MEDIA,
+    correr_simulacion,
+    generar_voluntarios,
+)
+
+
+def casos():
+    """(grupo, valor del parametro o None, nombre, config) de cada caso."""
+    lista = [("escenario", None, e["nombre"], e)
+             for e in [ESCENARIO_BASE, ESCENARIO_A, ESCENARIO_B, ESCENARIO_C,
+                       ESCENARIO_D, ESCENARIO_BASE_ESTRICTO]]
+    base = ESCENARIO_BASE
+    for factor in (1, 10, 100):
+        tasa = base["tasa_llegada"] * factor
+        lista.append(("tasa", tasa, f"tasa x{factor}", dict(
+            base, tasa_llegada=tasa,
+            voluntarios_spec=generar_voluntarios(8 * factor),
+            num_profesionales=base["num_profesionales"] * factor)))
+    for n in (100, 1000, 10000):
+        # misma carga por voluntario y por profesional que el Base
+        factor = n / len(base["voluntarios_spec"])
+        lista.append(("voluntarios", n, f"{n} voluntarios", dict(
+            base, tasa_llegada=base["tasa_llegada"] * factor,
+            voluntarios_spec=generar_voluntarios(n),
+            num_profesionales=max(1, round(base["num_profesionales"] * factor)))))
+    for anos in (1, 5, 10, 20):
+        # con profesionales suficientes, para que la cola no crezca sin limite
+        prof = math.ceil(base["tasa_llegada"] * EVAL_MEDIA / 0.9)
+        lista.append(("horizonte", anos, f"{anos} años", dict(
+            base, tiempo_simulacion=52 * anos, num_profesionales=prof)))
+    return lista
+
+
+def _rss_mb():
+    """Pico de RSS del proceso hasta ahora (ru_maxrss esta en KB en Linux)."""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def medir(config, motor, repeticiones):
+    """Corre un caso en este proceso. Lo llama el proceso hijo."""
+    antes = _rss_mb()
+    mejor = math.inf
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        r = correr_simulacion(config, silencioso=True, motor=motor)
+        mejor = min(mejor, time.perf_counter() - t0)
+    pico = _rss_mb()
+
+    eventos = [0]
+
+    def contar(_evento):
+        eventos[0] += 1
+
+    correr_simulacion(config, silencioso=True, motor=motor, traza=contar)
+    return {
+        "segundos": mejor,
+        "eventos": eventos[0],
+        "ninos": r["llegaron"],
+        "eventos_s": eventos[0] / mejor,
+        "ninos_s": r["llegaron"] / mejor,
+        "rss_pico_mb": pico,
+        "rss_delta_mb": pico - antes,
+    }
+
+
+def pendiente(puntos):
+    """Pendiente log-log por minimos cuadrados de [(x, y), ...]."""
+    xs = [math.log(x) for x, _ in puntos]
+    ys = [math.log(y) for _, y in puntos]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    sxx = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sxx if sxx else math.nan
+
+
+def comparar(resultados, base, umbral):
+    """Lista de (caso, tiempo actual / tiempo base) que empeoraron mas que umbral."""
+    peores = []
+    print(f"\n  Contra la base ({base['fecha']}, motor {base['motor']}), umbral +{umbral:.0%}\n")
+    print(f"  {'Caso':<22} | {'Base (ms)':>10} | {'Ahora (ms)':>10} | {'Cambio':>8} | {'RSS':>8}")
+    print(f"  {'-' * 72}")
+    for nombre, r in resultados["casos"].items():
+        b = base["casos"].get(nombre)
+        if b is None:
+            continue
+        razon = r["segundos"] / b["segundos"]
+        marca = "  <- REGRESION" if razon > 1 + umbral else ""
+        print(f"  {nombre:<22} | {b['segundos'] * 1000:>10.1f} | "
+              f"{r['segundos'] * 1000:>10.1f} | {razon - 1:>+7.0%} | "
+              f"{r['rss_pico_mb'] - b['rss_pico_mb']:>+6.1f}MB{marca}")
+        if marca:
+            peores.append((nombre, razon))
+    return peores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--motor", choices=["simpy", "rapido"], default="simpy")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--casos", default=None,
+                        help="grupos a correr, separados por coma "
+                             "(escenario, tasa, voluntarios, horizonte)")
+    parser.add_argument("--salida", default=None, help="guardar los resultados en JSON")
+    parser.add_argument("--comparar", default=None, help="JSON de base para comparar")
+    parser.add_argument("--umbral", type=float, default=0.15,
+                        help="empeoramiento de tiempo tolerado contra la base")
+    args = parser.parse_args()
+
+    elegidos = casos()
+    if args.casos:
+        grupos = set(args.casos.split(","))
+        elegidos = [c for c in elegidos if c[0] in grupos]
+
+    resultados = {
+        "fecha": time.strftime("%Y-%m-%d %H:%M"),
+        "motor": args.motor,
+        "python": platform.python_version(),
+        "maquina": platform.machine(),
+        "version_modelo": version_modelo(),
+        "casos": {},
+    }
+
+    print(f"\n  Motor {args.motor}, mejor de {args.repeticiones} corridas por caso\n")
+    print(f"  {'Caso':<22} | {'ms/corrida':>10} | {'eventos/s':>10} | "
+          f"{'niños/s':>9} | {'RSS pico':>8} | {'RSS +':>7}")
+    print(f"  {'-' * 82}")
+    # Un proceso nuevo por caso: ru_maxrss no baja nunca dentro de un proceso
+    contexto = get_context("spawn")
+    for grupo, valor, nombre, config in elegidos:
+        with ProcessPoolExecutor(1, mp_context=contexto) as ejecutor:
+            r = ejecutor.submit(medir, config, args.motor, args.repeticiones).result()
+        r.update(grupo=grupo, valor=valor)
+        resultados["casos"][nombre] = r
+        print(f"  {nombre:<22} | {r['segundos'] * 1000:>10.1f} | {r['eventos_s']:>10.0f} | "
+              f"{r['ninos_s']:>9.0f} | {r['rss_pico_mb']:>6.1f}MB | {r['rss_delta_mb']:>5.1f}MB")
+
+    curvas = {}
+    for grupo in ("tasa", "voluntarios", "horizonte"):
+        puntos = [(r["valor"], r["segundos"]) for r in resultados["casos"].values()
+                  if r["grupo"] == grupo]
+        if len(puntos) > 1:
+            curvas[grupo] = pendiente(puntos)
+    if curvas:
+        print(f"\n  Exponente de escala del tiempo (1 = lineal): " +
+              ", ".join(f"{g} {p:.2f}" for g, p in curvas.items()))
+    resultados["escala"] = curvas
+
+    if args.salida:
+        with open(args.salida, "w") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"\n  Resultados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar) as f:
+            base = json.load(f)
+        peores = comparar(resultados, base, args.umbral)
+        if peores:
+            print(f"\n  {len(peores)} caso(s) mas lentos que la base por encima del umbral\n")
+            sys.exit(1)
+        print("\n  Sin regresiones\n")
+    else:
+        print()
+
+
+if __name__ == "__main__":
+    main()
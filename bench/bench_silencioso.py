@@ -0,0 +1,70 @@
+"""
+Cuanto cuesta el paso a paso en el escenario B.
+
+Corre las mismas replicas del escenario B de cuatro formas y mide el
+tiempo por corrida:
+
+  - silenciosa: sin verboso ni traza (no se arma ningun mensaje)
+  - traza: cada evento como diccionario a una lista
+  - verbosa a StringIO: se formatea e imprime cada evento, pero a un
+    buffer en memoria (lo que hacia antes el modo silencioso)
+  - verbosa a /dev/null: lo mismo contra un archivo real
+
+    python bench/bench_silencioso.py [--replicas 20] [--motor rapido]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replicas import configs_replicas  # noqa: E402
+from simulacion_apoyo_escolar import ESCENARIO_B, crear_simulacion  # noqa: E402
+
+
+def cronometrar(configs, repeticiones=3, **kwargs):
+    """Mejor tiempo por corrida entre varias repeticiones."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        for c in configs:
+            crear_simulacion(c, **kwargs).correr()
+        mejor = min(mejor, (time.perf_counter() - t0) / len(configs))
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--replicas", type=int, default=20)
+    parser.add_argument("--motor", choices=["simpy", "rapido"], default="simpy")
+    args = parser.parse_args()
+
+    configs = configs_replicas(dict(ESCENARIO_B, motor=args.motor), args.replicas)
+    eventos = []
+    cronometrar(configs[:2], repeticiones=1)  # calentar imports y caches
+
+    t_silencio = cronometrar(configs)
+    t_traza = cronometrar(configs, repeticiones=1, traza=eventos.append)
+    with contextlib.redirect_stdout(io.StringIO()) as buffer:
+        t_stringio = cronometrar(configs, repeticiones=1, verboso=True)
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        t_devnull = cronometrar(configs, verboso=True)
+
+    print(f"\n  Escenario B, motor {args.motor}, {args.replicas} replicas")
+    print(f"  ({len(eventos) / args.replicas:.0f} eventos y "
+          f"{len(buffer.getvalue()) / args.replicas / 1024:.0f} KB de texto por corrida)\n")
+    print(f"  {'Modo':<24} | {'ms/corrida':>10} | {'vs silenciosa':>13}")
+    print(f"  {'-' * 54}")
+    for nombre, t in [("silenciosa", t_silencio), ("traza (lista)", t_traza),
+                      ("verbosa a StringIO", t_stringio),
+                      ("verbosa a /dev/null", t_devnull)]:
+        print(f"  {nombre:<24} | {t * 1000:>10.1f} | {t / t_silencio:>12.2f}x")
+    print()
+
+
+if __name__ == "__main__":
+    main()
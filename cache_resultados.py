@@ -0,0 +1,176 @@
+"""
+Cache en disco de resultados de simulacion.
+
+Cada corrida queda guardada en un SQLite local bajo una clave que es el
+hash del config (que ya incluye la semilla y, en las replicas, el numero
+de replica) mas la version del modelo. La version es un hash del codigo
+fuente del modelo: si se cambia la simulacion, los resultados viejos
+dejan de valer y se borran solos.
+
+El cache tiene un tope de entradas; cuando se pasa, se borran las que
+hace mas tiempo que no se usan (LRU).
+
+Uso desde consola:
+    python cache_resultados.py            # muestra ruta, version y tamaño
+    python cache_resultados.py --limpiar
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Archivos cuyo codigo define los resultados de una corrida
+ARCHIVOS_MODELO = [
+    "simulacion_apoyo_escolar.py", "motor_rapido.py", "muestreo.py", "acumuladores.py",
+    "asignacion_optima.py",
+]
+
+RUTA_POR_DEFECTO = os.environ.get(
+    "SIMULACION_CACHE", os.path.join(DIRECTORIO, ".cache_simulacion", "resultados.sqlite")
+)
+
+
+def version_modelo():
+    """Hash corto del codigo fuente del modelo."""
+    h = hashlib.sha256()
+    for nombre in ARCHIVOS_MODELO:
+        with open(os.path.join(DIRECTORIO, nombre), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def clave_config(config, version):
+    """Clave canonica: mismo config (en cualquier orden) -> misma clave."""
+    texto = json.dumps(config, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{version}|{texto}".encode()).hexdigest()
+
+
+class CacheResultados:
+    """
+    Resultados de correr_simulacion guardados en SQLite.
+
+    Se puede compartir entre hilos (usa un lock). Los procesos de las
+    replicas no lo tocan: el proceso principal busca antes de repartir
+    el trabajo y guarda lo que vuelve.
+    """
+
+    def __init__(self, ruta=RUTA_POR_DEFECTO, max_entradas=100_000, version=None):
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self.version = version or version_modelo()
+        self._lock = threading.Lock()
+
+        if ruta != ":memory:":
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        with self._lock, self._conexion:
+            self._conexion.execute(
+                "CREATE TABLE IF NOT EXISTS resultados ("
+                " clave TEXT PRIMARY KEY,"
+                " version TEXT NOT NULL,"
+                " valor TEXT NOT NULL,"
+                " ultimo_uso REAL NOT NULL)"
+            )
+            self._conexion.execute(
+                "CREATE INDEX IF NOT EXISTS idx_uso ON resultados (ultimo_uso)"
+            )
+            # Lo que se guardo con otra version del modelo ya no sirve
+            self._conexion.execute(
+                "DELETE FROM resultados WHERE version != ?", (self.version,)
+            )
+
+    def obtener_muchos(self, configs):
+        """Resultado guardado de cada config, o None si no esta."""
+        claves = [clave_config(c, self.version) for c in configs]
+        encontrados = {}
+        with self._lock, self._conexion:
+            for i in range(0, len(claves), 500):
+                trozo = claves[i:i + 500]
+                filas = self._conexion.execute(
+                    "SELECT clave, valor FROM resultados WHERE clave IN "
+                    f"({','.join('?' * len(trozo))})", trozo
+                ).fetchall()
+                encontrados.update(filas)
+            if encontrados:
+                ahora = time.time()
+                self._conexion.executemany(
+                    "UPDATE resultados SET ultimo_uso = ? WHERE clave = ?",
+                    [(ahora, c) for c in encontrados],
+                )
+        return [json.loads(encontrados[c]) if c in encontrados else None
+                for c in claves]
+
+    def guardar_muchos(self, configs, resultados):
+        """Guarda varios resultados y recorta el cache si se paso del tope."""
+        ahora = time.time()
+        filas = [
+            (clave_config(c, self.version), self.version, json.dumps(r), ahora)
+            for c, r in zip(configs, resultados)
+        ]
+        with self._lock, self._conexion:
+            self._conexion.executemany(
+                "INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?)", filas
+            )
+            sobran = self._conexion.execute(
+                "SELECT COUNT(*) FROM resultados").fetchone()[0] - self.max_entradas
+            if sobran > 0:
+                self._conexion.execute(
+                    "DELETE FROM resultados WHERE clave IN (SELECT clave FROM "
+                    "resultados ORDER BY ultimo_uso LIMIT ?)", (sobran,)
+                )
+
+    def obtener(self, config):
+        return self.obtener_muchos([config])[0]
+
+    def guardar(self, config, resultado):
+        self.guardar_muchos([config], [resultado])
+
+    def limpiar(self):
+        with self._lock, self._conexion:
+            self._conexion.execute("DELETE FROM resultados")
+
+    def __len__(self):
+        with self._lock:
+            return self._conexion.execute(
+                "SELECT COUNT(*) FROM resultados").fetchone()[0]
+
+
+_cache_por_defecto = None
+_lock_defecto = threading.Lock()
+
+
+def cache_por_defecto():
+    """Cache compartido del proceso, en RUTA_POR_DEFECTO."""
+    global _cache_por_defecto
+    with _lock_defecto:
+        if _cache_por_defecto is None:
+            _cache_por_defecto = CacheResultados()
+        return _cache_por_defecto
+
+
+def resolver_cache(cache):
+    """cache=True -> el cache por defecto; None/False -> sin cache."""
+    if cache is True:
+        return cache_por_defecto()
+    if cache is None or cache is False:
+        return None
+    return cache
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cache de resultados de simulacion")
+    parser.add_argument("--limpiar", action="store_true", help="borra todo el cache")
+    args = parser.parse_args()
+
+    cache = cache_por_defecto()
+    if args.limpiar:
+        cache.limpiar()
+    print(f"  Cache: {cache.ruta}")
+    print(f"  Version del modelo: {cache.version}")
+    print(f"  Entradas: {len(cache)} (tope {cache.max_entradas})")
@@ -0,0 +1,276 @@
+"""
+Estado estacionario: una corrida larga, MSER-5 y medias por lotes.
+
+Cada corrida normal arranca vacia en t=0 y corta a las 52 semanas, asi
+que la espera y la ocupacion arrastran el sesgo del arranque (al
+principio no hay cola) y los niños que quedan en el sistema al final no
+cuentan. Para estimar el regimen estable:
+
+  1. Se hace una sola corrida larga (por defecto 10 veces el horizonte
+     del escenario, con el motor rapido) y se guardan las series con la
+     traza: la espera de cada niño atendido en el orden en que sale, el
+     tipo de cada asignacion y el tiempo ocupado por semana del Equipo
+     Profesional y de los voluntarios.
+  2. MSER-5 elige el punto de truncamiento sobre la serie de esperas:
+     promedia de a 5 y busca el corte d que minimiza la varianza de la
+     media de lo que queda, var(resto) / (m - d). Todo lo que termino
+     antes de ese instante se descarta en todas las series.
+  3. Con lo que queda se forman `lotes` medias por lotes y el IC sale
+     de la t de Student sobre esas medias, como con replicas.
+
+Una corrida larga paga el arranque una sola vez; N replicas
+independientes lo pagan N veces. Si el corte cae en la segunda mitad de
+la serie (MSER no encuentra un tramo estable, tipico cuando el Equipo
+Profesional no alcanza y la cola crece sin limite) el resultado se
+marca como no estacionario.
+
+Uso:
+    from estado_estacionario import correr_estacionario
+    r = correr_estacionario(ESCENARIO_C)
+    r["espera_prom"]  # {"media": ..., "ic_inf": ..., "semi_ancho": ...}
+    r["t_truncado"], r["estacionario"]
+
+Desde consola:
+    python estado_estacionario.py --escenario c --tiempo 1040
+    python simulacion_apoyo_escolar.py --estacionario
+"""
+
+import argparse
+import math
+from array import array
+
+import numpy as np
+
+from replicas import resumir_valores
+from simulacion_apoyo_escolar import correr_simulacion, crear_voluntarios
+
+
+# -- Estadistica --
+
+def mser(serie, lote=5):
+    """
+    Punto de truncamiento MSER-k (k = lote) de una serie.
+
+    Devuelve (observaciones a descartar, True si el corte quedo en la
+    primera mitad). Con menos de 2 lotes no se trunca nada.
+    """
+    m = len(serie) // lote
+    if m < 2:
+        return 0, False
+    z = np.asarray(serie[:m * lote], dtype=float).reshape(m, lote).mean(axis=1)
+    # Sumas desde cada d hasta el final, para tener todas las varianzas juntas
+    resto = np.arange(m, 0, -1)
+    suma = np.cumsum(z[::-1])[::-1]
+    suma2 = np.cumsum((z * z)[::-1])[::-1]
+    sse = suma2 - suma * suma / resto
+    mitad = m // 2
+    d = int(np.argmin(sse[:mitad + 1] / resto[:mitad + 1] ** 2))
+    return d * lote, d < mitad
+
+
+def medias_por_lotes(valores, lotes=20, nivel=0.95):
+    """
+    Resumen de una serie correlacionada con `lotes` medias por lotes.
+
+    Lo que sobra al dividir en lotes iguales se descarta del principio.
+    Ademas de media e IC devuelve el tamaño de lote y la autocorrelacion
+    de orden 1 de las medias: si es alta, los lotes son cortos.
+    """
+    valores = np.asarray(valores, dtype=float)
+    tam = len(valores) // lotes
+    if tam == 0:
+        return None
+    medias = valores[len(valores) - tam * lotes:].reshape(lotes, tam).mean(axis=1)
+    resumen = resumir_valores(medias.tolist(), nivel)
+    centradas = medias - medias.mean()
+    denom = float(centradas @ centradas)
+    resumen["lotes"] = lotes
+    resumen["tam_lote"] = tam
+    resumen["autocorrelacion"] = (float(centradas[1:] @ centradas[:-1]) / denom
+                                  if denom > 0 else 0.0)
+    return resumen
+
+
+# -- Series de una corrida --
+
+class SeriesEstacionarias:
+    """
+    Traza que arma las series para MSER y medias por lotes.
+
+    Solo guarda lo de los niños que siguen en el sistema y columnas de
+    numeros (array.array), no un diccionario por evento.
+    """
+
+    def __init__(self, horizonte):
+        semanas = math.ceil(horizonte)
+        self.horizonte = horizonte
+        self.llegada = {}
+        self.inicio_vol = {}
+        self.t_fin = array("d")        # atendidos, en orden de salida
+        self.espera = array("d")
+        self.t_salida = array("d")     # atendidos y abandonos, en orden de salida
+        self.abandono = array("b")
+        self.t_asignacion = array("d")
+        self.mal_match = array("b")
+        self.uso_prof = np.zeros(semanas)
+        self.uso_vol = np.zeros(semanas)
+
+    def _ocupar(self, uso, desde, hasta):
+        """Reparte el intervalo [desde, hasta) en las semanas que toca."""
+        hasta = min(hasta, self.horizonte)
+        while desde < hasta:
+            semana = int(desde)
+            tramo = min(hasta, semana + 1) - desde
+            uso[semana] += tramo
+            desde += tramo
+
+    def __call__(self, evento):
+        t, tipo, nino = evento["t"], evento["tipo"], evento["nino"]
+        if tipo == "llegada":
+            self.llegada[nino] = t
+        elif tipo == "evaluacion":
+            self._ocupar(self.uso_prof, t, t + evento["duracion"])
+        elif tipo == "asignacion":
+            self.inicio_vol[nino] = t
+            self.t_asignacion.append(t)
+            self.mal_match.append(evento["match"] != "OPTIMO")
+        elif tipo == "fin":
+            inicio = self.inicio_vol.pop(nino)
+            self._ocupar(self.uso_vol, inicio, t)
+            self.t_fin.append(t)
+            self.espera.append(t - self.llegada.pop(nino) - evento["duracion"])
+            self.t_salida.append(t)
+            self.abandono.append(0)
+        elif tipo == "abandono":
+            del self.llegada[nino]
+            self.t_salida.append(t)
+            self.abandono.append(1)
+
+
+def _desde(tiempos, valores, t):
+    """Los valores cuyo tiempo es >= t (los tiempos estan ordenados)."""
+    i = int(np.searchsorted(np.frombuffer(tiempos, dtype=float), t))
+    return np.frombuffer(valores, dtype=np.dtype(valores.typecode))[i:]
+
+
+# -- Corrida estacionaria --
+
+def correr_estacionario(config, tiempo=None, lotes=20, nivel=0.95, motor="rapido"):
+    """
+    Corre una sola replica larga de `config` y estima el regimen estable.
+
+    tiempo: semanas de la corrida larga (por defecto 10 veces
+    config["tiempo_simulacion"]). Devuelve un diccionario con el
+    resultado normal de esa corrida ("corrida"), el truncamiento
+    ("truncado" niños atendidos, "t_truncado" semanas, "estacionario")
+    y el resumen por lotes de espera_prom, mal_matching, sin_atencion,
+    ocup_prof y ocup_vol (None si no alcanzan los datos).
+    """
+    tiempo = tiempo or 10 * config["tiempo_simulacion"]
+    larga = dict(config, tiempo_simulacion=tiempo, motor=config.get("motor", motor))
+    series = SeriesEstacionarias(tiempo)
+    corrida = correr_simulacion(larga, silencioso=True, traza=series)
+
+    truncado, estacionario = mser(series.espera)
+    t_truncado = series.t_fin[truncado - 1] if truncado else 0.0
+    semana = math.ceil(t_truncado)
+    n_vol = len(crear_voluntarios(config["voluntarios_spec"]))
+
+    def lotes_de(valores, escala=1.0):
+        return medias_por_lotes(np.asarray(valores, dtype=float) * escala, lotes, nivel)
+
+    return {
+        "nombre": config["nombre"],
+        "tiempo": tiempo,
+        "truncado": truncado,
+        "t_truncado": t_truncado,
+        "estacionario": estacionario,
+        "espera_prom": lotes_de(series.espera[truncado:]),
+        "mal_matching": lotes_de(_desde(series.t_asignacion, series.mal_match, t_truncado), 100),
+        "sin_atencion": lotes_de(_desde(series.t_salida, series.abandono, t_truncado), 100),
+        "ocup_prof": lotes_de(series.uso_prof[semana:], 100 / config["num_profesionales"]),
+        "ocup_vol": lotes_de(series.uso_vol[semana:], 100 / n_vol),
+        "corrida": corrida,
+    }
+
+
+# -- Salida --
+
+FILAS = [
+    ("Espera prom (sem)", "espera_prom", "{:.2f}"),
+    ("Mal matching (%)", "mal_matching", "{:.1f}"),
+    ("Sin atencion (%)", "sin_atencion", "{:.1f}"),
+    ("Ocup. voluntarios (%)", "ocup_vol", "{:.1f}"),
+    ("Ocup. Eq.Prof (%)", "ocup_prof", "{:.1f}"),
+]
+
+
+def tabla_estacionario(resultados):
+    """Media +- IC por lotes de cada escenario, con el truncamiento."""
+    print(f"\n  {'=' * 55}")
+    print(f"  ESTADO ESTACIONARIO (MSER-5 + medias por lotes, IC 95%)")
+    print(f"  {'=' * 55}\n")
+
+    header = f"  {'Metrica':<25}"
+    for r in resultados:
+        header += f" | {r['nombre'][:17]:>17}"
+    print(header)
+    print(f"  {'-' * (25 + 20 * len(resultados))}")
+
+    for nombre_fila, clave, fmt in FILAS:
+        linea = f"  {nombre_fila:<25}"
+        for r in resultados:
+            kpi = r[clave]
+            celda = ("-" if kpi is None else
+                     f"{fmt.format(kpi['media'])} +- {fmt.format(kpi['semi_ancho'])}")
+            linea += f" | {celda:>17}"
+        print(linea)
+
+    filas_corte = [
+        ("Corrida (sem)", lambda r: f"{r['tiempo']:.0f}"),
+        ("Truncado (sem)", lambda r: f"{r['t_truncado']:.1f}"),
+        ("Truncado (niños)", lambda r: f"{r['truncado']}"),
+        ("Niños por lote", lambda r: f"{r['espera_prom']['tam_lote']}"
+                                     if r["espera_prom"] else "-"),
+        ("Estacionario", lambda r: "si" if r["estacionario"] else "NO"),
+    ]
+    print(f"  {'-' * (25 + 20 * len(resultados))}")
+    for nombre_fila, valor in filas_corte:
+        linea = f"  {nombre_fila:<25}"
+        for r in resultados:
+            linea += f" | {valor(r):>17}"
+        print(linea)
+
+    if not all(r["estacionario"] for r in resultados):
+        print("\n  NO = MSER corto en la segunda mitad: la espera sigue creciendo")
+        print("  (la cola no se estabiliza) y las medias dependen del largo de la corrida.")
+    print()
+
+
+def main(argv=None):
+    from simulacion_apoyo_escolar import (ESCENARIO_A, ESCENARIO_B, ESCENARIO_BASE,
+                                          ESCENARIO_BASE_ESTRICTO, ESCENARIO_C,
+                                          ESCENARIO_D, tabla_comparativa)
+
+    escenarios = {"base": ESCENARIO_BASE, "a": ESCENARIO_A, "b": ESCENARIO_B,
+                  "c": ESCENARIO_C, "d": ESCENARIO_D, "estricto": ESCENARIO_BASE_ESTRICTO}
+    parser = argparse.ArgumentParser(
+        description="KPIs de regimen estable con una corrida larga")
+    parser.add_argument("--escenario", choices=list(escenarios) + ["todos"], default="todos")
+    parser.add_argument("--tiempo", type=float, default=None,
+                        help="semanas de la corrida larga (por defecto 10x el escenario)")
+    parser.add_argument("--lotes", type=int, default=20)
+    parser.add_argument("--semilla", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    elegidos = (list(escenarios.values()) if args.escenario == "todos"
+                else [escenarios[args.escenario]])
+    if args.semilla is not None:
+        elegidos = [dict(e, semilla=args.semilla) for e in elegidos]
+    resultados = [correr_estacionario(e, args.tiempo, args.lotes) for e in elegidos]
+    tabla_comparativa([correr_simulacion(e, silencioso=True) for e in elegidos])
+    tabla_estacionario(resultados)
+
+
+if __name__ == "__main__":
+    main()
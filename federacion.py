@@ -0,0 +1,486 @@
+"""
+Federacion de centros: una red de Centros de Apoyo Escolar con un
+Equipo Profesional regional compartido.
+
+Cada centro tiene sus voluntarios y su Equipo Profesional propio y corre
+con el motor rapido. La demanda es de toda la region y cada niño va al
+centro segun su area: la tasa de niños de un area se reparte entre los
+centros en proporcion a cuantos voluntarios de esa area tiene cada uno.
+Repartir un proceso de Poisson al azar da procesos de Poisson
+independientes, asi que cada centro sortea sus propios niños (con su
+propia semilla) y queda como un escenario comun.
+
+Lo unico compartido es el equipo regional: cuando un niño llega y el
+Equipo Profesional de su centro esta ocupado, se lo deriva al equipo
+regional si se espera que ahi lo empiecen a evaluar antes que en el
+centro (segun la cola local y cuando se libera el primer profesional
+regional, dato que se actualiza en cada ventana). El equipo regional
+evalua en orden de pedido pero recien `demora_regional` semanas despues
+(el profesional tiene que viajar). Esa demora es el lookahead de la
+sincronizacion:
+
+  - Los centros se reparten en fragmentos, uno por proceso, que avanzan
+    de a ventanas de `demora_regional` semanas sin hablar entre si.
+  - Al final de cada ventana cada fragmento manda los pedidos de la
+    ventana; el coordinador los ordena por tiempo, les asigna un
+    profesional regional y devuelve cuando empieza y termina cada
+    evaluacion. Como ninguna empieza antes del final de la ventana, los
+    fragmentos nunca tienen que volver atras.
+  - Sin equipo regional no hay nada que sincronizar: cada fragmento
+    corre de una hasta el final.
+
+El resultado no depende de cuantos procesos se usen. El pool de
+voluntarios y la lista de espera de cada centro ya estan indexados por
+(area, expertise), asi que asignar cuesta O(log n) aunque el centro
+tenga miles de voluntarios.
+
+Formato del config (tambien se puede leer de un JSON):
+
+    FEDERACION = {
+        "nombre": "Red provincial",
+        "tiempo_simulacion": 52,
+        "semilla": 42,
+        "tasa_llegada": 400.0,              # niños/sem de toda la region
+        "prob_dificultad": [0.50, 0.35, 0.15],
+        "prob_area": [0.45, 0.35, 0.20],
+        "permitir_generalista": True,       # cada centro lo puede cambiar
+        "max_espera_vol": 8,
+        "profesionales_regionales": 10,
+        "demora_regional": 0.5,
+        "centros": [
+            {"nombre": "Centro 001", "voluntarios_spec": [...],
+             "num_profesionales": 3},
+            ...
+        ],
+    }
+
+Uso:
+    from federacion import correr_federacion
+    r = correr_federacion(FEDERACION, workers=4)
+    r["total"], r["centros"]
+
+Desde consola (una red de ejemplo, o un config en JSON):
+    python federacion.py --centros 200 --voluntarios 100 --tasa 500 --regionales 20
+    python federacion.py --config red.json --workers 4
+"""
+
+import argparse
+import heapq
+import json
+import math
+import multiprocessing
+import os
+import random
+
+from acumuladores import Acumulador
+from motor_rapido import FIN_EVAL, SimulacionRapida
+from replicas import semilla_replica
+from simulacion_apoyo_escolar import EVAL_MEDIA
+
+AREAS = ["matematica", "lectura", "grafismo"]
+
+# Lo que un centro hereda de la federacion si no lo define
+HEREDADOS = ["tiempo_simulacion", "prob_dificultad", "permitir_generalista",
+             "max_espera_vol", "muestreo"]
+
+
+# -- Reparto de la demanda --
+
+def repartir_demanda(federacion):
+    """
+    Tasa de llegada y mezcla de areas de cada centro.
+
+    La demanda de cada area se reparte segun los voluntarios de esa area
+    que tiene cada centro; si ningun centro tiene voluntarios de un area,
+    esos niños se reparten segun el total de voluntarios.
+    """
+    centros = federacion["centros"]
+    capacidad = [[sum(1 for v in c["voluntarios_spec"] if v["area"] == a) for a in AREAS]
+                 for c in centros]
+    por_area = [sum(fila[j] for fila in capacidad) for j in range(len(AREAS))]
+    voluntarios = [sum(fila) for fila in capacidad]
+    total = sum(voluntarios)
+    if total == 0:
+        raise ValueError("La federacion no tiene voluntarios")
+
+    reparto = []
+    for fila, n in zip(capacidad, voluntarios):
+        tasas = [
+            federacion["tasa_llegada"] * p * (fila[j] / por_area[j] if por_area[j] else n / total)
+            for j, p in enumerate(federacion["prob_area"])
+        ]
+        tasa = sum(tasas)
+        reparto.append((tasa, [t / tasa for t in tasas] if tasa else list(federacion["prob_area"])))
+    return reparto
+
+
+def configs_centros(federacion):
+    """Un config de escenario comun por centro, con su demanda y su semilla."""
+    configs = []
+    for i, (centro, (tasa, prob_area)) in enumerate(
+            zip(federacion["centros"], repartir_demanda(federacion))):
+        if tasa == 0:
+            raise ValueError(f"{centro['nombre']} no tiene voluntarios: no recibe niños")
+        config = {clave: federacion[clave] for clave in HEREDADOS if clave in federacion}
+        config.update(centro)
+        config.update(
+            tasa_llegada=tasa,
+            prob_area=prob_area,
+            semilla=semilla_replica(federacion["semilla"], i),
+            centro=i,
+        )
+        configs.append(config)
+    return configs
+
+
+# -- Un centro --
+
+class CentroFederado(SimulacionRapida):
+    """
+    Centro que deriva niños al equipo regional cuando ahi empezarian
+    antes. demora = demora_regional (None = sin equipo regional);
+    libre_regional lo actualiza el coordinador en cada ventana.
+    """
+
+    def __init__(self, config, demora=None):
+        super().__init__(config)
+        self.demora = demora
+        self.libre_regional = 0.0
+        self.pedidos = []                 # (t, centro, niño, duracion) de la ventana
+        self.derivados = {}               # niño -> Nino, hasta que termina su evaluacion
+        self.n_derivados = 0
+        self.tiempo_uso_regional = 0.0
+
+    def _pedir_evaluacion(self, nino):
+        if self.demora is None or self.prof_libres > 0:
+            super()._pedir_evaluacion(nino)
+            return
+        local = (self.ahora + (len(self.cola_prof) + 1) * EVAL_MEDIA
+                 / self.config["num_profesionales"])
+        if max(self.ahora + self.demora, self.libre_regional) >= local:
+            super()._pedir_evaluacion(nino)
+            return
+        self.derivados[nino.numero] = nino
+        self.n_derivados += 1
+        self.pedidos.append((self.ahora, self.config["centro"], nino.numero,
+                             nino.duracion_eval))
+
+    def recibir(self, asignaciones):
+        """Programa las evaluaciones regionales: (niño, inicio, fin)."""
+        for numero, inicio, fin in asignaciones:
+            nino = self.derivados[numero]
+            self.espera_prof.agregar(inicio - nino.t_llegada)
+            self.tiempo_uso_regional += nino.duracion_eval
+            if self.detallado:
+                self._evento(inicio, "evaluacion", numero, regional=True,
+                             espera=inicio - nino.t_llegada, duracion=nino.duracion_eval)
+            heapq.heappush(self.eventos, (fin, next(self._orden), FIN_EVAL, nino))
+
+    def _fin_evaluacion(self, nino):
+        if self.derivados.pop(nino.numero, None) is None:
+            super()._fin_evaluacion(nino)
+        else:
+            self._buscar_voluntario(nino)   # no libera a nadie del centro
+
+    def resultados(self):
+        r = super().resultados()
+        evaluados = self.espera_prof.n
+        if evaluados:
+            r["eval_prom"] = round((self.tiempo_uso_prof + self.tiempo_uso_regional)
+                                   / evaluados, 3)
+        r["derivados"] = self.n_derivados
+        return r
+
+
+# -- Fragmentos (grupos de centros que corren en un mismo proceso) --
+
+class Fragmento:
+    """Varios centros que avanzan juntos de ventana en ventana."""
+
+    def __init__(self, configs, demora):
+        self.centros = {c["centro"]: CentroFederado(c, demora) for c in configs}
+        for centro in self.centros.values():
+            centro.arrancar()
+
+    def avanzar(self, hasta, asignaciones, libre_regional):
+        """Entrega las asignaciones, avanza y devuelve los pedidos nuevos."""
+        pedidos = []
+        for i, centro in self.centros.items():
+            centro.libre_regional = libre_regional
+            centro.recibir(asignaciones.get(i, ()))
+            centro.avanzar(hasta)
+            pedidos.extend(centro.pedidos)
+            centro.pedidos = []
+        return pedidos
+
+    def resultados(self, fin):
+        for centro in self.centros.values():
+            centro.ahora = fin
+        return {i: centro.resultados() for i, centro in self.centros.items()}
+
+
+def _servir(conexion, configs, demora):
+    """Bucle de un proceso: atiende las ordenes del coordinador."""
+    fragmento = Fragmento(configs, demora)
+    while True:
+        orden, args = conexion.recv()
+        conexion.send(getattr(fragmento, orden)(*args))
+        if orden == "resultados":
+            conexion.close()
+            return
+
+
+class FragmentoRemoto:
+    """Fragmento en otro proceso; enviar y recibir por separado, asi
+    todos los procesos avanzan la misma ventana a la vez."""
+
+    def __init__(self, configs, demora, contexto):
+        self.conexion, otra = contexto.Pipe()
+        self.proceso = contexto.Process(target=_servir, args=(otra, configs, demora))
+        self.proceso.start()
+        otra.close()
+
+    def enviar(self, orden, *args):
+        self.conexion.send((orden, args))
+
+    def recibir(self):
+        return self.conexion.recv()
+
+
+class FragmentoLocal:
+    """Misma interfaz que FragmentoRemoto, en el mismo proceso."""
+
+    def __init__(self, configs, demora):
+        self.fragmento = Fragmento(configs, demora)
+
+    def enviar(self, orden, *args):
+        self._respuesta = getattr(self.fragmento, orden)(*args)
+
+    def recibir(self):
+        return self._respuesta
+
+
+def agrupar(configs, n):
+    """n grupos de centros con demanda parecida (el mas cargado al mas libre)."""
+    grupos = [[] for _ in range(n)]
+    carga = [(0.0, g) for g in range(n)]
+    for config in sorted(configs, key=lambda c: -c["tasa_llegada"]):
+        tasa, g = heapq.heappop(carga)
+        grupos[g].append(config)
+        heapq.heappush(carga, (tasa + config["tasa_llegada"], g))
+    return [g for g in grupos if g]
+
+
+# -- Equipo regional --
+
+class EquipoRegional:
+    """Profesionales compartidos: atienden los pedidos en orden de tiempo."""
+
+    def __init__(self, n, demora, horizonte):
+        self.libres = [0.0] * n           # heap: cuando se libera cada profesional
+        self.demora = demora
+        self.horizonte = horizonte
+        self.tiempo_uso = 0.0
+        self.espera = Acumulador()        # desde el pedido hasta que empieza
+
+    def asignar(self, pedidos):
+        """Devuelve {centro: [(niño, inicio, fin), ...]}."""
+        asignaciones = {}
+        for t, centro, numero, duracion in sorted(pedidos):
+            inicio = max(t + self.demora, heapq.heappop(self.libres))
+            fin = inicio + duracion
+            heapq.heappush(self.libres, fin)
+            self.tiempo_uso += max(0.0, min(fin, self.horizonte) - min(inicio, self.horizonte))
+            self.espera.agregar(inicio - t)
+            asignaciones.setdefault(centro, []).append((numero, inicio, fin))
+        return asignaciones
+
+
+# -- Corrida --
+
+def correr_federacion(federacion, workers=None):
+    """
+    Corre la red de centros repartida en `workers` procesos (por defecto
+    uno por nucleo, 1 = todo en este proceso). Devuelve
+    {"total": ..., "centros": [resultado de cada centro]}.
+    """
+    configs = configs_centros(federacion)
+    fin = federacion["tiempo_simulacion"]
+    n_regionales = federacion.get("profesionales_regionales", 0)
+    demora = federacion.get("demora_regional", 0.5)
+    if n_regionales and demora <= 0:
+        raise ValueError("demora_regional tiene que ser > 0 (es el lookahead)")
+    regional = EquipoRegional(n_regionales, demora, fin) if n_regionales else None
+    demora_centros = demora if regional else None
+
+    grupos = agrupar(configs, min(workers or os.cpu_count() or 1, len(configs)))
+    if len(grupos) == 1:
+        fragmentos = [FragmentoLocal(grupos[0], demora_centros)]
+    else:
+        contexto = multiprocessing.get_context()
+        fragmentos = [FragmentoRemoto(g, demora_centros, contexto) for g in grupos]
+    dueno = {c["centro"]: k for k, g in enumerate(grupos) for c in g}
+
+    ventanas = math.ceil(fin / demora) if regional else 1
+    asignaciones = {}
+    for v in range(1, ventanas + 1):
+        hasta = min(fin, v * demora) if regional else fin
+        por_fragmento = [{} for _ in fragmentos]
+        for centro, lista in asignaciones.items():
+            por_fragmento[dueno[centro]][centro] = lista
+        for fragmento, propias in zip(fragmentos, por_fragmento):
+            fragmento.enviar("avanzar", hasta, propias,
+                             regional.libres[0] if regional else 0.0)
+        pedidos = [p for fragmento in fragmentos for p in fragmento.recibir()]
+        asignaciones = regional.asignar(pedidos) if regional else {}
+
+    for fragmento in fragmentos:
+        fragmento.enviar("resultados", fin)
+    resultados = {}
+    for fragmento in fragmentos:
+        resultados.update(fragmento.recibir())
+    for fragmento in fragmentos:
+        if isinstance(fragmento, FragmentoRemoto):
+            fragmento.proceso.join()
+
+    centros = [resultados[i] for i in range(len(configs))]
+    return {"total": resumir_federacion(federacion, configs, centros, regional),
+            "centros": centros}
+
+
+def resumir_federacion(federacion, configs, centros, regional):
+    """KPIs de toda la red a partir de los de cada centro."""
+    fin = federacion["tiempo_simulacion"]
+
+    def suma(clave):
+        return sum(r[clave] for r in centros)
+
+    atendidos = suma("atendidos")
+    total_match = suma("total_match")
+    n_vol = sum(len(c["voluntarios_spec"]) for c in configs)
+    n_prof = sum(c["num_profesionales"] for c in configs)
+    n_reg = federacion.get("profesionales_regionales", 0)
+    return {
+        "nombre": federacion["nombre"],
+        "centros": len(centros),
+        "voluntarios": n_vol,
+        "profesionales": n_prof,
+        "profesionales_regionales": n_reg,
+        "llegaron": suma("llegaron"),
+        "atendidos": atendidos,
+        "no_atendidos": suma("no_atendidos"),
+        "en_proceso": suma("en_proceso"),
+        "derivados": suma("derivados"),
+        "espera_prom": round(sum(r["espera_prom"] * r["atendidos"] for r in centros)
+                             / atendidos, 2) if atendidos else 0,
+        "espera_regional": round(regional.espera.media, 2) if regional and regional.espera.n else 0,
+        "mal_matching": round((suma("suboptimos") + suma("generalistas")) * 100
+                              / total_match, 1) if total_match else 0,
+        "ocup_vol": round(sum(r["ocup_vol"] * len(c["voluntarios_spec"])
+                              for r, c in zip(centros, configs)) / n_vol, 1),
+        "ocup_prof": round(sum(r["ocup_prof"] * c["num_profesionales"]
+                               for r, c in zip(centros, configs)) / n_prof, 1),
+        "ocup_regional": round(regional.tiempo_uso * 100 / (n_reg * fin), 1) if regional else 0,
+    }
+
+
+# -- Red de ejemplo --
+
+def federacion_ejemplo(n_centros=20, voluntarios=50, tasa=100.0, regionales=5,
+                       semilla=42, tiempo=52):
+    """
+    Red sintetica para probar: cada centro con `voluntarios` voluntarios
+    de areas y expertise al azar (cada centro con su propia mezcla) y
+    los profesionales que pide su demanda (carga cercana a 1); el equipo
+    regional cubre los picos.
+    """
+    rng = random.Random(semilla)
+    centros = []
+    for i in range(n_centros):
+        pesos = [rng.random() + 0.2 for _ in AREAS]
+        centros.append({
+            "nombre": f"Centro {i + 1:03d}",
+            "voluntarios_spec": [
+                {"nombre": f"C{i + 1:03d}-V{j + 1:03d}",
+                 "expertise": rng.choice((1, 2, 3)),
+                 "area": rng.choices(AREAS, pesos)[0]}
+                for j in range(voluntarios)
+            ],
+            "num_profesionales": 1,
+        })
+    federacion = {
+        "nombre": f"Red de {n_centros} centros",
+        "tiempo_simulacion": tiempo,
+        "semilla": semilla,
+        "tasa_llegada": tasa,
+        "prob_dificultad": [0.50, 0.35, 0.15],
+        "prob_area": [0.45, 0.35, 0.20],
+        "permitir_generalista": True,
+        "max_espera_vol": 8,
+        "profesionales_regionales": regionales,
+        "demora_regional": 0.5,
+        "centros": centros,
+    }
+    for centro, (tasa_centro, _) in zip(centros, repartir_demanda(federacion)):
+        centro["num_profesionales"] = max(1, round(tasa_centro * EVAL_MEDIA))
+    return federacion
+
+
+# -- Salida --
+
+def imprimir_federacion(r, peores=5):
+    """Totales de la red y los centros con mas espera."""
+    t = r["total"]
+    print(f"\n  {'=' * 55}")
+    print(f"  FEDERACION: {t['nombre']}")
+    print(f"  {'=' * 55}")
+    print(f"  {t['centros']} centros, {t['voluntarios']} voluntarios, "
+          f"{t['profesionales']} profesionales + {t['profesionales_regionales']} regionales\n")
+    filas = [
+        ("Niños llegaron", f"{t['llegaron']}"),
+        ("Niños atendidos", f"{t['atendidos']}"),
+        ("Sin atencion", f"{t['no_atendidos']}"),
+        ("En proceso", f"{t['en_proceso']}"),
+        ("Derivados al regional", f"{t['derivados']}"),
+        ("Espera prom (sem)", f"{t['espera_prom']:.2f}"),
+        ("Espera regional (sem)", f"{t['espera_regional']:.2f}"),
+        ("Mal matching (%)", f"{t['mal_matching']:.1f}"),
+        ("Ocup. voluntarios (%)", f"{t['ocup_vol']:.1f}"),
+        ("Ocup. Eq.Prof (%)", f"{t['ocup_prof']:.1f}"),
+        ("Ocup. regional (%)", f"{t['ocup_regional']:.1f}"),
+    ]
+    for nombre, valor in filas:
+        print(f"  {nombre:<25} {valor:>10}")
+
+    centros = sorted(r["centros"], key=lambda c: -c["espera_prom"])[:peores]
+    print(f"\n  Centros con mas espera:")
+    print(f"  {'Centro':<20} | {'Espera':>7} | {'Mal match':>9} | {'Ocup. vol':>9} | {'Derivados':>9}")
+    for c in centros:
+        print(f"  {c['nombre'][:20]:<20} | {c['espera_prom']:>7.2f} | {c['mal_matching']:>8.1f}% "
+              f"| {c['ocup_vol']:>8.1f}% | {c['derivados']:>9}")
+    print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Red de centros con equipo regional")
+    parser.add_argument("--config", default=None, help="federacion en JSON")
+    parser.add_argument("--centros", type=int, default=20)
+    parser.add_argument("--voluntarios", type=int, default=50, help="por centro")
+    parser.add_argument("--tasa", type=float, default=100.0, help="niños/sem de la region")
+    parser.add_argument("--regionales", type=int, default=5)
+    parser.add_argument("--tiempo", type=float, default=52)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.config:
+        with open(args.config) as f:
+            federacion = json.load(f)
+    else:
+        federacion = federacion_ejemplo(args.centros, args.voluntarios, args.tasa,
+                                        args.regionales, args.semilla, args.tiempo)
+    imprimir_federacion(correr_federacion(federacion, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""
+Instrumentacion opcional del nucleo de simulacion y perfiles.
+
+Para saber en que se va el tiempo de una corrida lenta, Instrumentacion
+se engancha a una simulacion ya creada (de cualquiera de los dos
+motores) y cuenta:
+
+  - eventos programados y procesados (en SimPy, los del entorno; en el
+    motor rapido, los del heap, tambien por tipo)
+  - llamadas al matching por nivel: cuantas veces se intento cada nivel
+    (OPTIMO, SUBOPTIMO, GENERALISTA) y cuantas encontro voluntario (con
+    matching por lotes, cada par asignado cuenta como una llamada que
+    acierta en su nivel)
+  - reintentos: niños que quedaron en la lista de espera, cuantos
+    consiguieron voluntario despues y cuantos abandonaron
+  - tiempo por fase: sorteos, matching, acumulacion de KPIs y el resto
+    (motor de eventos y logica del modelo)
+
+No toca el codigo de la simulacion: reemplaza metodos de esa instancia
+(y de su pool, lista de espera, muestreo y acumuladores) por versiones
+que cuentan y cronometran. Una corrida sin instrumentar no pasa por
+ninguna de estas funciones, asi que no paga nada.
+
+    from instrumentacion import correr_instrumentado, imprimir_instrumentacion
+    r, inst = correr_instrumentado(ESCENARIO_B, motor="rapido")
+    imprimir_instrumentacion(inst.reporte())
+
+perfilar(ruta) es un context manager que perfila lo que corre adentro:
+con ruta *.prof usa cProfile (se abre con snakeviz o flameprof); con
+cualquier otra ruta usa un perfilador por muestreo que guarda pilas
+plegadas ("a;b;c 12" por linea), el formato de flamegraph.pl y
+speedscope. Solo ve el proceso principal: para perfilar replicas usar
+--workers 1.
+
+Desde consola:
+    python instrumentacion.py --escenario b --motor rapido
+    python instrumentacion.py --escenario b --profile perfil.folded
+    python simulacion_apoyo_escolar.py --replicas 10 --workers 1 --profile perfil.prof
+"""
+
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from simulacion_apoyo_escolar import crear_simulacion
+
+NIVELES = ["OPTIMO", "SUBOPTIMO", "GENERALISTA"]
+FASES = ["muestreo", "matching", "kpis"]
+
+
+class _AcumuladorCronometrado:
+    """Acumulador que cronometra agregar (los Acumulador tienen __slots__)."""
+
+    def __init__(self, acumulador, tiempos):
+        self._acumulador = acumulador
+        self._tiempos = tiempos
+
+    def agregar(self, x):
+        t0 = time.perf_counter()
+        self._acumulador.agregar(x)
+        self._tiempos["kpis"] += time.perf_counter() - t0
+
+    def __getattr__(self, nombre):
+        return getattr(self._acumulador, nombre)
+
+
+class Instrumentacion:
+    """Contadores y tiempos por fase de una simulacion."""
+
+    def __init__(self):
+        self.contadores = Counter()
+        self.tiempos = defaultdict(float)
+        self.motor = None
+        self.permitir_generalista = True
+
+    # -- Envolturas --
+
+    def _cronometrar(self, objeto, nombre, fase, contador=None):
+        """Reemplaza objeto.nombre por una version que suma su tiempo a fase."""
+        original = getattr(objeto, nombre)
+        tiempos, contadores = self.tiempos, self.contadores
+        perf_counter = time.perf_counter
+
+        def envuelta(*args, **kwargs):
+            t0 = perf_counter()
+            resultado = original(*args, **kwargs)
+            tiempos[fase] += perf_counter() - t0
+            if contador:
+                contadores[contador] += 1
+            return resultado
+
+        setattr(objeto, nombre, envuelta)
+
+    def _contar(self, objeto, nombre, contador):
+        original = getattr(objeto, nombre)
+        contadores = self.contadores
+
+        def envuelta(*args, **kwargs):
+            contadores[contador] += 1
+            return original(*args, **kwargs)
+
+        setattr(objeto, nombre, envuelta)
+
+    def instrumentar(self, sim):
+        """Engancha los contadores a sim (antes de sim.correr())."""
+        tiempos, contadores = self.tiempos, self.contadores
+        perf_counter = time.perf_counter
+        self.permitir_generalista = sim.permitir_generalista
+        lotes = hasattr(sim, "_emparejar")
+
+        # Eventos
+        if hasattr(sim, "env"):
+            self.motor = "simpy"
+            self._contar(sim.env, "schedule", "eventos_programados")
+            self._contar(sim.env, "step", "eventos_procesados")
+        else:
+            self.motor = "rapido"
+            self._contar(sim, "_programar", "eventos_programados")
+            for metodo, tipo in [("_llegada", "llegada"), ("_fin_evaluacion", "fin_eval"),
+                                 ("_fin_intervencion", "fin_intervencion"),
+                                 ("_abandono", "abandono")]:
+                self._contar(sim, metodo, f"eventos_{tipo}")
+            if lotes:
+                self.motor = "lotes"
+                self._contar(sim, "_evento_extra", "eventos_epoca")
+
+        # Sorteos
+        self._cronometrar(sim.muestreo, "interarribo", "muestreo")
+        self._cronometrar(sim.muestreo, "nino", "muestreo")
+
+        # Matching del lado del niño, con el nivel en que encontro voluntario
+        tomar = sim.pool.tomar
+
+        def tomar_contando(dificultad, area, permitir_generalista):
+            t0 = perf_counter()
+            voluntario, tipo = tomar(dificultad, area, permitir_generalista)
+            tiempos["matching"] += perf_counter() - t0
+            contadores["matching_llamadas"] += 1
+            contadores[f"matching_{tipo or 'sin_voluntario'}"] += 1
+            return voluntario, tipo
+
+        sim.pool.tomar = tomar_contando
+        self._cronometrar(sim.pool, "devolver", "matching")
+
+        # Por lotes no se llama a tomar: los pares salen de _emparejar y
+        # cada uno pasa por _asignar con su nivel de match
+        if lotes:
+            self._cronometrar(sim, "_emparejar", "matching")
+            asignar = sim._asignar
+
+            def asignar_contando(nino, voluntario, tipo):
+                contadores["matching_llamadas"] += 1
+                contadores[f"matching_{tipo}"] += 1
+                return asignar(nino, voluntario, tipo)
+
+            sim._asignar = asignar_contando
+
+        # Lista de espera: niños estacionados y voluntarios que los buscan
+        self._cronometrar(sim.en_espera, "estacionar", "matching", "reintentos_en_espera")
+        self._cronometrar(sim.en_espera, "retirar", "matching")
+        siguiente_para = sim.en_espera.siguiente_para
+
+        def siguiente_contando(voluntario, permitir_generalista):
+            t0 = perf_counter()
+            lugar = siguiente_para(voluntario, permitir_generalista)
+            tiempos["matching"] += perf_counter() - t0
+            contadores["busquedas_desde_voluntario"] += 1
+            if lugar is not None:
+                contadores["reintentos_con_voluntario"] += 1
+            return lugar
+
+        sim.en_espera.siguiente_para = siguiente_contando
+
+        # KPIs: acumuladores en linea y el calculo final
+        for nombre in ("espera", "espera_prof", "espera_vol"):
+            setattr(sim, nombre, _AcumuladorCronometrado(getattr(sim, nombre), tiempos))
+        sim.espera_por_dificultad = {
+            d: _AcumuladorCronometrado(a, tiempos) for d, a in sim.espera_por_dificultad.items()
+        }
+        self._cronometrar(sim, "resultados", "kpis")
+
+        # Tiempo total de la corrida
+        correr = sim.correr
+
+        def correr_cronometrado():
+            t0 = perf_counter()
+            r = correr()
+            tiempos["total"] += perf_counter() - t0
+            contadores["reintentos_abandonos"] += sim.ninos_no_atendidos
+            return r
+
+        sim.correr = correr_cronometrado
+        return sim
+
+    # -- Resumen --
+
+    def reporte(self):
+        """Contadores y tiempos como diccionario (facil de pasar a JSON)."""
+        c = self.contadores
+        niveles = {}
+        intentos = c["matching_llamadas"]
+        for nivel in NIVELES:
+            aciertos = c[f"matching_{nivel}"]
+            niveles[nivel] = {"intentos": intentos, "aciertos": aciertos,
+                              "fallos": intentos - aciertos}
+            intentos -= aciertos
+        # Con politica estricta no se prueban SUBOPTIMO ni GENERALISTA:
+        # los que no encontraron OPTIMO terminan "sin_voluntario" ahi
+        if not self.permitir_generalista:
+            for nivel in NIVELES[1:]:
+                niveles[nivel] = {"intentos": 0, "aciertos": 0, "fallos": 0}
+
+        total = self.tiempos["total"]
+        fases = {f: self.tiempos[f] for f in FASES}
+        fases["motor y modelo"] = max(0.0, total - sum(fases.values()))
+        eventos = {clave[len("eventos_"):]: valor for clave, valor in sorted(c.items())
+                   if clave.startswith("eventos_")}
+        return {
+            "motor": self.motor,
+            "eventos": eventos,
+            "matching": {"llamadas": c["matching_llamadas"], "niveles": niveles,
+                         "sin_voluntario": c["matching_sin_voluntario"],
+                         "busquedas_desde_voluntario": c["busquedas_desde_voluntario"]},
+            "reintentos": {"en_espera": c["reintentos_en_espera"],
+                           "con_voluntario": c["reintentos_con_voluntario"],
+                           "abandonos": c["reintentos_abandonos"]},
+            "tiempos": {"total": total, **fases},
+        }
+
+
+def correr_instrumentado(config, motor=None):
+    """Corre config instrumentado. Devuelve (resultados, Instrumentacion)."""
+    if motor is not None:
+        config = dict(config, motor=motor)
+    inst = Instrumentacion()
+    return inst.instrumentar(crear_simulacion(config)).correr(), inst
+
+
+def imprimir_instrumentacion(rep, nombre=""):
+    """Tabla de contadores y tiempos por fase."""
+    print(f"\n  {'=' * 55}")
+    print(f"  INSTRUMENTACION {nombre} (motor {rep['motor']})")
+    print(f"  {'=' * 55}")
+    print(f"  Eventos: " + ", ".join(f"{k} {v}" for k, v in rep["eventos"].items()))
+
+    m = rep["matching"]
+    print(f"\n  Matching: {m['llamadas']} busquedas al evaluar, "
+          f"{m['sin_voluntario']} sin voluntario")
+    print(f"  {'Nivel':<12} | {'Intentos':>8} | {'Aciertos':>8} | {'Fallos':>8}")
+    for nivel, d in m["niveles"].items():
+        print(f"  {nivel:<12} | {d['intentos']:>8} | {d['aciertos']:>8} | {d['fallos']:>8}")
+
+    r = rep["reintentos"]
+    print(f"\n  Reintentos: {r['en_espera']} niños a la lista de espera, "
+          f"{r['con_voluntario']} consiguieron voluntario, {r['abandonos']} abandonaron "
+          f"({m['busquedas_desde_voluntario']} busquedas al liberarse un voluntario)")
+
+    t = rep["tiempos"]
+    total = t["total"] or 1.0
+    print(f"\n  {'Fase':<16} | {'ms':>9} | {'%':>5}")
+    for fase in FASES + ["motor y modelo"]:
+        print(f"  {fase:<16} | {t[fase] * 1000:>9.2f} | {t[fase] / total:>5.0%}")
+    print(f"  {'total':<16} | {t['total'] * 1000:>9.2f} |")
+    print()
+
+
+# -- Perfiles --
+
+class PerfiladorMuestreo:
+    """
+    Mira la pila del hilo principal cada `intervalo` segundos desde otro
+    hilo y cuenta cada pila plegada "archivo:funcion;...". Mientras corre
+    baja el intervalo de cambio de hilo del interprete para que el
+    muestreo sea parejo.
+    """
+
+    def __init__(self, intervalo=0.001):
+        self.intervalo = intervalo
+        self.pilas = Counter()
+        self._parar = threading.Event()
+
+    def _muestrear(self, hilo):
+        while not self._parar.wait(self.intervalo):
+            frame = sys._current_frames().get(hilo)
+            pila = []
+            while frame is not None:
+                codigo = frame.f_code
+                pila.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                frame = frame.f_back
+            if pila:
+                self.pilas[";".join(reversed(pila))] += 1
+
+    def __enter__(self):
+        self._switch = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch, self.intervalo))
+        self._hilo = threading.Thread(target=self._muestrear,
+                                      args=(threading.get_ident(),), daemon=True)
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._hilo.join()
+        sys.setswitchinterval(self._switch)
+
+    def guardar(self, ruta):
+        with open(ruta, "w") as f:
+            for pila, n in self.pilas.most_common():
+                f.write(f"{pila} {n}\n")
+
+
+@contextmanager
+def perfilar(ruta, intervalo=0.001):
+    """Perfila el bloque: cProfile si ruta termina en .prof, si no muestreo."""
+    if ruta.endswith(".prof"):
+        perfil = cProfile.Profile()
+        perfil.enable()
+        try:
+            yield perfil
+        finally:
+            perfil.disable()
+            perfil.dump_stats(ruta)
+            print(f"\n  Perfil cProfile en {ruta} (snakeviz / flameprof)")
+            pstats.Stats(perfil).sort_stats("tottime").print_stats(10)
+    else:
+        perfilador = PerfiladorMuestreo(intervalo)
+        try:
+            with perfilador:
+                yield perfilador
+        finally:
+            perfilador.guardar(ruta)
+            print(f"\n  {sum(perfilador.pilas.values())} muestras en {ruta} "
+                  "(pilas plegadas: flamegraph.pl o speedscope)")
+
+
+def main(argv=None):
+    from simulacion_apoyo_escolar import (ESCENARIO_A, ESCENARIO_B, ESCENARIO_BASE,
+                                          ESCENARIO_BASE_ESTRICTO, ESCENARIO_C,
+                                          ESCENARIO_D)
+
+    escenarios = {"base": ESCENARIO_BASE, "a": ESCENARIO_A, "b": ESCENARIO_B,
+                  "c": ESCENARIO_C, "d": ESCENARIO_D, "estricto": ESCENARIO_BASE_ESTRICTO}
+    parser = argparse.ArgumentParser(description="Contadores y perfil de una corrida")
+    parser.add_argument("--escenario", choices=list(escenarios), default="b")
+    parser.add_argument("--motor", choices=["simpy", "rapido"], default="simpy")
+    parser.add_argument("--tiempo", type=float, default=None, help="semanas")
+    parser.add_argument("--profile", default=None,
+                        help="perfilar la corrida (sin contadores): *.prof con "
+                             "cProfile, otra ruta con muestreo en pilas plegadas")
+    args = parser.parse_args(argv)
+
+    config = dict(escenarios[args.escenario], motor=args.motor)
+    if args.tiempo:
+        config["tiempo_simulacion"] = args.tiempo
+    if args.profile:
+        with perfilar(args.profile):
+            crear_simulacion(config).correr()
+        return
+    _, inst = correr_instrumentado(config)
+    imprimir_instrumentacion(inst.reporte(), config["nombre"])
+
+
+if __name__ == "__main__":
+    main()
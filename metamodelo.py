@@ -0,0 +1,441 @@
+"""
+Metamodelo: una regresion entrenada con corridas del simulador que
+responde "¿que pasaria si...?" en milisegundos.
+
+Se recorre el espacio de parametros del modo custom del dashboard
+(tasa, semanas, probabilidades de dificultad y area, profesionales,
+cantidad de voluntarios genericos y politica) con un hipercubo latino,
+cada punto con algunas replicas, y se ajusta un proceso gaussiano por
+KPI. El proceso gaussiano da la prediccion y tambien cuanto confiar en
+ella: el intervalo se abre lejos de los puntos simulados.
+
+  - Kernel RBF con una escala por parametro (los que importan poco
+    quedan con escala larga), elegidas maximizando la verosimilitud.
+  - El ruido de cada punto es la varianza de su media entre replicas,
+    asi el modelo no persigue el azar de la simulacion.
+  - No se modela el KPI de cero sino lo que le falta a la estimacion
+    de analitico.py: las formulas de colas ya dan la forma gruesa (la
+    saturacion, el salto de los profesionales) y el proceso gaussiano
+    solo corrige. Con 300 puntos el error baja a la mitad o menos que
+    modelando el KPI directo.
+  - Las esperas se modelan en escala log(1 + x) (son positivas y muy
+    asimetricas); los porcentajes, tal cual.
+
+Solo usa NumPy. El modelo se guarda en un .npz con la version del
+codigo de la simulacion: si la simulacion cambia, hay que reentrenar.
+Fuera de la region entrenada (o con voluntarios que no son los
+genericos) no se predice: ahi hay que simular.
+
+Uso:
+    from metamodelo import cargar_metamodelo
+    modelo = cargar_metamodelo()
+    if modelo.dentro(config):
+        modelo.predecir(config)["espera_prom"]  # {"media", "ic_inf", "ic_sup", ...}
+
+Desde consola:
+    python metamodelo.py --puntos 300 --replicas 5      # entrenar
+    python metamodelo.py --reporte --puntos 60          # precision con puntos nuevos
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import time
+
+import numpy as np
+
+from analitico import estimar
+from barrido import hipercubo_latino
+from cache_resultados import DIRECTORIO, version_modelo
+from replicas import configs_replicas, ejecutar_configs
+from simulacion_apoyo_escolar import ESCENARIO_BASE, generar_voluntarios
+
+RUTA_POR_DEFECTO = os.path.join(DIRECTORIO, "modelos", "metamodelo.npz")
+
+# Region de entrenamiento: los rangos de los sliders del modo custom
+REGION = {
+    "tasa_llegada": (1.0, 15.0),
+    "tiempo_simulacion": (12, 104),
+    "num_profesionales": (1, 5),
+    "n_vol": (2, 15),
+}
+# Variables de entrada, en orden: las de REGION, las probabilidades y la politica
+ENTRADAS = ["tasa_llegada", "tiempo_simulacion", "num_profesionales", "n_vol",
+            "p_leve", "p_moderada", "p_matematica", "p_lectura", "permitir_generalista"]
+
+# KPI -> (se modela en escala log(1 + x), estimacion analitica que se corrige)
+KPIS = {
+    "espera_prom": (True, "espera_prom"),
+    "espera_p90": (True, "espera_prom"),
+    "espera_prof": (True, "espera_prof"),
+    "mal_matching": (False, "mal_matching"),
+    "ocup_prof": (False, "ocup_prof"),
+    "ocup_vol": (False, "ocup_vol"),
+}
+
+
+# -- Puntos y configs --
+
+def config_de(punto, base=ESCENARIO_BASE):
+    """
+    Config del punto. Las probabilidades vienen como fracciones de lo
+    que queda (u_dificultad, u_area), asi cualquier punto del cubo es
+    una distribucion valida.
+    """
+    leve = punto["u_leve"]
+    moderada = punto["u_moderada"] * (1 - leve)
+    mate = punto["u_matematica"]
+    lectura = punto["u_lectura"] * (1 - mate)
+    return dict(
+        base,
+        nombre="Metamodelo",
+        tasa_llegada=punto["tasa_llegada"],
+        tiempo_simulacion=punto["tiempo_simulacion"],
+        prob_dificultad=[leve, moderada, 1 - leve - moderada],
+        prob_area=[mate, lectura, 1 - mate - lectura],
+        num_profesionales=punto["num_profesionales"],
+        voluntarios_spec=generar_voluntarios(punto["n_vol"]),
+        permitir_generalista=punto["permitir_generalista"],
+        max_espera_vol=8,
+    )
+
+
+def puntos_muestra(n, region=REGION, semilla=0):
+    rangos = dict(region)
+    for clave in ("u_leve", "u_moderada", "u_matematica", "u_lectura"):
+        rangos[clave] = (0.0, 1.0)
+    rangos["permitir_generalista"] = [True, False]
+    return hipercubo_latino(rangos, n, semilla)
+
+
+def entradas(config):
+    """Vector de entrada del modelo para un config."""
+    return [
+        config["tasa_llegada"], config["tiempo_simulacion"],
+        config["num_profesionales"], len(config["voluntarios_spec"]),
+        config["prob_dificultad"][0], config["prob_dificultad"][1],
+        config["prob_area"][0], config["prob_area"][1],
+        float(config["permitir_generalista"]),
+    ]
+
+
+def previas(configs):
+    """Estimacion analitica de cada KPI (en su escala) para cada config."""
+    estimaciones = [estimar(c) for c in configs]
+    resultado = {}
+    for kpi, (logaritmica, analitico) in KPIS.items():
+        valores = np.array([e[analitico] for e in estimaciones])
+        resultado[kpi] = np.log1p(valores) if logaritmica else valores
+    return resultado
+
+
+def simular_puntos(configs, replicas, workers=None, cache=None):
+    """
+    Media y varianza de la media de cada KPI en cada config (todas con
+    las mismas semillas de replica). Devuelve (medias, varianzas) como
+    dicts KPI -> array.
+    """
+    todas = [c for config in configs for c in configs_replicas(config, replicas)]
+    corridas = ejecutar_configs(todas, workers, cache=cache)
+    medias, varianzas = {}, {}
+    for kpi in KPIS:
+        valores = np.array([r[kpi] for r in corridas], dtype=float).reshape(len(configs), replicas)
+        medias[kpi] = valores.mean(axis=1)
+        varianzas[kpi] = valores.var(axis=1, ddof=1) / replicas if replicas > 1 else 0 * valores[:, 0]
+    return medias, varianzas
+
+
+# -- Proceso gaussiano --
+
+class ProcesoGaussiano:
+    """
+    Regresion por proceso gaussiano con kernel RBF de una escala por
+    entrada y ruido conocido en cada punto de entrenamiento. Las
+    entradas ya vienen escaladas a [0, 1].
+    """
+
+    def __init__(self, escalas=None, amplitud=1.0):
+        self.escalas = escalas
+        self.amplitud = amplitud
+
+    def _kernel(self, A, B):
+        d = (A[:, None, :] - B[None, :, :]) / self.escalas
+        return self.amplitud * np.exp(-0.5 * np.sum(d * d, axis=2))
+
+    def _log_verosimilitud(self, X, y, ruido):
+        K = self._kernel(X, X)
+        K[np.diag_indices_from(K)] += ruido + 1e-6
+        try:
+            L = np.linalg.cholesky(K)
+        except np.linalg.LinAlgError:
+            return -math.inf
+        alfa = np.linalg.solve(L.T, np.linalg.solve(L, y))
+        return -0.5 * y @ alfa - np.log(np.diag(L)).sum()
+
+    def ajustar(self, X, y, ruido):
+        """
+        Elige escalas y amplitud por busqueda coordenada sobre la
+        verosimilitud marginal (sin derivadas: con pocas entradas y unos
+        cientos de puntos alcanza) y deja listo el modelo.
+        """
+        self.media_y = float(y.mean())
+        self.desvio_y = float(y.std()) or 1.0
+        y = (y - self.media_y) / self.desvio_y
+        ruido = ruido / self.desvio_y ** 2
+        self.escalas = np.full(X.shape[1], 0.5)
+        self.amplitud = 1.0
+
+        mejor = self._log_verosimilitud(X, y, ruido)
+        for factor in (2.0, 1.5, 1.2, 1.1):
+            for i in range(X.shape[1] + 1):
+                for paso in (factor, 1 / factor):
+                    anterior = (self.escalas.copy(), self.amplitud)
+                    if i < X.shape[1]:
+                        self.escalas[i] = min(50.0, max(0.02, self.escalas[i] * paso))
+                    else:
+                        self.amplitud = min(50.0, max(0.01, self.amplitud * paso))
+                    valor = self._log_verosimilitud(X, y, ruido)
+                    if valor > mejor:
+                        mejor = valor
+                        break
+                    self.escalas, self.amplitud = anterior
+
+        K = self._kernel(X, X)
+        K[np.diag_indices_from(K)] += ruido + 1e-6
+        L = np.linalg.cholesky(K)
+        self.X = X
+        self.alfa = np.linalg.solve(L.T, np.linalg.solve(L, y))
+        # Inversa del factor de Cholesky: predecir es solo producto de matrices
+        self.L_inv = np.linalg.inv(L)
+        return self
+
+    def predecir(self, X):
+        """Media y desvio de la prediccion (de la media del KPI)."""
+        k = self._kernel(X, self.X)
+        media = k @ self.alfa
+        v = self.L_inv @ k.T
+        varianza = np.maximum(self.amplitud - np.sum(v * v, axis=0), 0.0)
+        return (media * self.desvio_y + self.media_y,
+                np.sqrt(varianza) * self.desvio_y)
+
+    def estado(self, prefijo):
+        return {
+            f"{prefijo}escalas": self.escalas, f"{prefijo}alfa": self.alfa,
+            f"{prefijo}L_inv": self.L_inv,
+            f"{prefijo}numeros": np.array([self.amplitud, self.media_y, self.desvio_y]),
+        }
+
+    @classmethod
+    def desde_estado(cls, datos, prefijo, X):
+        gp = cls(datos[f"{prefijo}escalas"], float(datos[f"{prefijo}numeros"][0]))
+        gp.media_y, gp.desvio_y = (float(x) for x in datos[f"{prefijo}numeros"][1:])
+        gp.alfa = datos[f"{prefijo}alfa"]
+        gp.L_inv = datos[f"{prefijo}L_inv"]
+        gp.X = X
+        return gp
+
+
+# -- Metamodelo --
+
+class Metamodelo:
+    """Un ProcesoGaussiano por KPI mas la region donde vale."""
+
+    def __init__(self, region, modelos, metadatos):
+        self.region = region
+        self.modelos = modelos
+        self.metadatos = metadatos
+        self._minimos = np.array([region[c][0] for c in REGION] + [0.0] * 5)
+        self._anchos = np.array([region[c][1] - region[c][0] for c in REGION] + [1.0] * 5)
+
+    def _escalar(self, filas):
+        return (np.asarray(filas, dtype=float) - self._minimos) / self._anchos
+
+    def dentro(self, config):
+        """True si el config cae en la region entrenada."""
+        if config["voluntarios_spec"] != generar_voluntarios(len(config["voluntarios_spec"])):
+            return False
+        if config.get("max_espera_vol", 8) != 8:
+            return False
+        valores = dict(zip(ENTRADAS, entradas(config)))
+        return all(self.region[c][0] <= valores[c] <= self.region[c][1] for c in REGION)
+
+    def predecir_muchos(self, configs, nivel=0.95):
+        """Para cada KPI, arrays de media e IC de la media (no de una corrida)."""
+        X = self._escalar([entradas(c) for c in configs])
+        z = statistics.NormalDist().inv_cdf(1 - (1 - nivel) / 2)
+        previa = previas(configs)
+        resultado = {}
+        for kpi, gp in self.modelos.items():
+            media, desvio = gp.predecir(X)
+            media = media + previa[kpi]
+            inf, sup = media - z * desvio, media + z * desvio
+            if KPIS[kpi][0]:
+                media, inf, sup = np.expm1(media), np.expm1(inf), np.expm1(sup)
+            if kpi == "mal_matching":
+                media, inf, sup = (np.minimum(a, 100) for a in (media, inf, sup))
+            resultado[kpi] = {"media": np.maximum(media, 0), "ic_inf": np.maximum(inf, 0),
+                              "ic_sup": np.maximum(sup, 0)}
+        return resultado
+
+    def predecir(self, config, nivel=0.95):
+        """
+        KPIs de un config como {kpi: {"media", "ic_inf", "ic_sup",
+        "semi_ancho"}} (el mismo formato que resumir_replicas).
+        """
+        muchos = self.predecir_muchos([config], nivel)
+        resultado = {}
+        for kpi, valores in muchos.items():
+            fila = {clave: float(v[0]) for clave, v in valores.items()}
+            fila["semi_ancho"] = (fila["ic_sup"] - fila["ic_inf"]) / 2
+            resultado[kpi] = fila
+        return resultado
+
+    def vigente(self):
+        """False si se entreno con otra version de la simulacion."""
+        return self.metadatos["version"] == version_modelo()
+
+    def guardar(self, ruta=RUTA_POR_DEFECTO):
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        arrays = {}
+        X = None
+        for kpi, gp in self.modelos.items():
+            arrays.update(gp.estado(f"{kpi}__"))
+            X = gp.X
+        meta = dict(self.metadatos, region=self.region, kpis=list(self.modelos))
+        np.savez_compressed(ruta, X=X, metadatos=np.array(json.dumps(meta)), **arrays)
+
+
+def cargar_metamodelo(ruta=RUTA_POR_DEFECTO):
+    """Metamodelo guardado, o None si no hay archivo."""
+    if not os.path.exists(ruta):
+        return None
+    with np.load(ruta, allow_pickle=False) as datos:
+        meta = json.loads(str(datos["metadatos"]))
+        X = datos["X"]
+        modelos = {kpi: ProcesoGaussiano.desde_estado(datos, f"{kpi}__", X)
+                   for kpi in meta["kpis"]}
+    region = {c: tuple(v) for c, v in meta.pop("region").items()}
+    meta.pop("kpis")
+    return Metamodelo(region, modelos, meta)
+
+
+def entrenar(puntos=300, replicas=5, region=REGION, semilla=0, workers=None,
+             cache=None, motor="rapido"):
+    """
+    Simula `puntos` puntos del hipercubo latino (cada uno con `replicas`
+    replicas) y ajusta un ProcesoGaussiano por KPI.
+    """
+    base = dict(ESCENARIO_BASE, motor=motor)
+    configs = [config_de(p, base) for p in puntos_muestra(puntos, region, semilla)]
+    medias, varianzas = simular_puntos(configs, replicas, workers, cache)
+
+    modelo = Metamodelo(region, {}, {})
+    X = modelo._escalar([entradas(c) for c in configs])
+    previa = previas(configs)
+    for kpi, (logaritmica, _) in KPIS.items():
+        y, ruido = medias[kpi], varianzas[kpi]
+        if logaritmica:
+            ruido = ruido / (1 + y) ** 2  # varianza de log(1 + media), metodo delta
+            y = np.log1p(y)
+        modelo.modelos[kpi] = ProcesoGaussiano().ajustar(X, y - previa[kpi], ruido)
+    modelo.metadatos = {"version": version_modelo(), "puntos": puntos, "replicas": replicas,
+                        "semilla": semilla, "motor": motor,
+                        "entrenado": time.strftime("%Y-%m-%d %H:%M")}
+    return modelo
+
+
+def reporte(modelo, puntos=60, replicas=None, semilla=1, workers=None, cache=None):
+    """
+    Precision con puntos nuevos (otro hipercubo latino): por KPI, error
+    absoluto medio, R^2 y que parte de las medias simuladas cae en el
+    IC 95% predicho (ensanchado por el ruido de esa media).
+    """
+    replicas = replicas or modelo.metadatos["replicas"]
+    base = dict(ESCENARIO_BASE, motor=modelo.metadatos.get("motor", "rapido"))
+    configs = [config_de(p, base) for p in puntos_muestra(puntos, modelo.region, semilla)]
+    medias, varianzas = simular_puntos(configs, replicas, workers, cache)
+    predicho = modelo.predecir_muchos(configs)
+    filas = {}
+    for kpi in modelo.modelos:
+        real, pred = medias[kpi], predicho[kpi]
+        error = pred["media"] - real
+        ss = np.sum((real - real.mean()) ** 2)
+        semi = (pred["ic_sup"] - pred["ic_inf"]) / 2
+        semi_total = np.sqrt(semi ** 2 + 1.96 ** 2 * varianzas[kpi])
+        filas[kpi] = {
+            "mae": float(np.mean(np.abs(error))),
+            "r2": float(1 - np.sum(error ** 2) / ss) if ss > 0 else 1.0,
+            "cobertura": float(np.mean(np.abs(error) <= semi_total)),
+            "rango": (float(real.min()), float(real.max())),
+        }
+    return filas
+
+
+# -- Consola --
+
+def imprimir_reporte_precision(filas, puntos):
+    print(f"\n  Precision con {puntos} puntos nuevos:\n")
+    print(f"  {'KPI':<14} | {'Error abs medio':>15} | {'R2':>6} | {'Cobertura IC95':>14} | Rango simulado")
+    print(f"  {'-' * 78}")
+    for kpi, f in filas.items():
+        print(f"  {kpi:<14} | {f['mae']:>15.3f} | {f['r2']:>6.3f} | {f['cobertura'] * 100:>13.0f}% | "
+              f"{f['rango'][0]:.1f} a {f['rango'][1]:.1f}")
+    print()
+
+
+def main(argv=None):
+    from barrido import parsear_valores
+
+    parser = argparse.ArgumentParser(description="Entrena o evalua el metamodelo de la simulacion")
+    parser.add_argument("--reporte", action="store_true",
+                        help="no entrenar: medir la precision del modelo guardado")
+    parser.add_argument("--puntos", type=int, default=None,
+                        help="puntos a simular (300 para entrenar, 60 para el reporte)")
+    parser.add_argument("--replicas", type=int, default=5)
+    parser.add_argument("--tasa", help="rango de tasa_llegada, ej. '1:8'")
+    parser.add_argument("--profesionales", help="rango de num_profesionales, ej. '1:5'")
+    parser.add_argument("--voluntarios", help="rango de cantidad de voluntarios, ej. '2:15'")
+    parser.add_argument("--semilla", type=int, default=0, help="semilla del hipercubo latino")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", action="store_true", help="usar el cache de resultados en disco")
+    parser.add_argument("--modelo", default=RUTA_POR_DEFECTO, help="archivo .npz del modelo")
+    args = parser.parse_args(argv)
+    cache = args.cache or None
+
+    if args.reporte:
+        modelo = cargar_metamodelo(args.modelo)
+        if modelo is None:
+            parser.error(f"no hay modelo en {args.modelo}; entrenarlo primero")
+        if not modelo.vigente():
+            print("\n  Atencion: el modelo se entreno con otra version de la simulacion.")
+        puntos = args.puntos or 60
+        inicio = time.perf_counter()
+        filas = reporte(modelo, puntos, args.replicas, args.semilla + 1, args.workers, cache)
+        imprimir_reporte_precision(filas, puntos)
+        print(f"  ({time.perf_counter() - inicio:.1f} s)\n")
+        return
+
+    region = dict(REGION)
+    for clave, texto, tipo in [("tasa_llegada", args.tasa, float),
+                               ("num_profesionales", args.profesionales, int),
+                               ("n_vol", args.voluntarios, int)]:
+        if texto:
+            region[clave] = parsear_valores(texto, tipo, como_rango=True)
+    puntos = args.puntos or 300
+    print(f"\n  Entrenando con {puntos} puntos x {args.replicas} replicas...")
+    inicio = time.perf_counter()
+    modelo = entrenar(puntos, args.replicas, region, args.semilla, args.workers, cache)
+    modelo.guardar(args.modelo)
+    print(f"  Modelo en {args.modelo} ({time.perf_counter() - inicio:.1f} s)")
+
+    filas = reporte(modelo, max(20, puntos // 5), args.replicas, args.semilla + 1,
+                    args.workers, cache)
+    imprimir_reporte_precision(filas, max(20, puntos // 5))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Motor rapido: el mismo modelo del Centro de Apoyo Escolar sin SimPy.
+
+El recorrido de un niño es siempre el mismo (llega, espera al Equipo
+Profesional, lo evaluan, se le busca voluntario, recibe la
+intervencion), asi que no hacen falta generadores ni procesos: alcanza
+con un heap de eventos tipados (tiempo, orden, tipo, niño) y una cola
+FIFO para el Equipo Profesional.
+
+Usa la misma fuente de azar, el mismo pool de voluntarios, la
+misma lista de espera y el mismo calculo de KPIs que la Simulacion de
+SimPy (hereda de ella), asi que los resultados son estadisticamente
+iguales; solo cambia el orden de algunos empates en el mismo instante.
+
+Se elige con correr_simulacion(config, motor="rapido") o con
+config["motor"] = "rapido" (tambien en las replicas).
+"""
+
+import heapq
+import itertools
+from collections import deque
+
+from simulacion_apoyo_escolar import Simulacion, tipo_de_match
+
+# Tipos de evento
+LLEGADA, FIN_EVAL, FIN_INTERVENCION, ABANDONO = range(4)
+
+
+class Nino:
+    """Estado de un niño mientras recorre el sistema."""
+
+    __slots__ = ("numero", "dificultad", "area", "duracion_eval", "duracion",
+                 "t_llegada", "t_fin_eval", "lugar", "voluntario")
+
+    def __init__(self, numero, t_llegada, dificultad, area, duracion_eval, duracion):
+        self.numero = numero
+        self.t_llegada = t_llegada
+        self.dificultad = dificultad
+        self.area = area
+        self.duracion_eval = duracion_eval
+        self.duracion = duracion
+        self.t_fin_eval = None
+        self.lugar = None
+        self.voluntario = None
+
+
+class SimulacionRapida(Simulacion):
+    """Simulacion con un nucleo de eventos discretos sobre heapq."""
+
+    def _crear_entorno(self):
+        self.ahora = 0.0
+        self.eventos = []                 # heap de (tiempo, orden, tipo, niño)
+        self._orden = itertools.count()
+        self.prof_libres = self.config["num_profesionales"]
+        self.cola_prof = deque()          # FIFO de niños esperando evaluacion
+
+    def _programar(self, demora, tipo, nino):
+        heapq.heappush(self.eventos,
+                       (self.ahora + demora, next(self._orden), tipo, nino))
+
+    # -- Fases --
+
+    def _iniciar_evaluacion(self, nino):
+        self.prof_libres -= 1
+        self.espera_prof.agregar(self.ahora - nino.t_llegada)
+        if self.detallado:
+            self._evento(self.ahora, "evaluacion", nino.numero,
+                         espera=self.ahora - nino.t_llegada, duracion=nino.duracion_eval)
+        self.tiempo_uso_prof += nino.duracion_eval
+        self._programar(nino.duracion_eval, FIN_EVAL, nino)
+
+    def _asignar(self, nino, voluntario, tipo):
+        espera_vol = self.ahora - nino.t_fin_eval
+        self.espera_vol.agregar(espera_vol)
+        self.espera_por_dificultad[nino.dificultad].agregar(espera_vol)
+        self.matches[tipo] += 1
+        nino.voluntario = voluntario
+        if self.detallado:
+            self._evento_asignacion(self.ahora, nino.numero, voluntario, tipo, espera_vol)
+        self._programar(nino.duracion, FIN_INTERVENCION, nino)
+
+    def _llegada(self):
+        self.ninos_llegaron += 1
+        nino = Nino(self.ninos_llegaron, self.ahora, *self.muestreo.nino())
+        if self.detallado:
+            self._evento(self.ahora, "llegada", nino.numero,
+                         dificultad=nino.dificultad, area=nino.area)
+        self._programar(self.muestreo.interarribo(), LLEGADA, None)
+        self._pedir_evaluacion(nino)
+
+    def _pedir_evaluacion(self, nino):
+        if self.prof_libres > 0:
+            self._iniciar_evaluacion(nino)
+        else:
+            self.cola_prof.append(nino)
+
+    def _fin_evaluacion(self, nino):
+        self.prof_libres += 1
+        if self.cola_prof:
+            self._iniciar_evaluacion(self.cola_prof.popleft())
+        self._buscar_voluntario(nino)
+
+    def _buscar_voluntario(self, nino):
+        nino.t_fin_eval = self.ahora
+        voluntario, tipo = self.pool.tomar(nino.dificultad, nino.area,
+                                           self.permitir_generalista)
+        if voluntario is not None:
+            self._asignar(nino, voluntario, tipo)
+        else:
+            nino.lugar = self.en_espera.estacionar(nino.dificultad, nino.area, nino,
+                                                   self.ahora)
+            self._programar(self.max_espera_vol, ABANDONO, nino)
+
+    def _fin_intervencion(self, nino):
+        voluntario = nino.voluntario
+        self.pool.tiempo_ocupado[voluntario.indice] += nino.duracion
+        self.ninos_atendidos += 1
+        self.espera.agregar(self.ahora - nino.t_llegada - nino.duracion)
+        if self.detallado:
+            self._evento(self.ahora, "fin", nino.numero, duracion=nino.duracion,
+                         voluntario=voluntario.nombre)
+
+        self._voluntario_libre(voluntario)
+
+    def _voluntario_libre(self, voluntario):
+        # Si alguien esperaba a este voluntario, pasa directo a ese niño
+        lugar = self.en_espera.siguiente_para(voluntario, self.permitir_generalista)
+        if lugar is None:
+            self.pool.devolver(voluntario)
+            return
+        siguiente = lugar.aviso
+        self._asignar(siguiente, voluntario,
+                      tipo_de_match(voluntario, siguiente.dificultad, siguiente.area))
+
+    def _abandono(self, nino):
+        if not nino.lugar.activo:
+            return  # ya le habian asignado voluntario
+        self.en_espera.retirar(nino.lugar)
+        self._registrar_abandono(nino)
+
+    def _registrar_abandono(self, nino):
+        self.ninos_no_atendidos += 1
+        self.espera_por_dificultad[nino.dificultad].agregar(self.ahora - nino.t_fin_eval)
+        if self.detallado:
+            self._evento(self.ahora, "abandono", nino.numero,
+                         espera=self.ahora - nino.t_fin_eval)
+
+    # -- Bucle principal --
+
+    def correr(self):
+        """Procesa eventos hasta tiempo_simulacion y devuelve los KPIs."""
+        fin = self.config["tiempo_simulacion"]
+        self.arrancar()
+        self.avanzar(fin)
+        self.ahora = fin
+        return self.resultados()
+
+    def arrancar(self):
+        """Programa la primera llegada."""
+        self._programar(self.muestreo.interarribo(), LLEGADA, None)
+
+    def avanzar(self, hasta):
+        """
+        Procesa los eventos anteriores a `hasta` y se detiene. Sirve para
+        correr de a ventanas (ver federacion.py); correr() avanza de una.
+        """
+        eventos = self.eventos
+        heappop = heapq.heappop
+        while eventos and eventos[0][0] < hasta:
+            self.ahora, _, tipo, nino = heappop(eventos)
+            if tipo == LLEGADA:
+                self._llegada()
+            elif tipo == FIN_EVAL:
+                self._fin_evaluacion(nino)
+            elif tipo == FIN_INTERVENCION:
+                self._fin_intervencion(nino)
+            elif tipo == ABANDONO:
+                self._abandono(nino)
+            else:
+                self._evento_extra(tipo, nino)
+
+    def _evento_extra(self, tipo, nino):
+        """Eventos de tipos >= 4 que agregan las subclases."""
+        raise ValueError(f"Tipo de evento desconocido: {tipo!r}")
@@ -0,0 +1,187 @@
+"""
+Muestreo con NumPy: todo lo aleatorio de una corrida sorteado en bloques.
+
+En vez de hacer varias llamadas sueltas a random por cada niño (el
+tiempo hasta la proxima llegada, dificultad, area y las dos
+duraciones), se sortean bloques enteros con NumPy y la simulacion los
+va sacando de a uno. Cuando un bloque se termina se sortea otro, asi
+que una corrida larga nunca se queda sin numeros.
+
+  - Llegadas: exponenciales por transformada inversa, -ln(1 - U) / tasa.
+  - Dificultad y area: searchsorted de U sobre las probabilidades
+    acumuladas (el mismo corte que generar_atributos_nino).
+  - Duraciones: normal con minimo, max(minimo, X), igual que el
+    muestreo estandar.
+
+Se mantienen los numeros aleatorios comunes (un generador por fuente,
+derivado de la semilla del escenario) y el modo antitetico. Los
+resultados son estadisticamente iguales a los del muestreo estandar,
+pero no identicos numero a numero: son otros generadores.
+
+Se elige con config["muestreo"] = "numpy". sortear_replicas sortea
+los niños de muchas replicas de una vez, con las mismas semillas que
+usan las replicas (replicas.configs_replicas).
+"""
+
+import hashlib
+import math
+
+import numpy as np
+
+from replicas import configs_replicas
+from simulacion_apoyo_escolar import (
+    EVAL_DESVIO, EVAL_MEDIA, EVAL_MINIMO,
+    INTERV_DESVIO, INTERV_MEDIA, INTERV_MINIMO,
+)
+
+AREAS = ("matematica", "lectura", "grafismo")
+FUENTES = ("llegadas", "atributos", "evaluacion", "intervencion")
+BLOQUE = 1024  # niños por bloque despues del primero
+
+
+def generadores(semilla):
+    """Un Generator de NumPy por fuente de azar, derivados de la semilla."""
+    if not isinstance(semilla, int):
+        semilla = int.from_bytes(hashlib.sha256(str(semilla).encode()).digest()[:16], "big")
+    return [np.random.default_rng(np.random.SeedSequence(semilla, spawn_key=(k,)))
+            for k in range(len(FUENTES))]
+
+
+def sortear_llegadas(rng, tasa, forma, antitetico=False):
+    """Tiempos entre llegadas con la forma pedida."""
+    u = rng.random(forma)
+    if antitetico:
+        u = 1.0 - u
+    return -np.log(np.maximum(1.0 - u, 1e-300)) / tasa
+
+
+def _duraciones(rng, media, desvio, minimo, forma, antitetico):
+    x = rng.normal(media, desvio, forma)
+    if antitetico:
+        x = 2 * media - x
+    return np.maximum(minimo, x)
+
+
+def sortear_ninos(rngs, prob_dificultad, prob_area, forma, antitetico=False):
+    """
+    Atributos y duraciones de `forma` niños. Devuelve cuatro arrays:
+    dificultad (1-3), indice de area en AREAS, duracion de la evaluacion
+    y de la intervencion.
+    """
+    rng_atributos, rng_eval, rng_intervencion = rngs
+    cortes_dif = np.cumsum(prob_dificultad[:2])
+    cortes_area = np.cumsum(prob_area[:2])
+    dificultad = np.searchsorted(cortes_dif, rng_atributos.random(forma), side="right") + 1
+    area = np.searchsorted(cortes_area, rng_atributos.random(forma), side="right")
+    duracion_eval = _duraciones(rng_eval, EVAL_MEDIA, EVAL_DESVIO, EVAL_MINIMO,
+                                forma, antitetico)
+    duracion = _duraciones(rng_intervencion, INTERV_MEDIA, INTERV_DESVIO,
+                           INTERV_MINIMO, forma, antitetico)
+    return dificultad, area, duracion_eval, duracion
+
+
+class MuestreoNumpy:
+    """
+    Misma interfaz que MuestreoEstandar (interarribo y nino), pero
+    sacando de bloques pre-sorteados.
+
+    Los bloques se guardan como listas de Python dadas vuelta: sacar el
+    siguiente numero es un pop(), mucho mas barato que indexar un array
+    de NumPy de a un elemento.
+
+    El primer bloque alcanza para las llegadas esperadas (tasa * tiempo,
+    con margen) asi una corrida corta no sortea de mas; si hacen falta
+    mas se sortean de a `bloque`.
+    """
+
+    def __init__(self, config, bloque=BLOQUE):
+        self.antitetico = config.get("antitetico", False)
+        self.tasa = config["tasa_llegada"]
+        self.prob_dificultad = config["prob_dificultad"]
+        self.prob_area = config["prob_area"]
+        self.bloque = bloque
+        esperados = self.tasa * config["tiempo_simulacion"]
+        self._primero = int(esperados + 4 * math.sqrt(esperados)) + 8
+        self.rng_llegadas, *self.rngs_nino = generadores(config["semilla"])
+        self._llegadas = []
+        self._ninos = []
+        self._bloques_llegadas = 0
+        self._bloques_ninos = 0
+
+    def _tamano(self, sorteados):
+        return self.bloque if sorteados else self._primero
+
+    def _rellenar_llegadas(self):
+        tiempos = sortear_llegadas(self.rng_llegadas, self.tasa,
+                                   self._tamano(self._bloques_llegadas),
+                                   self.antitetico)
+        self._bloques_llegadas += 1
+        self._llegadas = tiempos[::-1].tolist()
+
+    def _rellenar_ninos(self):
+        dificultad, area, duracion_eval, duracion = sortear_ninos(
+            self.rngs_nino, self.prob_dificultad, self.prob_area,
+            self._tamano(self._bloques_ninos), self.antitetico
+        )
+        self._bloques_ninos += 1
+        areas = [AREAS[a] for a in area.tolist()]
+        ninos = list(zip(dificultad.tolist(), areas,
+                         duracion_eval.tolist(), duracion.tolist()))
+        ninos.reverse()
+        self._ninos = ninos
+
+    def sortear_primeros(self, n):
+        """
+        Los primeros n interarribos y niños como arrays, con los mismos
+        bloques que sacarian interarribo() y nino() (la particion en
+        bloques cambia que numeros salen de cada generador). Usa los
+        generadores: llamarlo sobre un muestreo recien creado.
+        """
+        bloques = []
+        while sum(len(b[0]) for b in bloques) < n:
+            tamano = self._tamano(len(bloques))
+            bloques.append((sortear_llegadas(self.rng_llegadas, self.tasa, tamano,
+                                             self.antitetico),)
+                           + sortear_ninos(self.rngs_nino, self.prob_dificultad,
+                                           self.prob_area, tamano, self.antitetico))
+        return tuple(np.concatenate(columna)[:n] for columna in zip(*bloques))
+
+    def interarribo(self):
+        if not self._llegadas:
+            self._rellenar_llegadas()
+        return self._llegadas.pop()
+
+    def nino(self):
+        """(dificultad, area, duracion_eval, duracion) del proximo niño."""
+        if not self._ninos:
+            self._rellenar_ninos()
+        return self._ninos.pop()
+
+
+def sortear_replicas(config, replicas, n, semilla=None, desde=0):
+    """
+    Sortea los primeros n niños de las replicas [desde, desde+replicas)
+    en arrays de forma (replicas, n), sin correr la simulacion. Sirve
+    para calculos vectorizados sobre las entradas (por ejemplo comparar
+    la demanda sorteada contra la teorica).
+
+    La fila i es exactamente lo que MuestreoNumpy le da a la replica
+    desde+i de configs_replicas(config, ...): misma semilla por replica
+    (semilla_replica), mismo generador por fuente y mismos bloques. Como
+    cada replica tiene su propia corriente, se sortea una fila por
+    replica y fuente.
+
+    Devuelve un dict con arrays "interarribos", "llegadas" (tiempos
+    acumulados), "dificultad", "area", "duracion_eval" y "duracion".
+    """
+    filas = [MuestreoNumpy(c).sortear_primeros(n)
+             for c in configs_replicas(config, replicas, semilla, desde)]
+    interarribos, dificultad, area, duracion_eval, duracion = map(np.stack, zip(*filas))
+    return {
+        "interarribos": interarribos,
+        "llegadas": np.cumsum(interarribos, axis=1),
+        "dificultad": dificultad,
+        "area": area,
+        "duracion_eval": duracion_eval,
+        "duracion": duracion,
+    }
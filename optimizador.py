@@ -0,0 +1,486 @@
+"""
+Dotacion minima: la combinacion mas barata de profesionales y
+voluntarios (por area y expertise) que cumple un objetivo de servicio.
+
+La pregunta es "¿cuantos profesionales y que voluntarios hacen falta
+para que la espera promedio quede debajo de X semanas y el mal matching
+debajo de Y%?". Ademas los que se van sin atencion no pueden pasar de
+sin_atencion_max (5% por defecto): la espera promedio solo cuenta a los
+atendidos, asi que sin ese limite sacar voluntarios y dejar que los
+niños abandonen pareceria gratis. Probar todas las combinaciones es imposible (9 tipos de
+voluntario, cada uno de 0 a 10, son 10^9 mezclas por cada cantidad de
+profesionales), asi que se busca en dos pasos:
+
+  1. Profesionales: biseccion entera sobre num_profesionales con una
+     mezcla de voluntarios holgada (ver mezcla_holgada), buscando el
+     minimo que cumple. Supone que mas profesionales nunca empeoran.
+  2. Voluntarios: con esos profesionales (y uno o dos mas, para ver el
+     canje entre los dos recursos) se parte de la mezcla holgada y se
+     biseca la cantidad de cada tipo de voluntario. Despues se pule de a
+     un paso (sacar un voluntario o bajarle un nivel de expertise),
+     evaluando todos los vecinos a la vez y quedandose con el que mas
+     ahorra entre los que siguen cumpliendo.
+
+Para que las pocas simulaciones rindan:
+
+  - Todos los candidatos usan las mismas semillas de replica (numeros
+    aleatorios comunes): la diferencia entre dos mezclas vecinas es la
+    mezcla y no el azar.
+  - Replicas por etapas: cada candidato arranca con pocas replicas y
+    solo los dudosos (el IC de algun KPI cruza el limite) reciben mas.
+    Los que claramente no cumplen se descartan enseguida.
+  - Los candidatos de cada paso (y sus replicas) corren juntos en el
+    pool de procesos, y con cache no se repite ninguna corrida.
+
+Al final se arma el frente de Pareto de todo lo evaluado: costo contra
+espera promedio y mal matching.
+
+Uso:
+    from optimizador import optimizar
+    res = optimizar(ESCENARIO_BASE, espera_max=1.0, mal_matching_max=20)
+    res["mejor"], res["frente"], res["corridas"]
+
+Desde consola:
+    python optimizador.py --escenario base --espera-max 1 --mal-matching-max 20
+"""
+
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from replicas import configs_replicas, ejecutar_configs, resumir_valores
+from simulacion_apoyo_escolar import (
+    ESCENARIO_A,
+    ESCENARIO_B,
+    ESCENARIO_BASE,
+    ESCENARIO_C,
+    ESCENARIO_D,
+    EVAL_DESVIO,
+    EVAL_MEDIA,
+    EVAL_MINIMO,
+    INTERV_DESVIO,
+    INTERV_MEDIA,
+    INTERV_MINIMO,
+    media_duracion,
+)
+
+AREAS = ["matematica", "lectura", "grafismo"]
+# Tipos de voluntario: una cantidad por cada (area, expertise)
+CELDAS = [(area, exp) for area in AREAS for exp in (1, 2, 3)]
+
+# Costo semanal relativo de cada recurso
+COSTOS = {"profesional": 5.0, "voluntario": {1: 1.0, 2: 1.5, 3: 2.0}}
+
+SIN_ATENCION_MAX = 5.0  # % de niños que se van sin voluntario, por defecto
+
+
+# -- Candidatos --
+
+def costo(profesionales, cantidades, costos=COSTOS):
+    vol = costos["voluntario"]
+    return profesionales * costos["profesional"] + sum(
+        n * vol[exp] for (_, exp), n in zip(CELDAS, cantidades))
+
+
+def spec_voluntarios(cantidades):
+    """voluntarios_spec con `cantidades[i]` voluntarios de CELDAS[i]."""
+    spec = []
+    for (area, exp), n in zip(CELDAS, cantidades):
+        for _ in range(n):
+            spec.append({"nombre": f"Vol-{len(spec) + 1:02d}", "expertise": exp, "area": area})
+    return spec
+
+
+def describir(cantidades):
+    """'matematica 2xE1 1xE3 | lectura 1xE2' (solo los tipos que hay)."""
+    partes = []
+    for area in AREAS:
+        tipos = [f"{n}xE{exp}" for (a, exp), n in zip(CELDAS, cantidades) if a == area and n]
+        if tipos:
+            partes.append(f"{area} {' '.join(tipos)}")
+    return " | ".join(partes) or "sin voluntarios"
+
+
+def config_dotacion(base, profesionales, cantidades):
+    return dict(
+        base,
+        nombre=f"{profesionales} prof, {sum(cantidades)} vol",
+        num_profesionales=profesionales,
+        voluntarios_spec=spec_voluntarios(cantidades),
+    )
+
+
+def mezcla_holgada(config, holgura=1.5):
+    """
+    Voluntarios de sobra: para cada area y dificultad, `holgura` veces
+    los voluntarios que estarian ocupados en promedio con niños de ese
+    tipo (tasa * probabilidades * duracion media de la intervencion),
+    mas uno, todos con expertise igual a la dificultad.
+    """
+    duracion = media_duracion(INTERV_MEDIA, INTERV_DESVIO, INTERV_MINIMO)
+    cantidades = []
+    for area, exp in CELDAS:
+        carga = (config["tasa_llegada"] * config["prob_area"][AREAS.index(area)]
+                 * config["prob_dificultad"][exp - 1] * duracion)
+        cantidades.append(math.ceil(holgura * carga) + 1)
+    return tuple(cantidades)
+
+
+def vecinos(cantidades):
+    """
+    Mezclas un paso mas baratas: un voluntario menos o un nivel menos.
+    Nunca sin voluntarios.
+    """
+    resultado = []
+    for i, (_, exp) in enumerate(CELDAS):
+        if not cantidades[i]:
+            continue
+        menos = list(cantidades)
+        menos[i] -= 1
+        if any(menos):
+            resultado.append(tuple(menos))
+        if exp > 1:
+            bajado = list(menos)
+            bajado[i - 1] += 1  # la celda anterior es la misma area, un nivel menos
+            resultado.append(tuple(bajado))
+    return resultado
+
+
+# -- Evaluacion --
+
+def porcentaje_sin_atencion(r):
+    """% de los niños que salieron del sistema que se fueron sin voluntario."""
+    salieron = r["atendidos"] + r["no_atendidos"]
+    return r["no_atendidos"] * 100 / salieron if salieron else 0.0
+
+
+class Evaluador:
+    """
+    Corre candidatos (profesionales, cantidades) con replicas por etapas
+    y decide si cumplen los limites.
+
+    Un candidato cumple si los IC de la espera promedio, del mal matching
+    y del % sin atencion quedan todos debajo de sus limites, y no cumple
+    si alguno queda entero por encima. Mientras este en duda se le agregan `paso`
+    replicas, hasta `replicas_max`; ahi se decide por las medias.
+    """
+
+    def __init__(self, base, espera_max, mal_matching_max, replicas_min=5,
+                 replicas_max=20, paso=5, nivel=0.95, costos=COSTOS,
+                 ejecutor=None, cache=None, sin_atencion_max=SIN_ATENCION_MAX):
+        self.base = base
+        self.espera_max = espera_max
+        self.mal_matching_max = mal_matching_max
+        self.sin_atencion_max = sin_atencion_max
+        self.replicas_min = replicas_min
+        self.replicas_max = replicas_max
+        self.paso = paso
+        self.nivel = nivel
+        self.costos = costos
+        self.ejecutor = ejecutor
+        self.cache = cache
+        self.evaluados = {}   # (profesionales, cantidades) -> fila
+        self.corridas = 0
+
+    def _decidir(self, fila):
+        espera = resumir_valores(fila["_espera"], self.nivel)
+        mal = resumir_valores(fila["_mal"], self.nivel)
+        sin = resumir_valores(fila["_sin_atencion"], self.nivel)
+        fila["replicas"] = len(fila["_espera"])
+        fila["espera_prom"] = espera["media"]
+        fila["espera_ic"] = espera["semi_ancho"]
+        fila["mal_matching"] = mal["media"]
+        fila["mal_matching_ic"] = mal["semi_ancho"]
+        fila["no_atendidos"] = sum(fila["_no_atendidos"]) / fila["replicas"]
+        fila["sin_atencion"] = sin["media"]
+        fila["sin_atencion_ic"] = sin["semi_ancho"]
+        limites = [(espera, self.espera_max), (mal, self.mal_matching_max),
+                   (sin, self.sin_atencion_max)]
+        if any(kpi["ic_inf"] > limite for kpi, limite in limites):
+            fila["cumple"] = False
+        elif all(kpi["ic_sup"] <= limite for kpi, limite in limites):
+            fila["cumple"] = True
+        elif fila["replicas"] >= self.replicas_max:
+            fila["cumple"] = all(kpi["media"] <= limite for kpi, limite in limites)
+        else:
+            fila["cumple"] = None
+
+    def evaluar(self, candidatos):
+        """Evalua varios candidatos juntos y devuelve sus filas en orden."""
+        for profesionales, cantidades in candidatos:
+            if (profesionales, cantidades) not in self.evaluados:
+                self.evaluados[(profesionales, cantidades)] = {
+                    "profesionales": profesionales,
+                    "cantidades": cantidades,
+                    "voluntarios": sum(cantidades),
+                    "mezcla": describir(cantidades),
+                    "costo": costo(profesionales, cantidades, self.costos),
+                    "cumple": None,
+                    "_espera": [], "_mal": [], "_no_atendidos": [], "_sin_atencion": [],
+                }
+        filas = [self.evaluados[c] for c in candidatos]
+
+        while True:
+            # Todas las replicas que faltan de todos los dudosos, en un solo lote
+            lote = []
+            dudosos = {id(f): f for f in filas if f["cumple"] is None}
+            for fila in dudosos.values():
+                hechas = len(fila["_espera"])
+                n = self.replicas_min if hechas == 0 else min(self.paso, self.replicas_max - hechas)
+                config = config_dotacion(self.base, fila["profesionales"], fila["cantidades"])
+                lote += [(fila, c) for c in configs_replicas(config, n, desde=hechas)]
+            if not lote:
+                return filas
+
+            resultados = ejecutar_configs([c for _, c in lote], workers=1,
+                                          ejecutor=self.ejecutor, cache=self.cache)
+            self.corridas += len(lote)
+            for (fila, _), r in zip(lote, resultados):
+                fila["_espera"].append(r["espera_prom"])
+                fila["_mal"].append(r["mal_matching"])
+                fila["_no_atendidos"].append(r["no_atendidos"])
+                fila["_sin_atencion"].append(porcentaje_sin_atencion(r))
+            for fila in dudosos.values():
+                self._decidir(fila)
+
+    def filas(self):
+        return [{k: v for k, v in f.items() if not k.startswith("_")}
+                for f in self.evaluados.values() if f["cumple"] is not None]
+
+
+# -- Busqueda --
+
+def profesionales_minimos(evaluador, cantidades, max_profesionales=30):
+    """
+    Menor num_profesionales que cumple con esos voluntarios, o None.
+    Arranca en la minima cantidad estable (ocupacion < 100%), duplica
+    hasta encontrar uno que cumpla y despues biseca.
+    """
+    carga = evaluador.base["tasa_llegada"] * media_duracion(EVAL_MEDIA, EVAL_DESVIO, EVAL_MINIMO)
+    alto = min(max_profesionales, math.floor(carga) + 1)
+    bajo = 0  # el mayor que se sabe que no cumple
+    while not evaluador.evaluar([(alto, cantidades)])[0]["cumple"]:
+        if alto >= max_profesionales:
+            return None
+        bajo = alto
+        alto = min(max_profesionales, alto * 2)
+    while alto - bajo > 1:
+        medio = (alto + bajo) // 2
+        if evaluador.evaluar([(medio, cantidades)])[0]["cumple"]:
+            alto = medio
+        else:
+            bajo = medio
+    return alto
+
+
+def _fallidas(evaluador, profesionales):
+    return [c for (p, c), f in evaluador.evaluados.items()
+            if p == profesionales and f["cumple"] is False]
+
+
+def _cubierta(cantidades, fallidas):
+    """Tiene a lo sumo los voluntarios de una mezcla que ya no cumplio."""
+    return any(all(x <= y for x, y in zip(cantidades, c)) for c in fallidas)
+
+
+def abaratar_voluntarios(evaluador, profesionales, cantidades):
+    """
+    Desde una mezcla que cumple, busca una mas barata que siga cumpliendo.
+
+    Primero biseca la cantidad de cada tipo de voluntario (los mas caros
+    primero) dejando los demas fijos. Despues pule: va al vecino que
+    cumple y mas ahorra (a igual ahorro, el de menor espera) hasta que
+    ninguno cumple. Supone que sacar voluntarios nunca ayuda, asi que no
+    simula mezclas con menos de cada tipo que una que ya fallo, y nunca
+    prueba una mezcla sin voluntarios.
+    """
+    precio = evaluador.costos["voluntario"]
+    actual = list(cantidades)
+    for i in sorted(range(len(CELDAS)), key=lambda i: -precio[CELDAS[i][1]]):
+        bajo, alto = -1, actual[i]  # bajo: el mayor que se sabe que no cumple
+        while alto - bajo > 1:
+            medio = (alto + bajo) // 2
+            prueba = tuple(actual[:i] + [medio] + actual[i + 1:])
+            if not any(prueba) or _cubierta(prueba, _fallidas(evaluador, profesionales)):
+                bajo = medio
+            elif evaluador.evaluar([(profesionales, prueba)])[0]["cumple"]:
+                alto = medio
+            else:
+                bajo = medio
+        actual[i] = alto
+
+    actual = tuple(actual)
+    while True:
+        fallidas = _fallidas(evaluador, profesionales)
+        candidatos = [(profesionales, v) for v in vecinos(actual)
+                      if not _cubierta(v, fallidas)]
+        if not candidatos:
+            return actual
+        filas = [f for f in evaluador.evaluar(candidatos) if f["cumple"]]
+        if not filas:
+            return actual
+        mejor = min(filas, key=lambda f: (f["costo"], f["espera_prom"]))
+        actual = mejor["cantidades"]
+
+
+def frente_pareto(filas):
+    """Filas no dominadas en (costo, espera_prom, mal_matching), por costo."""
+    claves = [(f["costo"], f["espera_prom"], f["mal_matching"]) for f in filas]
+    frente = []
+    for i, a in enumerate(claves):
+        dominada = any(
+            all(x <= y for x, y in zip(b, a)) and b != a
+            for j, b in enumerate(claves) if j != i
+        )
+        if not dominada:
+            frente.append(filas[i])
+    return sorted(frente, key=lambda f: (f["costo"], f["espera_prom"]))
+
+
+def tamano_grilla(cantidades, profesionales):
+    """Combinaciones de una grilla que cubra lo mismo que la busqueda."""
+    return profesionales * math.prod(n + 1 for n in cantidades)
+
+
+def optimizar(base, espera_max, mal_matching_max, replicas_min=5, replicas_max=20,
+              paso=5, profesionales_extra=1, holgura=1.5, max_profesionales=30,
+              costos=COSTOS, workers=None, semilla=None, nivel=0.95, cache=None,
+              ejecutor=None, al_avanzar=None, sin_atencion_max=SIN_ATENCION_MAX):
+    """
+    Busca la dotacion mas barata con espera_prom <= espera_max (semanas),
+    mal_matching <= mal_matching_max (%) y a lo sumo sin_atencion_max (%)
+    de niños que se van sin voluntario. Devuelve un dict con:
+
+      - mejor: la fila mas barata que cumple (None si ninguna cumple)
+      - frente: frente de Pareto costo / espera / mal matching
+      - evaluados: todas las filas evaluadas
+      - corridas: simulaciones usadas; grilla: candidatos de una grilla
+        que cubra lo mismo (cada uno con sus replicas)
+
+    Cada fila trae profesionales, cantidades (una por CELDAS), mezcla
+    (texto), costo, cumple, replicas, espera_prom, espera_ic,
+    mal_matching, mal_matching_ic, no_atendidos (por corrida),
+    sin_atencion y sin_atencion_ic (%).
+
+    profesionales_extra: ademas del minimo de profesionales, se
+    abaratan los voluntarios con 1, 2... profesionales mas.
+    ejecutor: un ProcessPoolExecutor ya abierto (si no, se abre uno con
+    `workers` procesos). cache: como en ejecutar_configs.
+    al_avanzar(texto): se llama al terminar cada etapa.
+    """
+    if semilla is not None:
+        base = dict(base, semilla=semilla)
+    avisar = al_avanzar or (lambda texto: None)
+    propio = None
+    if ejecutor is None:
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers > 1:
+            ejecutor = propio = ProcessPoolExecutor(max_workers=workers)
+    evaluador = Evaluador(base, espera_max, mal_matching_max, replicas_min,
+                          replicas_max, paso, nivel, costos, ejecutor, cache,
+                          sin_atencion_max)
+    tope = max_profesionales
+    try:
+        holgada = mezcla_holgada(base, holgura)
+        minimo = profesionales_minimos(evaluador, holgada, max_profesionales)
+        if minimo is None:
+            avisar(f"Ni con {max_profesionales} profesionales y "
+                   f"{sum(holgada)} voluntarios se cumple el objetivo")
+        else:
+            avisar(f"Profesionales: minimo {minimo} ({evaluador.corridas} corridas)")
+            tope = min(max_profesionales, minimo + profesionales_extra)
+            for profesionales in range(minimo, tope + 1):
+                mezcla = abaratar_voluntarios(evaluador, profesionales, holgada)
+                avisar(f"Con {profesionales} prof: {sum(mezcla)} voluntarios, costo "
+                       f"{costo(profesionales, mezcla, costos):.1f} "
+                       f"({evaluador.corridas} corridas)")
+    finally:
+        if propio is not None:
+            propio.shutdown()
+
+    filas = evaluador.filas()
+    cumplen = [f for f in filas if f["cumple"]]
+    return {
+        "mejor": min(cumplen, key=lambda f: (f["costo"], f["espera_prom"])) if cumplen else None,
+        "frente": frente_pareto(filas),
+        "evaluados": filas,
+        "corridas": evaluador.corridas,
+        "grilla": tamano_grilla(holgada, tope),
+    }
+
+
+# -- Consola --
+
+def main(argv=None):
+    escenarios = {"base": ESCENARIO_BASE, "a": ESCENARIO_A, "b": ESCENARIO_B,
+                  "c": ESCENARIO_C, "d": ESCENARIO_D}
+    parser = argparse.ArgumentParser(description="Dotacion minima que cumple un objetivo de espera")
+    parser.add_argument("--escenario", type=str.lower, choices=list(escenarios), default="base",
+                        help="escenario (demanda, horizonte, politica de matching)")
+    parser.add_argument("--espera-max", type=float, required=True,
+                        help="espera promedio maxima (semanas)")
+    parser.add_argument("--mal-matching-max", type=float, default=100.0,
+                        help="mal matching maximo (%%)")
+    parser.add_argument("--sin-atencion-max", type=float, default=SIN_ATENCION_MAX,
+                        help="%% maximo de niños que se van sin voluntario")
+    parser.add_argument("--replicas-min", type=int, default=5)
+    parser.add_argument("--replicas-max", type=int, default=20)
+    parser.add_argument("--profesionales-extra", type=int, default=1,
+                        help="probar tambien con hasta N profesionales mas que el minimo")
+    parser.add_argument("--costo-profesional", type=float, default=COSTOS["profesional"])
+    parser.add_argument("--costo-voluntario", default="1,1.5,2",
+                        help="costo de un voluntario de expertise 1,2,3")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--semilla", type=int, default=None, help="semilla maestra de las replicas")
+    parser.add_argument("--tiempo", type=float, default=None, help="semanas a simular")
+    parser.add_argument("--motor", choices=["simpy", "rapido"], default="rapido")
+    parser.add_argument("--cache", action="store_true", help="usar el cache de resultados en disco")
+    args = parser.parse_args(argv)
+
+    base = dict(escenarios[args.escenario], motor=args.motor)
+    if args.tiempo is not None:
+        base["tiempo_simulacion"] = args.tiempo
+    por_nivel = [float(x) for x in args.costo_voluntario.split(",")]
+    costos = {"profesional": args.costo_profesional,
+              "voluntario": dict(zip((1, 2, 3), por_nivel))}
+
+    print(f"\n  Dotacion minima para {base['nombre']}: espera <= {args.espera_max} sem, "
+          f"mal matching <= {args.mal_matching_max}%, "
+          f"sin atencion <= {args.sin_atencion_max}%\n")
+    inicio = time.perf_counter()
+    res = optimizar(base, args.espera_max, args.mal_matching_max,
+                    replicas_min=args.replicas_min, replicas_max=args.replicas_max,
+                    profesionales_extra=args.profesionales_extra, costos=costos,
+                    workers=args.workers, semilla=args.semilla, cache=args.cache or None,
+                    al_avanzar=lambda texto: print(f"  {texto}"),
+                    sin_atencion_max=args.sin_atencion_max)
+
+    print(f"\n  {len(res['evaluados'])} candidatos, {res['corridas']} corridas en "
+          f"{time.perf_counter() - inicio:.1f} s (una grilla equivalente: {res['grilla']:.1e} candidatos)")
+    mejor = res["mejor"]
+    if mejor is None:
+        print("  Ningun candidato cumple el objetivo.\n")
+        return
+    print(f"\n  MEJOR: {mejor['profesionales']} profesionales, {mejor['voluntarios']} "
+          f"voluntarios, costo {mejor['costo']:.1f}")
+    print(f"    {mejor['mezcla']}")
+    print(f"    Espera {mejor['espera_prom']:.2f} +- {mejor['espera_ic']:.2f} sem | "
+          f"Mal matching {mejor['mal_matching']:.1f} +- {mejor['mal_matching_ic']:.1f}% | "
+          f"Sin atencion {mejor['sin_atencion']:.1f} +- {mejor['sin_atencion_ic']:.1f}%")
+
+    print(f"\n  Frente de Pareto (costo vs espera y mal matching):\n")
+    print(f"  {'Costo':>6} | {'Prof':>4} | {'Vol':>3} | {'Espera':>6} | {'Mal %':>5} | "
+          f"{'Cumple':<6} | Mezcla")
+    print(f"  {'-' * 90}")
+    for f in res["frente"]:
+        print(f"  {f['costo']:>6.1f} | {f['profesionales']:>4} | {f['voluntarios']:>3} | "
+              f"{f['espera_prom']:>6.2f} | {f['mal_matching']:>5.1f} | "
+              f"{'si' if f['cumple'] else 'no':<6} | {f['mezcla']}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,589 @@
+"""
+Replicas independientes de un escenario y sus intervalos de confianza.
+
+Una sola corrida con semilla=42 da un numero, pero no dice cuanto
+puede variar. Aca se corren N replicas del mismo escenario, cada una
+con su propia semilla (derivada de una semilla maestra), repartidas en
+varios procesos, y se resume cada KPI con media, desvio e IC del 95%.
+
+Uso:
+    from replicas import correr_replicas
+    res = correr_replicas(ESCENARIO_BASE, 30)
+    res["espera_prom"]  # {"media": ..., "desvio": ..., "ic_inf": ..., ...}
+
+Tambien se puede pedir una precision en vez de una cantidad fija de
+replicas (correr_hasta_precision): se agregan lotes hasta que el IC de
+los KPIs elegidos sea tan angosto como se pidio.
+
+Reduccion de varianza (opcional): replicas antiteticas de a pares y un
+estimador con variables de control que usa valores teoricos conocidos
+(cantidad esperada de llegadas y duracion media de la evaluacion).
+"""
+
+import math
+import os
+from contextlib import nullcontext
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cache_resultados import resolver_cache
+from simulacion_apoyo_escolar import (
+    EVAL_DESVIO,
+    EVAL_MEDIA,
+    EVAL_MINIMO,
+    correr_simulacion,
+    media_duracion,
+)
+
+
+# -- Semillas --
+
+def semilla_replica(semilla_maestra, indice):
+    """
+    Semilla de la replica numero `indice`.
+
+    Usa SeedSequence de NumPy: cada replica es un hijo distinto de la
+    semilla maestra, asi las corrientes aleatorias son independientes
+    entre si y no dependen de cuantos procesos se usen ni del orden en
+    que terminen.
+    """
+    hijo = np.random.SeedSequence(semilla_maestra, spawn_key=(indice,))
+    return int.from_bytes(hijo.generate_state(4).tobytes(), "little")
+
+
+def configs_replicas(config, n, semilla=None, desde=0):
+    """
+    Copias del config con la semilla de cada replica [desde, desde+n).
+    Cada copia lleva tambien su numero en "replica" (lo usa el cache).
+    """
+    maestra = config["semilla"] if semilla is None else semilla
+    return [
+        dict(config, semilla=semilla_replica(maestra, i), replica=i)
+        for i in range(desde, desde + n)
+    ]
+
+
+# -- Estadistica --
+
+def t_critico(gl, nivel=0.95):
+    """
+    Cuantil de la t de Student para un IC bilateral de `nivel`.
+
+    Para 1 y 2 grados de libertad se usa la formula exacta; para el
+    resto, la expansion de Cornish-Fisher alrededor de la normal
+    (error menor a 0.004 con gl=3 y a 0.001 desde gl=4).
+    """
+    p = 1 - (1 - nivel) / 2
+    if gl == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if gl == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = statistics.NormalDist().inv_cdf(p)
+    return (z
+            + (z**3 + z) / (4 * gl)
+            + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * gl**2)
+            + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * gl**3)
+            + (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z)
+            / (92160 * gl**4))
+
+
+def resumir_valores(valores, nivel=0.95):
+    """Media, desvio e IC de una lista de numeros (una por replica)."""
+    n = len(valores)
+    media = statistics.mean(valores)
+    desvio = statistics.stdev(valores) if n > 1 else 0.0
+    semi = t_critico(n - 1, nivel) * desvio / math.sqrt(n) if n > 1 else 0.0
+    return {
+        "media": media,
+        "desvio": desvio,
+        "ic_inf": media - semi,
+        "ic_sup": media + semi,
+        "semi_ancho": semi,
+    }
+
+
+def resumir_replicas(resultados, nivel=0.95):
+    """
+    Combina los resultados de varias corridas de correr_simulacion.
+
+    Devuelve un diccionario con la misma forma que el de una corrida,
+    pero cada numero se reemplaza por su resumen (media, desvio, IC).
+    Los textos (nombre, area) quedan igual. Incluye la espera por
+    dificultad y la ocupacion de cada voluntario.
+    """
+    primero = resultados[0]
+    if isinstance(primero, dict):
+        return {
+            clave: resumir_replicas([r[clave] for r in resultados], nivel)
+            for clave in primero
+        }
+    if isinstance(primero, list):
+        return [
+            resumir_replicas([r[i] for r in resultados], nivel)
+            for i in range(len(primero))
+        ]
+    if isinstance(primero, (int, float)) and not isinstance(primero, bool):
+        return resumir_valores(resultados, nivel)
+    return primero
+
+
+def medias(resumen):
+    """Mismo formato que una corrida, quedandose solo con las medias."""
+    if isinstance(resumen, dict):
+        if "media" in resumen and "semi_ancho" in resumen:
+            return resumen["media"]
+        return {clave: medias(v) for clave, v in resumen.items()}
+    if isinstance(resumen, list):
+        return [medias(v) for v in resumen]
+    return resumen
+
+
+# -- Ejecucion --
+
+def _correr_replica(config):
+    return correr_simulacion(config, silencioso=True)
+
+
+def ejecutar_configs(configs, workers=None, ejecutor=None, cache=None):
+    """
+    Corre una lista de configs y devuelve los resultados en el mismo orden.
+
+    Con workers=1 corre todo en este proceso. Si se pasa un `ejecutor`
+    (por ejemplo un ProcessPoolExecutor que ya esta abierto), se usa ese.
+    Con `cache` (un CacheResultados o True) solo se simulan los configs
+    que no estan guardados, y lo nuevo se guarda.
+    """
+    cache = resolver_cache(cache)
+    if cache is None:
+        return _ejecutar(configs, workers, ejecutor)
+
+    resultados = cache.obtener_muchos(configs)
+    faltan = [i for i, r in enumerate(resultados) if r is None]
+    if faltan:
+        nuevos = _ejecutar([configs[i] for i in faltan], workers, ejecutor)
+        cache.guardar_muchos([configs[i] for i in faltan], nuevos)
+        for i, r in zip(faltan, nuevos):
+            resultados[i] = r
+    return resultados
+
+
+def _ejecutar(configs, workers, ejecutor):
+    if ejecutor is not None:
+        return list(ejecutor.map(_correr_replica, configs))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(configs))
+    if workers <= 1:
+        return [_correr_replica(c) for c in configs]
+
+    # Trozos grandes para no pagar la comunicacion por cada replica
+    chunk = max(1, len(configs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(_correr_replica, configs, chunksize=chunk))
+
+
+def correr_replicas(config, n, workers=None, semilla=None, nivel=0.95,
+                    ejecutor=None, antiteticas=False, variable_control=False,
+                    cache=None, motor=None):
+    """
+    Corre `n` replicas independientes de un escenario en paralelo.
+
+    La semilla maestra es config["semilla"] salvo que se pase `semilla`.
+    Con la misma semilla maestra el resultado es identico sin importar
+    cuantos workers se usen. Devuelve el resumen de resumir_replicas,
+    con "replicas" = n y las corridas individuales en "corridas".
+
+    antiteticas=True: las n corridas se arman de a pares (misma semilla,
+    una normal y una antitetica) y el IC se calcula sobre los n/2
+    promedios de cada par. Agrega "pares" y "reduccion_varianza" (cuanto
+    menos varianza tiene cada KPI que con n replicas crudas).
+
+    variable_control=True: agrega "variable_control" con espera_prom y
+    ocup_prof ajustados por estimador_variable_control.
+
+    cache: CacheResultados (o True para el de disco); las replicas ya
+    corridas con esta version del modelo no se vuelven a simular.
+
+    motor: "simpy" o "rapido" (ver crear_simulacion).
+    """
+    if motor is not None:
+        config = dict(config, motor=motor)
+    if antiteticas:
+        if n % 2:
+            raise ValueError("Con replicas antiteticas n tiene que ser par")
+        configs = []
+        for c in configs_replicas(config, n // 2, semilla):
+            configs += [c, dict(c, antitetico=True)]
+    else:
+        configs = configs_replicas(config, n, semilla)
+
+    corridas = ejecutar_configs(configs, workers, ejecutor, cache)
+    unidades = corridas
+    if antiteticas:
+        unidades = [promediar(corridas[i], corridas[i + 1])
+                    for i in range(0, n, 2)]
+
+    resumen = resumir_replicas(unidades, nivel)
+    resumen["nombre"] = config["nombre"]
+    resumen["replicas"] = n
+    resumen["corridas"] = corridas
+    if antiteticas:
+        resumen["pares"] = unidades
+        resumen["reduccion_varianza"] = reduccion_antitetica(corridas, unidades)
+    if variable_control:
+        resumen["variable_control"] = estimador_variable_control(
+            unidades, config, nivel=nivel)
+    return resumen
+
+
+# -- Reduccion de varianza --
+
+def promediar(a, b):
+    """Promedio numero a numero de dos corridas (un par antitetico)."""
+    if isinstance(a, dict):
+        return {clave: promediar(a[clave], b[clave]) for clave in a}
+    if isinstance(a, list):
+        return [promediar(x, y) for x, y in zip(a, b)]
+    if isinstance(a, (int, float)) and not isinstance(a, bool):
+        return (a + b) / 2
+    return a
+
+
+def reduccion_antitetica(corridas, pares):
+    """
+    Factor de reduccion de varianza de cada KPI numerico:
+    Var(media cruda con n corridas) / Var(media de n/2 pares).
+
+    La varianza cruda se estima con las n corridas sueltas (cada una,
+    por separado, es una replica comun). Un factor de 2 significa que
+    haria falta el doble de replicas crudas para la misma precision.
+    """
+    factores = {}
+    for clave, valor in corridas[0].items():
+        if not isinstance(valor, (int, float)) or isinstance(valor, bool):
+            continue
+        var_cruda = statistics.variance([r[clave] for r in corridas])
+        var_pares = statistics.variance([p[clave] for p in pares])
+        if var_pares > 0:
+            factores[clave] = var_cruda / (2 * var_pares)
+        else:
+            factores[clave] = None if var_cruda == 0 else math.inf
+    return factores
+
+
+def controles_teoricos(config):
+    """
+    Valores esperados exactos de los controles: llegadas en el horizonte
+    (tasa_llegada * tiempo_simulacion) y duracion media de la evaluacion.
+    """
+    return {
+        "llegaron": config["tasa_llegada"] * config["tiempo_simulacion"],
+        "eval_prom": media_duracion(EVAL_MEDIA, EVAL_DESVIO, EVAL_MINIMO),
+    }
+
+
+def estimador_variable_control(corridas, config,
+                               kpis=("espera_prom", "ocup_prof"), nivel=0.95):
+    """
+    Estimador con variables de control para los KPIs pedidos.
+
+    Si en una replica llegaron mas niños de lo esperado (o las
+    evaluaciones salieron mas largas), la espera y la ocupacion tienden
+    a salir mas altas. Se corrige cada media restando
+    beta * (media_control - valor_teorico), con beta estimado por
+    minimos cuadrados sobre las replicas.
+
+    Devuelve por KPI la media ajustada, su semiancho, la media y el
+    semiancho crudos, beta y el factor de reduccion de varianza.
+    """
+    teoricos = controles_teoricos(config)
+    n, k = len(corridas), len(teoricos)
+    if n < k + 3:
+        raise ValueError(f"Se necesitan al menos {k + 3} replicas "
+                         f"para la variable de control")
+
+    controles = np.array([[r[c] for c in teoricos] for r in corridas], float)
+    mu = np.array(list(teoricos.values()))
+    centrados = controles - controles.mean(axis=0)
+    gl = n - k - 1
+
+    resultado = {}
+    for clave in kpis:
+        y = np.array([r[clave] for r in corridas], float)
+        y_centrado = y - y.mean()
+        beta = np.linalg.lstsq(centrados, y_centrado, rcond=None)[0]
+        residuos = y_centrado - centrados @ beta
+
+        var_cruda = float(y_centrado @ y_centrado) / (n - 1)
+        var_residual = float(residuos @ residuos) / gl
+        semi_crudo = t_critico(n - 1, nivel) * math.sqrt(var_cruda / n)
+        semi = t_critico(gl, nivel) * math.sqrt(var_residual / n)
+        resultado[clave] = {
+            "media": float(y.mean() - beta @ (controles.mean(axis=0) - mu)),
+            "semi_ancho": semi,
+            "media_cruda": float(y.mean()),
+            "semi_ancho_crudo": semi_crudo,
+            "beta": dict(zip(teoricos, beta.tolist())),
+            "reduccion_varianza": (var_cruda / var_residual
+                                   if var_residual > 0 else None),
+        }
+    return resultado
+
+
+def kpi(resumen, clave):
+    """
+    Busca un KPI en un resumen. Acepta claves anidadas con puntos,
+    por ejemplo "espera_por_dificultad.Grave.promedio".
+    """
+    valor = resumen
+    for parte in clave.split("."):
+        valor = valor[parte]
+    return valor
+
+
+def correr_hasta_precision(config, tolerancias, n_inicial=10, max_replicas=500,
+                           workers=None, semilla=None, nivel=0.95,
+                           ejecutor=None, cache=None, motor=None):
+    """
+    Agrega replicas en lotes hasta que cada KPI de `tolerancias` tenga
+    un semiancho de IC menor o igual al pedido, o hasta max_replicas.
+
+    tolerancias: por ejemplo {"espera_prom": 0.1, "mal_matching": 1.0}
+    (espera dentro de +-0.1 semanas, mal matching dentro de +-1 punto).
+
+    Despues de cada lote se estima cuantas replicas faltan con la regla
+    n_necesarias = n * (semiancho / tolerancia)^2 y se lanza un lote de
+    ese tamaño (al menos n_inicial / 2) en paralelo. Los lotes no
+    dependen de la cantidad de workers, asi que el resultado tampoco.
+
+    Devuelve el mismo resumen que correr_replicas, mas "precision" (por
+    KPI: semiancho, tolerancia y si se alcanzo) y "convergio".
+    """
+    if motor is not None:
+        config = dict(config, motor=motor)
+    maestra = config["semilla"] if semilla is None else semilla
+    corridas = []
+    lote = n_inicial
+
+    if ejecutor is not None:
+        contexto = nullcontext(ejecutor)
+    elif workers == 1:
+        contexto = nullcontext(None)
+    else:
+        contexto = ProcessPoolExecutor(max_workers=workers)
+
+    with contexto as ex:
+        while True:
+            lote = min(lote, max_replicas - len(corridas))
+            configs = configs_replicas(config, lote, maestra, desde=len(corridas))
+            corridas += ejecutar_configs(configs, workers=1, ejecutor=ex,
+                                         cache=cache)
+            resumen = resumir_replicas(corridas, nivel)
+
+            n = len(corridas)
+            faltan = 0
+            for clave, tol in tolerancias.items():
+                semi = kpi(resumen, clave)["semi_ancho"]
+                if semi > tol:
+                    faltan = max(faltan, math.ceil(n * (semi / tol) ** 2) - n)
+
+            if faltan == 0 or n >= max_replicas:
+                break
+            lote = max(faltan, n_inicial // 2, 1)
+
+    resumen["nombre"] = config["nombre"]
+    resumen["replicas"] = n
+    resumen["corridas"] = corridas
+    resumen["precision"] = {
+        clave: {
+            "semi_ancho": kpi(resumen, clave)["semi_ancho"],
+            "tolerancia": tol,
+            "alcanzada": kpi(resumen, clave)["semi_ancho"] <= tol,
+        }
+        for clave, tol in tolerancias.items()
+    }
+    resumen["convergio"] = all(p["alcanzada"] for p in resumen["precision"].values())
+    return resumen
+
+
+# -- Comparacion pareada (numeros aleatorios comunes) --
+
+def diferencias(a, b):
+    """Resta b - a numero a numero, con la misma forma que una corrida."""
+    if isinstance(a, dict):
+        return {clave: diferencias(a[clave], b[clave]) for clave in a}
+    if isinstance(a, list):
+        return [diferencias(x, y) for x, y in zip(a, b)]
+    if isinstance(a, (int, float)) and not isinstance(a, bool):
+        return b - a
+    return a
+
+
+def _semi_ancho_sin_parear(ra, rb, nivel):
+    """Semiancho de Welch para b - a si las replicas fueran independientes."""
+    n = ra["replicas"]
+    resultado = {}
+    for clave, ka in ra.items():
+        kb = rb[clave]
+        if isinstance(ka, dict) and "semi_ancho" in ka:
+            var = (ka["desvio"] ** 2 + kb["desvio"] ** 2) / n
+            gl = max(1, 2 * (n - 1))
+            resultado[clave] = t_critico(gl, nivel) * math.sqrt(var)
+    return resultado
+
+
+def comparar_pareado(config_a, config_b, n, workers=None, semilla=None,
+                     nivel=0.95, ejecutor=None, cache=None, motor=None):
+    """
+    Compara dos escenarios (o dos politicas) con numeros aleatorios comunes.
+
+    La replica i de ambos escenarios usa la misma semilla, asi que ven
+    los mismos niños con los mismos tiempos. El IC de la diferencia se
+    calcula sobre las diferencias replica a replica (b - a), que tienen
+    mucha menos varianza que comparar dos promedios independientes.
+
+    Devuelve {"a": resumen_a, "b": resumen_b, "diferencia": resumen de
+    b - a, "semi_ancho_sin_parear": semiancho de Welch por KPI}.
+    """
+    if motor is not None:
+        config_a = dict(config_a, motor=motor)
+        config_b = dict(config_b, motor=motor)
+    maestra = config_a["semilla"] if semilla is None else semilla
+    configs = (configs_replicas(config_a, n, maestra)
+               + configs_replicas(config_b, n, maestra))
+    corridas = ejecutar_configs(configs, workers, ejecutor, cache)
+    corridas_a, corridas_b = corridas[:n], corridas[n:]
+
+    resumen_a = resumir_replicas(corridas_a, nivel)
+    resumen_b = resumir_replicas(corridas_b, nivel)
+    for resumen, config, c in ((resumen_a, config_a, corridas_a),
+                               (resumen_b, config_b, corridas_b)):
+        resumen["nombre"] = config["nombre"]
+        resumen["replicas"] = n
+        resumen["corridas"] = c
+
+    dif = resumir_replicas(
+        [diferencias(x, y) for x, y in zip(corridas_a, corridas_b)], nivel
+    )
+    dif["nombre"] = f"{config_b['nombre']} - {config_a['nombre']}"
+    dif["replicas"] = n
+    return {
+        "a": resumen_a,
+        "b": resumen_b,
+        "diferencia": dif,
+        "semi_ancho_sin_parear": _semi_ancho_sin_parear(resumen_a, resumen_b, nivel),
+    }
+
+
+# -- Reporte --
+
+def tabla_replicas(resumenes):
+    """Muestra media +- semiancho del IC para todos los escenarios."""
+    print(f"\n  {'=' * 55}")
+    print(f"  COMPARATIVA CON REPLICAS (media +- IC 95%)")
+    print(f"  {'=' * 55}\n")
+
+    header = f"  {'Metrica':<25}"
+    for r in resumenes:
+        header += f" | {r['nombre'][:17]:>17}"
+    print(header)
+    print(f"  {'-' * (25 + 20 * len(resumenes))}")
+
+    filas = [
+        ("Niños llegaron", "llegaron", "{:.0f}"),
+        ("Niños atendidos", "atendidos", "{:.0f}"),
+        ("Sin atencion", "no_atendidos", "{:.1f}"),
+        ("Espera prom (sem)", "espera_prom", "{:.2f}"),
+        ("Espera p90 (sem)", "espera_p90", "{:.2f}"),
+        ("Espera max (sem)", "espera_max", "{:.2f}"),
+        ("Mal matching (%)", "mal_matching", "{:.1f}"),
+        ("Ocup. voluntarios (%)", "ocup_vol", "{:.1f}"),
+        ("Ocup. Eq.Prof (%)", "ocup_prof", "{:.1f}"),
+    ]
+    for nombre_fila, clave, fmt in filas:
+        linea = f"  {nombre_fila:<25}"
+        for r in resumenes:
+            kpi = r[clave]
+            celda = f"{fmt.format(kpi['media'])} +- {fmt.format(kpi['semi_ancho'])}"
+            linea += f" | {celda:>17}"
+        print(linea)
+    print(f"\n  ({resumenes[0]['replicas']} replicas por escenario)\n")
+
+
+def tabla_precision(resumenes):
+    """Cuantas replicas necesito cada escenario y que precision alcanzo."""
+    print(f"  {'Escenario':<20} | {'Replicas':>8} | Precision alcanzada (semiancho IC)")
+    print(f"  {'-' * 75}")
+    for r in resumenes:
+        detalle = ", ".join(
+            f"{clave} +-{p['semi_ancho']:.3f}"
+            f"{'' if p['alcanzada'] else ' (pedido ' + format(p['tolerancia'], 'g') + ')'}"
+            for clave, p in r["precision"].items()
+        )
+        marca = "" if r["convergio"] else " [!]"
+        print(f"  {r['nombre'][:20]:<20} | {r['replicas']:>8} | {detalle}{marca}")
+    if not all(r["convergio"] for r in resumenes):
+        print("\n  [!] Algunos escenarios llegaron al maximo de replicas "
+              "sin la precision pedida.")
+    print()
+
+
+def tabla_pareada(comparacion):
+    """Diferencia entre dos escenarios con su IC pareado y sin parear."""
+    a, b = comparacion["a"], comparacion["b"]
+    dif = comparacion["diferencia"]
+    sin_parear = comparacion["semi_ancho_sin_parear"]
+
+    print(f"\n  {'=' * 55}")
+    print(f"  DIFERENCIA PAREADA: {dif['nombre']}")
+    print(f"  ({dif['replicas']} replicas con numeros aleatorios comunes)")
+    print(f"  {'=' * 55}\n")
+    print(f"  {'Metrica':<25} | {a['nombre'][:15]:>15} | {b['nombre'][:15]:>15} "
+          f"| {'Dif. (IC pareado)':>19} | {'IC sin parear':>13}")
+    print(f"  {'-' * 100}")
+
+    filas = [
+        ("Sin atencion", "no_atendidos", "{:.1f}"),
+        ("Espera prom (sem)", "espera_prom", "{:.2f}"),
+        ("Espera voluntario (sem)", "espera_vol", "{:.2f}"),
+        ("Mal matching (%)", "mal_matching", "{:.1f}"),
+        ("Ocup. voluntarios (%)", "ocup_vol", "{:.1f}"),
+        ("Ocup. Eq.Prof (%)", "ocup_prof", "{:.1f}"),
+    ]
+    for nombre_fila, clave, fmt in filas:
+        d = dif[clave]
+        celda = f"{fmt.format(d['media'])} +- {fmt.format(d['semi_ancho'])}"
+        print(f"  {nombre_fila:<25} | {fmt.format(a[clave]['media']):>15} "
+              f"| {fmt.format(b[clave]['media']):>15} | {celda:>19} "
+              f"| {'+- ' + fmt.format(sin_parear[clave]):>13}")
+    print()
+
+
+def tabla_reduccion_varianza(resumenes):
+    """Cuanto se redujo la varianza respecto de Monte Carlo crudo."""
+    print(f"\n  {'=' * 55}")
+    print(f"  REDUCCION DE VARIANZA (factor vs. Monte Carlo crudo)")
+    print(f"  {'=' * 55}\n")
+
+    def fmt(f):
+        if f is None:
+            return "-"
+        return "inf" if math.isinf(f) else f"x{f:.2f}"
+
+    for r in resumenes:
+        print(f"  {r['nombre']}")
+        if "reduccion_varianza" in r:
+            red = r["reduccion_varianza"]
+            claves = ["espera_prom", "espera_prof", "espera_vol",
+                      "mal_matching", "ocup_vol", "ocup_prof"]
+            print("    Antiteticas:       " + " | ".join(
+                f"{c} {fmt(red[c])}" for c in claves))
+        if "variable_control" in r:
+            for clave, vc in r["variable_control"].items():
+                print(f"    Var. control {clave:<12}: "
+                      f"{vc['media_cruda']:.2f} +- {vc['semi_ancho_crudo']:.2f} "
+                      f"-> {vc['media']:.2f} +- {vc['semi_ancho']:.2f} "
+                      f"({fmt(vc['reduccion_varianza'])})")
+    print()
@@ -21,46 +21,28 @@ Se prueban 5 escenarios + comparacion de politicas:
   - Comparacion: generalista vs espera estricta (sin generalista)
 """
 
+import argparse
+import heapq
+import itertools
+import math
 import simpy
 import random
 import statistics
+from array import array
 
+from acumuladores import Acumulador
+from cache_resultados import resolver_cache
 
-# -- Variables globales para acumular estadisticas --
 
-tiempos_espera = []          # espera total de cada niño (eval + voluntario)
-tiempos_espera_prof = []     # espera solo por el equipo profesional
-tiempos_espera_vol = []      # espera solo por un voluntario
-resultados_match = []        # tipo de match de cada asignacion
-tiempo_uso_prof = 0          # tiempo acumulado usando el eq. profesional
-ninos_llegaron = 0
-ninos_atendidos = 0
-ninos_no_atendidos = 0       # los que se fueron sin voluntario (politica estricta)
+# -- Duraciones (semanas): normal con un minimo --
 
-# Colas diferenciadas por dificultad (para el reporte)
-espera_por_dificultad = {1: [], 2: [], 3: []}
-
-
-def resetear_estadisticas():
-    """Limpia las estadisticas para un nuevo escenario."""
-    global tiempos_espera, tiempos_espera_prof, tiempos_espera_vol
-    global resultados_match, tiempo_uso_prof
-    global ninos_llegaron, ninos_atendidos, ninos_no_atendidos
-    global espera_por_dificultad
-    tiempos_espera = []
-    tiempos_espera_prof = []
-    tiempos_espera_vol = []
-    resultados_match = []
-    tiempo_uso_prof = 0
-    ninos_llegaron = 0
-    ninos_atendidos = 0
-    ninos_no_atendidos = 0
-    espera_por_dificultad = {1: [], 2: [], 3: []}
+EVAL_MEDIA, EVAL_DESVIO, EVAL_MINIMO = 1.5, 0.5, 0.5        # Equipo Profesional
+INTERV_MEDIA, INTERV_DESVIO, INTERV_MINIMO = 6.0, 2.0, 2.0  # intervencion
 
 
 # -- Funciones auxiliares --
 
-def generar_atributos_nino(prob_dificultad, prob_area):
+def generar_atributos_nino(prob_dificultad, prob_area, rng=random):
     """
     Genera la dificultad y el area de un niño al azar,
     segun las probabilidades del escenario.
@@ -68,7 +50,7 @@ def generar_atributos_nino(prob_dificultad, prob_area):
     Area: 'matematica', 'lectura', 'grafismo'
     """
     # Dificultad
-    r = random.random()
+    r = rng.random()
     if r < prob_dificultad[0]:
         dificultad = 1  # Leve
     elif r < prob_dificultad[0] + prob_dificultad[1]:
@@ -77,7 +59,7 @@ def generar_atributos_nino(prob_dificultad, prob_area):
         dificultad = 3  # Grave
 
     # Area
-    r = random.random()
+    r = rng.random()
     if r < prob_area[0]:
         area = "matematica"
     elif r < prob_area[0] + prob_area[1]:
@@ -88,13 +70,24 @@ def generar_atributos_nino(prob_dificultad, prob_area):
     return dificultad, area
 
 
+def media_duracion(media, desvio, minimo):
+    """
+    Valor esperado de max(minimo, X) con X ~ Normal(media, desvio):
+    minimo * P(X < minimo) + E[X ; X >= minimo].
+    """
+    a = (minimo - media) / desvio
+    normal = statistics.NormalDist()
+    return (minimo * normal.cdf(a) + media * (1 - normal.cdf(a))
+            + desvio * normal.pdf(a))
+
+
 def nombre_dificultad(d):
     return {1: "Leve", 2: "Moderada", 3: "Grave"}[d]
 
 
-def buscar_voluntario(voluntarios, dificultad_nino, area_nino, permitir_generalista):
+def buscar_voluntario(pool, dificultad_nino, area_nino, permitir_generalista):
     """
-    Busca un voluntario disponible para el niño.
+    Busca un voluntario disponible para el niño y lo marca como ocupado.
     Regla: el expertise del voluntario tiene que ser >= la dificultad,
     y tiene que coincidir el area.
 
@@ -103,135 +96,649 @@ def buscar_voluntario(voluntarios, dificultad_nino, area_nino, permitir_generali
 
     Devuelve (voluntario, tipo_match) o (None, None) si no hay.
     """
-    disponibles = [v for v in voluntarios if not v["ocupado"]]
-    if not disponibles:
-        return None, None
+    return pool.tomar(dificultad_nino, area_nino, permitir_generalista)
 
-    # Buscar match optimo: misma area + expertise suficiente
-    for v in disponibles:
-        if v["area"] == area_nino and v["expertise"] >= dificultad_nino:
-            return v, "OPTIMO"
 
-    if permitir_generalista:
-        # Misma area pero expertise insuficiente
-        for v in disponibles:
-            if v["area"] == area_nino:
-                return v, "SUBOPTIMO"
-        # Cualquier voluntario libre
-        return disponibles[0], "GENERALISTA"
+# -- Pool de voluntarios --
 
-    return None, None
+class PoolVoluntarios:
+    """
+    Voluntarios del centro, con los libres indexados por (area, expertise).
 
+    Cada indice es un heap con la posicion del voluntario en la lista,
+    asi entre varios candidatos se elige siempre el primero de la lista
+    (el mismo orden de prioridad que recorrer la lista completa). Como
+    hay pocas combinaciones de area y expertise, cada busqueda mira a lo
+    sumo una cabeza de heap por combinacion, sin importar cuantos
+    voluntarios haya. Tomar y devolver cuestan O(log n).
 
-# -- Proceso principal: el niño pasa por el sistema --
+    Lo que cambia durante la corrida va en arrays indexados por
+    Voluntario.indice: ocupado (0/1) y tiempo_ocupado (semanas).
+    """
 
-def proceso_nino(env, nombre, dificultad, area, equipo_prof, voluntarios,
-                 config):
+    def __init__(self, voluntarios):
+        self.voluntarios = voluntarios
+        n = len(voluntarios)
+        self.ocupado = array("b", bytes(n))
+        self.tiempo_ocupado = array("d", bytes(8 * n))
+        self.libres = {}              # (area, expertise) -> heap de indices
+        for v in voluntarios:
+            self.libres.setdefault((v.area, v.expertise), []).append(v.indice)
+        self.cantidad_libres = n
+
+        # Claves a mirar en cada busqueda, precalculadas por area
+        self._niveles = {}
+        for area, exp in sorted(self.libres):
+            self._niveles.setdefault(area, []).append(exp)
+        self._claves_optimo = {}
+
+    def _claves_optimas(self, area, dificultad):
+        claves = self._claves_optimo.get((area, dificultad))
+        if claves is None:
+            claves = [(area, e) for e in self._niveles.get(area, [])
+                      if e >= dificultad]
+            self._claves_optimo[(area, dificultad)] = claves
+        return claves
+
+    def _primero(self, claves):
+        """Clave cuyo primer voluntario libre esta antes en la lista."""
+        mejor = None
+        mejor_indice = None
+        for clave in claves:
+            cola = self.libres[clave]
+            if cola and (mejor is None or cola[0] < mejor_indice):
+                mejor = clave
+                mejor_indice = cola[0]
+        return mejor
+
+    def tomar(self, dificultad, area, permitir_generalista):
+        """Reserva el mejor voluntario libre. Devuelve (vol, tipo_match)."""
+        if self.cantidad_libres == 0:
+            return None, None
+
+        # Match optimo: misma area + expertise suficiente
+        tipo = "OPTIMO"
+        clave = self._primero(self._claves_optimas(area, dificultad))
+        if clave is None:
+            if not permitir_generalista:
+                return None, None
+            # Misma area pero expertise insuficiente
+            tipo = "SUBOPTIMO"
+            clave = self._primero(self._claves_optimas(area, 0))
+            if clave is None:
+                # Cualquier voluntario libre
+                tipo = "GENERALISTA"
+                clave = self._primero(self.libres)
+
+        return self.tomar_de(clave), tipo
+
+    def tomar_de(self, clave):
+        """Reserva el primer voluntario libre de (area, expertise)."""
+        i = heapq.heappop(self.libres[clave])
+        self.ocupado[i] = 1
+        self.cantidad_libres -= 1
+        return self.voluntarios[i]
+
+    def devolver(self, voluntario):
+        """Vuelve a poner libre a un voluntario."""
+        self.ocupado[voluntario.indice] = 0
+        heapq.heappush(self.libres[(voluntario.area, voluntario.expertise)],
+                       voluntario.indice)
+        self.cantidad_libres += 1
+
+
+def tipo_de_match(voluntario, dificultad_nino, area_nino):
+    """Clasifica la asignacion de un voluntario puntual a un niño."""
+    if voluntario.area == area_nino:
+        if voluntario.expertise >= dificultad_nino:
+            return "OPTIMO"
+        return "SUBOPTIMO"
+    return "GENERALISTA"
+
+
+# -- Lista de espera por voluntario --
+
+class LugarEspera:
+    """El lugar de un niño en la lista de espera."""
+
+    __slots__ = ("dificultad", "area", "aviso", "activo")
+
+    def __init__(self, dificultad, area, aviso):
+        self.dificultad = dificultad
+        self.area = area
+        self.aviso = aviso
+        self.activo = True
+
+
+DISCIPLINAS = ("fifo", "gravedad", "envejecimiento")
+
+
+class ListaEspera:
     """
-    Simula todo el recorrido de un niño:
-    1. Espera a ser evaluado por el Equipo Profesional
-    2. Se le busca un voluntario (matching)
-    3. Recibe la intervencion pedagogica
-    4. El voluntario queda libre
-
-    Si la politica es estricta (permitir_generalista=False) y no hay
-    match exacto, el niño espera un maximo de semanas antes de irse.
+    Niños ya evaluados que esperan un voluntario.
+
+    En vez de que cada niño pregunte cada 0.25 semanas si se libero
+    alguien, el niño queda "estacionado" en una cola segun su area y
+    dificultad, con un aviso (en SimPy, un evento) que se dispara recien
+    cuando se libera un voluntario que le sirve.
+
+    A quien le toca el voluntario que se libera depende de la disciplina:
+      - "fifo": al que llego primero a la espera (por defecto).
+      - "gravedad": al mas grave (Grave > Moderada > Leve) y entre los de
+        la misma dificultad al que llego primero.
+      - "envejecimiento": al que llego primero, pero cada nivel de
+        dificultad cuenta como `ventaja` semanas de antiguedad: un Grave
+        pasa adelante de los Leves que llegaron hasta 2 * ventaja semanas
+        antes que el, y un Leve que espero mas que eso no queda relegado.
+    Cada cola es un heap con la prioridad del niño, asi que sacar el
+    siguiente cuesta O(log n) aunque haya miles esperando.
     """
-    global tiempo_uso_prof, ninos_llegaron, ninos_atendidos, ninos_no_atendidos
-    ninos_llegaron += 1
-    t_inicio = env.now
-    max_espera_vol = config.get("max_espera_vol", 8)  # semanas maximo buscando
 
-    print(f"  [{env.now:5.1f} sem] {nombre} llega - "
-          f"Dificultad: {nombre_dificultad(dificultad)}, Area: {area}")
+    def __init__(self, disciplina="fifo", ventaja=1.0):
+        if disciplina not in DISCIPLINAS:
+            raise ValueError(f"Disciplina desconocida: {disciplina!r} "
+                             f"(usar {', '.join(DISCIPLINAS)})")
+        self.disciplina = disciplina
+        self.ventaja = ventaja
+        self.colas = {}               # (area, dificultad) -> heap de (prioridad, orden, lugar)
+        self._orden = itertools.count()
+
+    def estacionar(self, dificultad, area, aviso, ahora=0.0):
+        """Agrega un niño a la espera y devuelve su lugar en la cola."""
+        lugar = LugarEspera(dificultad, area, aviso)
+        if self.disciplina == "gravedad":
+            prioridad = -dificultad
+        elif self.disciplina == "envejecimiento":
+            prioridad = ahora - self.ventaja * dificultad
+        else:
+            prioridad = 0
+        cola = self.colas.setdefault((area, dificultad), [])
+        heapq.heappush(cola, (prioridad, next(self._orden), lugar))
+        return lugar
+
+    def retirar(self, lugar):
+        """Saca a un niño que abandona (se borra de la cola al pasar)."""
+        lugar.activo = False
+
+    def _primero(self, cola):
+        while cola and not cola[0][2].activo:
+            heapq.heappop(cola)
+        return cola[0] if cola else None
+
+    def siguiente_para(self, voluntario, permitir_generalista):
+        """
+        Saca de la espera al niño con mas prioridad que puede atender el
+        voluntario. Con politica estricta solo sirven los niños de su
+        area con dificultad <= expertise; con generalista sirve cualquiera.
+        """
+        if permitir_generalista:
+            claves = list(self.colas)
+        else:
+            claves = [(voluntario.area, d)
+                      for d in range(1, voluntario.expertise + 1)]
+
+        mejor = None
+        for clave in claves:
+            cola = self.colas.get(clave)
+            if not cola:
+                continue
+            primero = self._primero(cola)
+            if primero is not None and (mejor is None or primero < mejor[0]):
+                mejor = (primero, cola)
+
+        if mejor is None:
+            return None
+        lugar = heapq.heappop(mejor[1])[2]
+        lugar.activo = False
+        return lugar
+
+
+def liberar_voluntario(voluntario, pool, en_espera, permitir_generalista):
+    """
+    Deja libre al voluntario. Si hay un niño esperando que le sirva,
+    se lo asigna directamente y lo despierta; si no, vuelve al pool.
+    """
+    lugar = en_espera.siguiente_para(voluntario, permitir_generalista)
+    if lugar is None:
+        pool.devolver(voluntario)
+        return
+    tipo = tipo_de_match(voluntario, lugar.dificultad, lugar.area)
+    lugar.aviso.succeed((voluntario, tipo))
 
-    # Fase 1: Evaluacion por el Equipo Profesional
-    t_pre = env.now
-    with equipo_prof.request() as turno:
-        yield turno
 
-        espera_prof = env.now - t_pre
-        tiempos_espera_prof.append(espera_prof)
+# -- Corrida de un escenario --
 
-        if espera_prof > 0.1:
-            print(f"  [{env.now:5.1f} sem]   {nombre} espero "
-                  f"{espera_prof:.1f} sem por Eq. Profesional")
+def generar_voluntarios(n_vol):
+    """
+    Spec de n_vol voluntarios genericos (Vol-01, Vol-02, ...) con el
+    expertise y el area rotando, como en el modo custom del dashboard.
+    """
+    areas = ["matematica", "lectura", "grafismo"]
+    return [
+        {"nombre": f"Vol-{i + 1:02d}", "expertise": (i % 3) + 1, "area": areas[i % 3]}
+        for i in range(n_vol)
+    ]
 
-        # La evaluacion dura un tiempo (distribucion normal)
-        duracion_eval = max(0.5, random.gauss(1.5, 0.5))
-        tiempo_uso_prof += duracion_eval
-        yield env.timeout(duracion_eval)
 
-    # Fase 2: Buscar voluntario (cola diferenciada por dificultad)
-    t_pre = env.now
-    vol_asignado = None
-    tipo_match = None
+class Voluntario:
+    """
+    Un voluntario de una corrida: solo lo que no cambia. Si esta ocupado
+    y cuanto tiempo lo estuvo lo lleva el PoolVoluntarios en arrays, en
+    la posicion `indice`. Con __slots__ ocupa unas 5 veces menos que un
+    diccionario y leer un atributo es un poco mas rapido.
+    """
 
-    while vol_asignado is None:
-        vol_asignado, tipo_match = buscar_voluntario(
-            voluntarios, dificultad, area, config["permitir_generalista"]
-        )
-        if vol_asignado is None:
-            # Si ya espero demasiado, se va sin atencion
-            if (env.now - t_pre) >= max_espera_vol:
-                ninos_no_atendidos += 1
-                espera_por_dificultad[dificultad].append(env.now - t_pre)
-                print(f"  [{env.now:5.1f} sem] {nombre} se fue sin voluntario "
-                      f"(espero {env.now - t_pre:.1f} sem)")
-                return
-            yield env.timeout(0.25)  # espera y reintenta
+    __slots__ = ("indice", "nombre", "expertise", "area")
+
+    def __init__(self, indice, nombre, expertise, area):
+        self.indice = indice
+        self.nombre = nombre
+        self.expertise = expertise
+        self.area = area
 
-    espera_vol = env.now - t_pre
-    tiempos_espera_vol.append(espera_vol)
-    espera_por_dificultad[dificultad].append(espera_vol)
-    vol_asignado["ocupado"] = True
-    resultados_match.append(tipo_match)
 
-    etiqueta = {"OPTIMO": "[OK]", "SUBOPTIMO": "[!!]", "GENERALISTA": "[XX]"}
-    print(f"  [{env.now:5.1f} sem] {etiqueta[tipo_match]} {nombre} -> "
-          f"{vol_asignado['nombre']} (Exp:{vol_asignado['expertise']}, "
-          f"{vol_asignado['area']}) [{tipo_match}]")
+def crear_voluntarios(voluntarios_spec):
+    """Arma los voluntarios de una corrida a partir de su spec."""
+    return [Voluntario(i, v["nombre"], v["expertise"], v["area"])
+            for i, v in enumerate(voluntarios_spec)]
 
-    # Fase 3: Intervencion pedagogica
-    duracion = max(2.0, random.gauss(6.0, 2.0))
-    yield env.timeout(duracion)
 
-    # Liberar voluntario
-    vol_asignado["tiempo_ocupado"] += duracion
-    vol_asignado["ocupado"] = False
-    ninos_atendidos += 1
+class MuestreoEstandar:
+    """
+    Todo lo aleatorio de una corrida, sorteado con el random de Python.
+
+    Numeros aleatorios comunes: cada fuente de azar (llegadas, atributos,
+    duracion de la evaluacion, duracion de la intervencion) tiene su
+    propio generador, sembrado a partir de la semilla del escenario.
+    Ademas todo lo de un niño se sortea cuando llega. Asi, dos escenarios
+    con la misma semilla ven exactamente los mismos niños aunque cambie
+    la politica de asignacion, y la diferencia entre ellos se debe a la
+    politica y no al ruido.
+
+    Con config["antitetico"] = True se usa la variable antitetica de
+    cada sorteo de tiempos: 1 - U para las llegadas exponenciales y el
+    reflejo de la normal (media - z * desvio) para las duraciones. Una
+    corrida normal y una antitetica con la misma semilla forman un par
+    con correlacion negativa (ver replicas.correr_replicas).
+    """
+
+    FUENTES = ("llegadas", "atributos", "evaluacion", "intervencion")
+
+    def __init__(self, config):
+        semilla = config["semilla"]
+        self.rng_llegadas, self.rng_atributos, self.rng_eval, self.rng_intervencion = (
+            random.Random(f"{semilla}/{fuente}") for fuente in self.FUENTES
+        )
+        self.antitetico = config.get("antitetico", False)
+        self.tasa = config["tasa_llegada"]
+        self.prob_dificultad = config["prob_dificultad"]
+        self.prob_area = config["prob_area"]
+
+    def interarribo(self):
+        """Tiempo entre llegadas por transformada inversa: -ln(1 - U) / tasa."""
+        u = self.rng_llegadas.random()
+        if self.antitetico:
+            u = 1.0 - u
+        return -math.log(max(1.0 - u, 1e-300)) / self.tasa
+
+    def _duracion(self, rng, media, desvio, minimo):
+        """Normal con minimo; en modo antitetico se refleja sobre la media."""
+        x = rng.gauss(media, desvio)
+        if self.antitetico:
+            x = 2 * media - x
+        return max(minimo, x)
+
+    def nino(self):
+        """
+        Sortea todo lo aleatorio de un niño que llega, cada cosa con su
+        propio generador: dificultad, area, duracion de la evaluacion
+        (normal 1.5 +- 0.5, minimo 0.5) y de la intervencion (normal
+        6 +- 2, minimo 2).
+        """
+        dificultad, area = generar_atributos_nino(
+            self.prob_dificultad, self.prob_area, self.rng_atributos
+        )
+        duracion_eval = self._duracion(self.rng_eval, EVAL_MEDIA,
+                                       EVAL_DESVIO, EVAL_MINIMO)
+        duracion = self._duracion(self.rng_intervencion, INTERV_MEDIA,
+                                  INTERV_DESVIO, INTERV_MINIMO)
+        return dificultad, area, duracion_eval, duracion
+
 
-    # Guardar espera total (sin contar la intervencion)
-    espera_total = (env.now - t_inicio) - duracion
-    tiempos_espera.append(espera_total)
+def crear_muestreo(config):
+    """
+    Fuente de azar de una corrida segun config["muestreo"]:
+    "estandar" (por defecto, random de Python) o "numpy" (bloques
+    pre-sorteados, ver muestreo.py).
+    """
+    tipo = config.get("muestreo", "estandar")
+    if tipo == "estandar":
+        return MuestreoEstandar(config)
+    if tipo == "numpy":
+        from muestreo import MuestreoNumpy
+        return MuestreoNumpy(config)
+    raise ValueError(f"Muestreo desconocido: {tipo!r}")
 
-    print(f"  [{env.now:5.1f} sem] {nombre} termino ({duracion:.1f} sem). "
-          f"{vol_asignado['nombre']} libre.")
 
+ETIQUETA_MATCH = {"OPTIMO": "[OK]", "SUBOPTIMO": "[!!]", "GENERALISTA": "[XX]"}
 
-# -- Generador de llegadas (Poisson) --
 
-def llegada_ninos(env, equipo_prof, voluntarios, config):
-    """Genera niños que llegan al centro siguiendo un proceso de Poisson."""
-    contador = 0
-    while True:
-        yield env.timeout(random.expovariate(config["tasa_llegada"]))
-        contador += 1
+def formatear_evento(evento):
+    """
+    Linea del paso a paso para un evento de la traza, o None si el
+    evento no se muestra (esperas cortas por el Equipo Profesional).
+    """
+    t = evento["t"]
+    nombre = f"Nino-{evento['nino']:03d}"
+    tipo = evento["tipo"]
+    if tipo == "llegada":
+        return (f"  [{t:5.1f} sem] {nombre} llega - "
+                f"Dificultad: {nombre_dificultad(evento['dificultad'])}, "
+                f"Area: {evento['area']}")
+    if tipo == "evaluacion":
+        if evento["espera"] <= 0.1:
+            return None
+        return (f"  [{t:5.1f} sem]   {nombre} espero "
+                f"{evento['espera']:.1f} sem por Eq. Profesional")
+    if tipo == "abandono":
+        return (f"  [{t:5.1f} sem] {nombre} se fue sin "
+                f"voluntario (espero {evento['espera']:.1f} sem)")
+    if tipo == "asignacion":
+        return (f"  [{t:5.1f} sem] {ETIQUETA_MATCH[evento['match']]} {nombre} -> "
+                f"{evento['voluntario']} (Exp:{evento['expertise']}, "
+                f"{evento['area_voluntario']}) [{evento['match']}]")
+    if tipo == "fin":
+        return (f"  [{t:5.1f} sem] {nombre} termino ({evento['duracion']:.1f} sem). "
+                f"{evento['voluntario']} libre.")
+    raise ValueError(f"Evento desconocido: {tipo!r}")
+
+
+class Simulacion:
+    """
+    Una corrida de un escenario con todo su estado adentro: su fuente de
+    azar, las estadisticas que va acumulando, los voluntarios y el
+    entorno de SimPy.
+
+    Como no hay variables globales, se pueden correr varias a la vez
+    (hilos, sesiones de Streamlit, procesos) sin que se pisen entre si.
+
+    Los sorteos (llegadas y atributos y duraciones de cada niño) los hace
+    self.muestreo, con numeros aleatorios comunes entre escenarios (ver
+    MuestreoEstandar).
+
+    Paso a paso: con verboso=True se imprime cada evento, y si se pasa
+    traza (cualquier funcion, por ejemplo lista.append) recibe cada
+    evento como diccionario {"t", "tipo", "nino", ...}. Si no se pide
+    ninguna de las dos cosas no se arma ni un string ni un diccionario
+    por evento.
+    """
 
-        dificultad, area = generar_atributos_nino(
-            config["prob_dificultad"], config["prob_area"]
+    def __init__(self, config, verboso=False, traza=None):
+        self.config = config
+        self.verboso = verboso
+        self.traza = traza
+        self.detallado = verboso or traza is not None
+        self.muestreo = crear_muestreo(config)
+        self.permitir_generalista = config["permitir_generalista"]
+        self.max_espera_vol = config.get("max_espera_vol", 8)  # semanas maximo buscando
+
+        # Estadisticas de la corrida (acumuladas en linea, memoria fija)
+        self.espera = Acumulador(cuantiles=True)  # espera total de cada niño (eval + voluntario)
+        self.espera_prof = Acumulador()  # espera solo por el equipo profesional
+        self.espera_vol = Acumulador()   # espera solo por un voluntario
+        self.matches = {"OPTIMO": 0, "SUBOPTIMO": 0, "GENERALISTA": 0}
+        self.tiempo_uso_prof = 0       # tiempo acumulado usando el eq. profesional
+        self.ninos_llegaron = 0
+        self.ninos_atendidos = 0
+        self.ninos_no_atendidos = 0    # los que se fueron sin voluntario
+        # Colas diferenciadas por dificultad (para el reporte)
+        self.espera_por_dificultad = {d: Acumulador() for d in (1, 2, 3)}
+
+        # Recursos y entorno
+        self.voluntarios = crear_voluntarios(config["voluntarios_spec"])
+        self.pool = PoolVoluntarios(self.voluntarios)
+        self.en_espera = ListaEspera(config.get("disciplina", "fifo"),
+                                     config.get("ventaja_gravedad", 1.0))
+        self._crear_entorno()
+
+    def _crear_entorno(self):
+        """Entorno de SimPy y el Equipo Profesional como recurso."""
+        self.env = simpy.Environment()
+        self.equipo_prof = simpy.Resource(
+            self.env, capacity=self.config["num_profesionales"]
         )
-        env.process(proceso_nino(
-            env, f"Nino-{contador:03d}", dificultad, area,
-            equipo_prof, voluntarios, config
-        ))
+
+    def _evento(self, t, tipo, nino, **datos):
+        """
+        Manda un evento a la traza y/o a la pantalla. Llamarlo solo con
+        `if self.detallado:` delante, asi las corridas silenciosas no
+        pagan ni el armado de los argumentos.
+        """
+        evento = {"t": t, "tipo": tipo, "nino": nino, **datos}
+        if self.traza is not None:
+            self.traza(evento)
+        if self.verboso:
+            linea = formatear_evento(evento)
+            if linea is not None:
+                print(linea)
+
+    def _evento_asignacion(self, t, nino, voluntario, tipo_match, espera):
+        self._evento(t, "asignacion", nino, voluntario=voluntario.nombre,
+                     expertise=voluntario.expertise,
+                     area_voluntario=voluntario.area, match=tipo_match,
+                     espera=espera)
+
+    # -- Proceso principal: el niño pasa por el sistema --
+
+    def proceso_nino(self, numero, dificultad, area, duracion_eval, duracion):
+        """
+        Simula todo el recorrido de un niño:
+        1. Espera a ser evaluado por el Equipo Profesional
+        2. Se le busca un voluntario (matching)
+        3. Recibe la intervencion pedagogica
+        4. El voluntario queda libre
+
+        Si no hay voluntario para el niño, queda en la lista de espera hasta
+        que se libere uno adecuado. Si pasan max_espera_vol semanas sin que
+        aparezca (por ejemplo con politica estricta), se va sin atencion.
+
+        Las duraciones de la evaluacion y de la intervencion vienen ya
+        sorteadas desde la llegada (ver MuestreoEstandar.nino).
+        """
+        env = self.env
+        self.ninos_llegaron += 1
+        t_inicio = env.now
+
+        if self.detallado:
+            self._evento(env.now, "llegada", numero, dificultad=dificultad, area=area)
+
+        # Fase 1: Evaluacion por el Equipo Profesional
+        t_pre = env.now
+        with self.equipo_prof.request() as turno:
+            yield turno
+
+            espera_prof = env.now - t_pre
+            self.espera_prof.agregar(espera_prof)
+
+            if self.detallado:
+                self._evento(env.now, "evaluacion", numero, espera=espera_prof,
+                             duracion=duracion_eval)
+
+            self.tiempo_uso_prof += duracion_eval
+            yield env.timeout(duracion_eval)
+
+        # Fase 2: Buscar voluntario (cola diferenciada por dificultad)
+        t_pre = env.now
+        vol_asignado, tipo_match = buscar_voluntario(
+            self.pool, dificultad, area, self.permitir_generalista
+        )
+
+        if vol_asignado is None:
+            # Queda en la lista de espera hasta que lo despierten o se canse
+            aviso = env.event()
+            lugar = self.en_espera.estacionar(dificultad, area, aviso, env.now)
+            yield aviso | env.timeout(self.max_espera_vol)
+
+            if not aviso.triggered:
+                self.en_espera.retirar(lugar)
+                self.ninos_no_atendidos += 1
+                self.espera_por_dificultad[dificultad].agregar(env.now - t_pre)
+                if self.detallado:
+                    self._evento(env.now, "abandono", numero, espera=env.now - t_pre)
+                return
+            vol_asignado, tipo_match = aviso.value
+
+        espera_vol = env.now - t_pre
+        self.espera_vol.agregar(espera_vol)
+        self.espera_por_dificultad[dificultad].agregar(espera_vol)
+        self.matches[tipo_match] += 1
+
+        if self.detallado:
+            self._evento_asignacion(env.now, numero, vol_asignado, tipo_match, espera_vol)
+
+        # Fase 3: Intervencion pedagogica
+        yield env.timeout(duracion)
+
+        # Liberar voluntario (si alguien lo esperaba, pasa directo a ese niño)
+        self.pool.tiempo_ocupado[vol_asignado.indice] += duracion
+        self.ninos_atendidos += 1
+
+        # Guardar espera total (sin contar la intervencion)
+        espera_total = (env.now - t_inicio) - duracion
+        self.espera.agregar(espera_total)
+
+        if self.detallado:
+            self._evento(env.now, "fin", numero, duracion=duracion,
+                         voluntario=vol_asignado.nombre)
+        liberar_voluntario(vol_asignado, self.pool, self.en_espera,
+                           self.permitir_generalista)
+
+    # -- Generador de llegadas (Poisson) --
+
+    def llegada_ninos(self):
+        """Genera niños que llegan al centro siguiendo un proceso de Poisson."""
+        muestreo = self.muestreo
+        contador = 0
+        while True:
+            yield self.env.timeout(muestreo.interarribo())
+            contador += 1
+
+            self.env.process(self.proceso_nino(contador, *muestreo.nino()))
+
+    # -- Correr y calcular KPIs --
+
+    def correr(self):
+        """Corre el escenario hasta tiempo_simulacion y devuelve los KPIs."""
+        self.env.process(self.llegada_ninos())
+        self.env.run(until=self.config["tiempo_simulacion"])
+        return self.resultados()
+
+    def resultados(self):
+        """Calcula todos los KPIs de la corrida como diccionario."""
+        config = self.config
+        T = config["tiempo_simulacion"]
+
+        espera = self.espera
+        if espera.n:
+            prom, maxi = espera.media, espera.maximo
+            p50, p90, p99 = (espera.cuantil(p) for p in (0.5, 0.9, 0.99))
+        else:
+            prom = maxi = p50 = p90 = p99 = 0
+
+        optimos = self.matches["OPTIMO"]
+        suboptimos = self.matches["SUBOPTIMO"]
+        generalistas = self.matches["GENERALISTA"]
+        total_match = optimos + suboptimos + generalistas
+        if total_match > 0:
+            tasa_mal = ((suboptimos + generalistas) / total_match) * 100
+        else:
+            tasa_mal = 0
+
+        voluntarios = self.voluntarios
+        tiempo_ocupado = self.pool.tiempo_ocupado
+        total_vol = sum(tiempo_ocupado)
+        ocup_vol = (total_vol / (len(voluntarios) * T)) * 100 if T > 0 and voluntarios else 0
+
+        cap_prof = config["num_profesionales"] * T
+        ocup_prof = (self.tiempo_uso_prof / cap_prof) * 100 if cap_prof > 0 else 0
+
+        # Espera por dificultad
+        espera_dif = {}
+        for d in [1, 2, 3]:
+            acumulador = self.espera_por_dificultad[d]
+            espera_dif[nombre_dificultad(d)] = {
+                "promedio": acumulador.media,
+                "cantidad": acumulador.n,
+            }
+
+        # Ocupacion individual de voluntarios
+        vol_ocup = []
+        for v in voluntarios:
+            pct = (tiempo_ocupado[v.indice] / T) * 100 if T > 0 else 0
+            vol_ocup.append({
+                "nombre": v.nombre,
+                "expertise": v.expertise,
+                "area": v.area,
+                "ocupacion": round(pct, 1),
+            })
+
+        llegaron = self.ninos_llegaron
+        atendidos = self.ninos_atendidos
+        no_atendidos = self.ninos_no_atendidos
+        return {
+            "nombre": config["nombre"],
+            "llegaron": llegaron,
+            "atendidos": atendidos,
+            "no_atendidos": no_atendidos,
+            "en_proceso": llegaron - atendidos - no_atendidos,
+            "espera_prom": round(prom, 2),
+            "espera_max": round(maxi, 2),
+            "espera_p50": round(p50, 2),
+            "espera_p90": round(p90, 2),
+            "espera_p99": round(p99, 2),
+            "espera_prof": round(self.espera_prof.media, 2),
+            "espera_vol": round(self.espera_vol.media, 2),
+            "espera_por_dificultad": espera_dif,
+            "optimos": optimos,
+            "suboptimos": suboptimos,
+            "generalistas": generalistas,
+            "total_match": total_match,
+            "mal_matching": round(tasa_mal, 1),
+            "ocup_vol": round(ocup_vol, 1),
+            "ocup_prof": round(ocup_prof, 1),
+            "eval_prom": round(self.tiempo_uso_prof / self.espera_prof.n, 3) if self.espera_prof.n else 0,
+            "voluntarios": vol_ocup,
+        }
+
+
+def crear_simulacion(config, verboso=False, traza=None):
+    """
+    Arma la Simulacion con el motor pedido en config["motor"]:
+    "simpy" (por defecto) o "rapido" (heap de eventos sin SimPy, ver
+    motor_rapido.py). Los dos aceptan verboso y traza. Con
+    config["matching"] = "lotes" usa la asignacion por lotes de
+    asignacion_optima.py (solo con el motor rapido).
+    """
+    motor = config.get("motor", "simpy")
+    if config.get("matching", "greedy") == "lotes":
+        if motor != "rapido":
+            raise ValueError("matching='lotes' necesita motor='rapido'")
+        from asignacion_optima import SimulacionLotes
+        return SimulacionLotes(config, verboso, traza)
+    if motor == "rapido":
+        from motor_rapido import SimulacionRapida
+        return SimulacionRapida(config, verboso, traza)
+    if motor != "simpy":
+        raise ValueError(f"Motor desconocido: {motor!r} (usar 'simpy' o 'rapido')")
+    return Simulacion(config, verboso, traza)
 
 
 # -- Reporte de resultados --
 
-def imprimir_reporte(config, voluntarios):
-    """Imprime los KPIs del escenario."""
+def imprimir_reporte(config, r):
+    """Imprime los KPIs del escenario a partir de los resultados de la corrida."""
     T = config["tiempo_simulacion"]
+    voluntarios = r["voluntarios"]
 
     print(f"\n  RESULTADOS - {config['nombre']}")
     print(f"  {'-' * 50}")
@@ -240,69 +747,53 @@ def imprimir_reporte(config, voluntarios):
     print(f"  Voluntarios: {len(voluntarios)} | "
           f"Profesionales: {config['num_profesionales']}")
 
-    print(f"\n  Niños que llegaron:   {ninos_llegaron}")
-    print(f"  Niños atendidos:      {ninos_atendidos}")
-    print(f"  Se fueron sin atencion: {ninos_no_atendidos}")
-    print(f"  En proceso al cierre: {ninos_llegaron - ninos_atendidos - ninos_no_atendidos}")
+    print(f"\n  Niños que llegaron:   {r['llegaron']}")
+    print(f"  Niños atendidos:      {r['atendidos']}")
+    print(f"  Se fueron sin atencion: {r['no_atendidos']}")
+    print(f"  En proceso al cierre: {r['en_proceso']}")
 
     # KPI 1: Espera en cola
-    if tiempos_espera:
-        prom = statistics.mean(tiempos_espera)
-        maxi = max(tiempos_espera)
-    else:
-        prom = maxi = 0
-
+    prom = r["espera_prom"]
     print(f"\n  KPI 1 - Tiempo de espera en cola")
-    print(f"    Promedio: {prom:.2f} sem | Maximo: {maxi:.2f} sem")
-    if tiempos_espera_prof:
-        print(f"    (por Eq. Prof: {statistics.mean(tiempos_espera_prof):.2f} sem)")
-    if tiempos_espera_vol:
-        print(f"    (por Voluntario: {statistics.mean(tiempos_espera_vol):.2f} sem)")
+    print(f"    Promedio: {prom:.2f} sem | Maximo: {r['espera_max']:.2f} sem")
+    print(f"    Percentiles: p50 {r['espera_p50']:.2f} | p90 {r['espera_p90']:.2f} | "
+          f"p99 {r['espera_p99']:.2f} sem")
+    print(f"    (por Eq. Prof: {r['espera_prof']:.2f} sem)")
+    print(f"    (por Voluntario: {r['espera_vol']:.2f} sem)")
 
     # Cola diferenciada por dificultad (seccion 4.1 del anteproyecto)
     print(f"\n    Espera por nivel de dificultad (cola para voluntario):")
-    for d in [1, 2, 3]:
-        lista = espera_por_dificultad[d]
-        if lista:
-            prom_d = statistics.mean(lista)
-            print(f"      {nombre_dificultad(d):>8}: {prom_d:.2f} sem prom "
-                  f"({len(lista)} niños)")
+    for nombre_d, datos in r["espera_por_dificultad"].items():
+        if datos["cantidad"]:
+            print(f"      {nombre_d:>8}: {datos['promedio']:.2f} sem prom "
+                  f"({datos['cantidad']} niños)")
         else:
-            print(f"      {nombre_dificultad(d):>8}: sin datos")
+            print(f"      {nombre_d:>8}: sin datos")
 
     # KPI 2: Tasa de mal matching
-    total = len(resultados_match)
-    if total > 0:
-        optimos = resultados_match.count("OPTIMO")
-        suboptimos = resultados_match.count("SUBOPTIMO")
-        generalistas = resultados_match.count("GENERALISTA")
-        tasa_mal = ((suboptimos + generalistas) / total) * 100
-    else:
-        optimos = suboptimos = generalistas = 0
-        tasa_mal = 0
-
+    total = r["total_match"]
+    tasa_mal = r["mal_matching"]
     print(f"\n  KPI 2 - Tasa de mal matching")
-    print(f"    Optimo: {optimos}/{total} | Suboptimo: {suboptimos}/{total} | "
-          f"Generalista: {generalistas}/{total}")
+    print(f"    Optimo: {r['optimos']}/{total} | "
+          f"Suboptimo: {r['suboptimos']}/{total} | "
+          f"Generalista: {r['generalistas']}/{total}")
     print(f"    Tasa de mal matching: {tasa_mal:.1f}%")
 
     # KPI 3: Ocupacion de voluntarios
     print(f"\n  KPI 3 - Ocupacion de voluntarios")
     for v in voluntarios:
-        pct = (v["tiempo_ocupado"] / T) * 100 if T > 0 else 0
+        pct = v["ocupacion"]
         barra = "#" * int(pct / 5) + "." * (20 - int(pct / 5))
         print(f"    {v['nombre']} (Exp:{v['expertise']}, {v['area']:>10}): "
               f"[{barra}] {pct:.1f}%")
-
-    total_vol = sum(v["tiempo_ocupado"] for v in voluntarios)
-    ocup_vol = (total_vol / (len(voluntarios) * T)) * 100 if T > 0 else 0
-    print(f"    Ocupacion global: {ocup_vol:.1f}%")
+    print(f"    Ocupacion global: {r['ocup_vol']:.1f}%")
 
     # KPI 4: Ocupacion equipo profesional
     cap_prof = config["num_profesionales"] * T
-    ocup_prof = (tiempo_uso_prof / cap_prof) * 100 if cap_prof > 0 else 0
+    ocup_prof = r["ocup_prof"]
     print(f"\n  KPI 4 - Ocupacion del Equipo Profesional")
-    print(f"    Uso: {tiempo_uso_prof:.1f} sem / {cap_prof:.0f} sem = {ocup_prof:.1f}%")
+    print(f"    Uso: {ocup_prof * cap_prof / 100:.1f} sem / {cap_prof:.0f} sem "
+          f"= {ocup_prof:.1f}%")
 
     # Diagnostico
     print(f"\n  Diagnostico:")
@@ -321,48 +812,19 @@ def imprimir_reporte(config, voluntarios):
     else:
         print(f"    [ok] Espera aceptable ({prom:.1f} sem)")
 
-    return {
-        "nombre": config["nombre"],
-        "llegaron": ninos_llegaron,
-        "atendidos": ninos_atendidos,
-        "no_atendidos": ninos_no_atendidos,
-        "espera_prom": prom,
-        "espera_max": maxi,
-        "mal_matching": tasa_mal,
-        "ocup_vol": ocup_vol,
-        "ocup_prof": ocup_prof,
-    }
+    return r
 
 
 # -- Ejecutar un escenario --
 
 def ejecutar_escenario(config):
-    """Prepara el entorno, corre la simulacion e imprime resultados."""
-    resetear_estadisticas()
-    random.seed(config["semilla"])
-
+    """Corre la simulacion mostrando el paso a paso e imprime resultados."""
     print(f"\n  {'=' * 55}")
     print(f"  ESCENARIO: {config['nombre']}")
     print(f"  {'=' * 55}")
 
-    env = simpy.Environment()
-    equipo_prof = simpy.Resource(env, capacity=config["num_profesionales"])
-
-    # Crear voluntarios como diccionarios simples
-    voluntarios = []
-    for v in config["voluntarios_spec"]:
-        voluntarios.append({
-            "nombre": v["nombre"],
-            "expertise": v["expertise"],
-            "area": v["area"],
-            "ocupado": False,
-            "tiempo_ocupado": 0,
-        })
-
-    env.process(llegada_ninos(env, equipo_prof, voluntarios, config))
-    env.run(until=config["tiempo_simulacion"])
-
-    return imprimir_reporte(config, voluntarios)
+    r = crear_simulacion(config, verboso=True).correr()
+    return imprimir_reporte(config, r)
 
 
 # -- Tabla comparativa --
@@ -385,6 +847,7 @@ def tabla_comparativa(resultados):
         ("Niños atendidos", "atendidos", "{:.0f}"),
         ("Sin atencion", "no_atendidos", "{:.0f}"),
         ("Espera prom (sem)", "espera_prom", "{:.2f}"),
+        ("Espera p90 (sem)", "espera_p90", "{:.2f}"),
         ("Espera max (sem)", "espera_max", "{:.2f}"),
         ("Mal matching (%)", "mal_matching", "{:.1f}"),
         ("Ocup. voluntarios (%)", "ocup_vol", "{:.1f}"),
@@ -531,120 +994,213 @@ ESCENARIO_BASE_ESTRICTO = {
 
 # -- Main --
 
-def correr_simulacion(config, silencioso=False):
+def correr_simulacion(config, silencioso=False, cache=None, motor=None, traza=None):
     """
     Corre un escenario y devuelve todos los KPIs como diccionario.
-    Si silencioso=True, no imprime nada (para usar desde Streamlit).
+    Si silencioso=True, no imprime nada ni arma los mensajes del paso a
+    paso (para usar desde Streamlit y en las replicas).
+    Cada llamada usa su propia Simulacion, asi que se puede llamar
+    desde varios hilos o procesos a la vez.
+
+    cache: un CacheResultados, o True para el cache en disco por
+    defecto. Si el config ya se corrio con esta version del modelo, se
+    devuelve el resultado guardado sin simular (solo en modo silencioso,
+    para no perder el paso a paso).
+
+    motor: "simpy" o "rapido" (pisa config["motor"]).
+
+    traza: funcion que recibe cada evento como diccionario (ver
+    Simulacion). Con traza siempre se simula, aunque este en el cache.
     """
-    resetear_estadisticas()
-    random.seed(config["semilla"])
+    if motor is not None:
+        config = dict(config, motor=motor)
 
     if not silencioso:
         print(f"\n  {'=' * 55}")
         print(f"  ESCENARIO: {config['nombre']}")
         print(f"  {'=' * 55}")
+        return crear_simulacion(config, verboso=True, traza=traza).correr()
+    if traza is not None:
+        return crear_simulacion(config, traza=traza).correr()
 
-    env = simpy.Environment()
-    equipo_prof = simpy.Resource(env, capacity=config["num_profesionales"])
-
-    voluntarios = []
-    for v in config["voluntarios_spec"]:
-        voluntarios.append({
-            "nombre": v["nombre"],
-            "expertise": v["expertise"],
-            "area": v["area"],
-            "ocupado": False,
-            "tiempo_ocupado": 0,
-        })
-
-    # Guardar prints originales y silenciar si hace falta
-    if silencioso:
-        import io, sys
-        _stdout = sys.stdout
-        sys.stdout = io.StringIO()
+    cache = resolver_cache(cache)
+    if cache is not None:
+        guardado = cache.obtener(config)
+        if guardado is not None:
+            return guardado
 
-    env.process(llegada_ninos(env, equipo_prof, voluntarios, config))
-    env.run(until=config["tiempo_simulacion"])
+    resultado = crear_simulacion(config).correr()
+    if cache is not None:
+        cache.guardar(config, resultado)
+    return resultado
 
-    if silencioso:
-        sys.stdout = _stdout
 
-    T = config["tiempo_simulacion"]
-
-    # Calcular KPIs
-    if tiempos_espera:
-        prom = statistics.mean(tiempos_espera)
-        maxi = max(tiempos_espera)
-    else:
-        prom = maxi = 0
-
-    total_match = len(resultados_match)
-    if total_match > 0:
-        optimos = resultados_match.count("OPTIMO")
-        suboptimos = resultados_match.count("SUBOPTIMO")
-        generalistas = resultados_match.count("GENERALISTA")
-        tasa_mal = ((suboptimos + generalistas) / total_match) * 100
+def tolerancias_precision(texto):
+    """
+    Tipo de --precision: "espera_prom=0.1,mal_matching=1" ->
+    {"espera_prom": 0.1, "mal_matching": 1.0}. Cada clave tiene que ser
+    un KPI numerico de los resultados (se aceptan claves con puntos,
+    como "espera_por_dificultad.Grave.promedio") y cada tolerancia un
+    numero positivo.
+    """
+    ejemplo = Simulacion(dict(ESCENARIO_BASE, tiempo_simulacion=0)).resultados()
+    tolerancias = {}
+    for par in texto.split(","):
+        clave, _, valor = (x.strip() for x in par.partition("="))
+        try:
+            tol = float(valor)
+        except ValueError:
+            raise argparse.ArgumentTypeError(
+                f"{par.strip()!r}: se esperaba KPI=tolerancia, p.ej. espera_prom=0.1"
+            ) from None
+        if not tol > 0:
+            raise argparse.ArgumentTypeError(f"{clave}: la tolerancia tiene que ser positiva")
+        dato = ejemplo
+        for parte in clave.split("."):
+            dato = dato.get(parte) if isinstance(dato, dict) else None
+        if not isinstance(dato, (int, float)) or isinstance(dato, bool):
+            raise argparse.ArgumentTypeError(f"{clave!r} no es un KPI numerico de los resultados")
+        tolerancias[clave] = tol
+    return tolerancias
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Simulacion del Centro de Apoyo Escolar")
+    parser.add_argument("--motor", choices=["simpy", "rapido"], default="simpy",
+                        help="motor de simulacion (rapido = heap de eventos "
+                             "sin SimPy)")
+    parser.add_argument("--muestreo", choices=["estandar", "numpy"], default="estandar",
+                        help="como se sortean las entradas (numpy = bloques "
+                             "pre-sorteados, mas rapido)")
+    parser.add_argument("--disciplina", choices=DISCIPLINAS, default="fifo",
+                        help="a quien le toca un voluntario que se libera: al "
+                             "primero en llegar, al mas grave o por antiguedad "
+                             "con ventaja para los graves")
+    parser.add_argument("--replicas", type=int, default=1,
+                        help="replicas por escenario (1 = una corrida con "
+                             "el paso a paso, como siempre)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="procesos para correr las replicas "
+                             "(por defecto, todos los nucleos)")
+    parser.add_argument("--antiteticas", action="store_true",
+                        help="con --replicas: usar pares de replicas antiteticas")
+    parser.add_argument("--variable-control", action="store_true",
+                        help="con --replicas: ajustar espera_prom y ocup_prof "
+                             "con variables de control")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="con --replicas/--precision: no usar el cache "
+                             "de resultados en disco")
+    parser.add_argument("--precision", type=tolerancias_precision, default=None,
+                        help="replicar hasta lograr esta precision, p.ej. "
+                             "'espera_prom=0.1,mal_matching=1'")
+    parser.add_argument("--max-replicas", type=int, default=500,
+                        help="tope de replicas por escenario con --precision")
+    parser.add_argument("--instrumentar", action="store_true",
+                        help="correr cada escenario una vez con contadores de "
+                             "eventos, matching y tiempo por fase")
+    parser.add_argument("--profile", default=None,
+                        help="perfilar toda la ejecucion: *.prof con cProfile, "
+                             "otra ruta con muestreo en pilas plegadas (flamegraph)")
+    parser.add_argument("--estacionario", action="store_true",
+                        help="ademas de la corrida normal, una corrida larga por "
+                             "escenario con truncamiento MSER-5 y medias por lotes "
+                             "(la larga siempre con el motor rapido)")
+    args = parser.parse_args(argv)
+    # ejecutar hace una sola de estas cosas: no dejar que las otras se
+    # pierdan sin aviso
+    modos = [opcion for opcion, pedida in [("--precision", args.precision),
+                                          ("--instrumentar", args.instrumentar),
+                                          ("--estacionario", args.estacionario),
+                                          ("--replicas", args.replicas > 1)] if pedida]
+    if len(modos) > 1:
+        parser.error(f"{' y '.join(modos)} no se pueden combinar: elegir uno")
+    if args.profile and args.instrumentar:
+        parser.error("--profile y --instrumentar no se pueden combinar: los "
+                     "contadores cambian los tiempos del perfil")
+    if args.antiteticas and args.replicas % 2:
+        parser.error("--antiteticas corre las replicas de a pares: "
+                     "--replicas tiene que ser par")
+    if args.profile:
+        from instrumentacion import perfilar
+
+        with perfilar(args.profile):
+            ejecutar(args)
     else:
-        optimos = suboptimos = generalistas = 0
-        tasa_mal = 0
+        ejecutar(args)
 
-    total_vol = sum(v["tiempo_ocupado"] for v in voluntarios)
-    ocup_vol = (total_vol / (len(voluntarios) * T)) * 100 if T > 0 else 0
 
-    cap_prof = config["num_profesionales"] * T
-    ocup_prof = (tiempo_uso_prof / cap_prof) * 100 if cap_prof > 0 else 0
-
-    # Espera por dificultad
-    espera_dif = {}
-    for d in [1, 2, 3]:
-        lista = espera_por_dificultad[d]
-        espera_dif[nombre_dificultad(d)] = {
-            "promedio": statistics.mean(lista) if lista else 0,
-            "cantidad": len(lista),
-        }
+def ejecutar(args):
+    """Lo que hace main segun los argumentos de consola."""
+    cache = not args.sin_cache
 
-    # Ocupacion individual de voluntarios
-    vol_ocup = []
-    for v in voluntarios:
-        pct = (v["tiempo_ocupado"] / T) * 100 if T > 0 else 0
-        vol_ocup.append({
-            "nombre": v["nombre"],
-            "expertise": v["expertise"],
-            "area": v["area"],
-            "ocupacion": round(pct, 1),
-        })
-
-    return {
-        "nombre": config["nombre"],
-        "llegaron": ninos_llegaron,
-        "atendidos": ninos_atendidos,
-        "no_atendidos": ninos_no_atendidos,
-        "en_proceso": ninos_llegaron - ninos_atendidos - ninos_no_atendidos,
-        "espera_prom": round(prom, 2),
-        "espera_max": round(maxi, 2),
-        "espera_prof": round(statistics.mean(tiempos_espera_prof), 2) if tiempos_espera_prof else 0,
-        "espera_vol": round(statistics.mean(tiempos_espera_vol), 2) if tiempos_espera_vol else 0,
-        "espera_por_dificultad": espera_dif,
-        "optimos": optimos,
-        "suboptimos": suboptimos,
-        "generalistas": generalistas,
-        "total_match": total_match,
-        "mal_matching": round(tasa_mal, 1),
-        "ocup_vol": round(ocup_vol, 1),
-        "ocup_prof": round(ocup_prof, 1),
-        "voluntarios": vol_ocup,
-    }
-
-
-def main():
     print("\n  MODELOS Y SIMULACION - ASOCIACION CIVIL")
     print("  Centro de Apoyo Escolar")
     print("  Universidad Catolica de Salta\n")
 
+    escenarios = [dict(e, motor=args.motor, muestreo=args.muestreo,
+                       disciplina=args.disciplina)
+                  for e in [ESCENARIO_BASE, ESCENARIO_A, ESCENARIO_B,
+                            ESCENARIO_C, ESCENARIO_D, ESCENARIO_BASE_ESTRICTO]]
+    estricto = escenarios.pop()
+
+    if args.precision:
+        # Replicar cada escenario hasta la precision pedida
+        from replicas import (correr_hasta_precision, medias, tabla_precision,
+                              tabla_replicas)
+
+        resumenes = [
+            correr_hasta_precision(e, args.precision, max_replicas=args.max_replicas,
+                                   workers=args.workers, cache=cache)
+            for e in escenarios + [estricto]
+        ]
+        tabla_replicas(resumenes[:-1])
+        tabla_comparativa([medias(r) for r in resumenes[:-1]])
+        tabla_replicas([resumenes[0], resumenes[-1]])
+        tabla_precision(resumenes)
+        return
+
+    if args.instrumentar:
+        from instrumentacion import correr_instrumentado, imprimir_instrumentacion
+
+        for e in escenarios + [estricto]:
+            _, inst = correr_instrumentado(e)
+            imprimir_instrumentacion(inst.reporte(), e["nombre"])
+        return
+
+    if args.estacionario:
+        # Sin paso a paso: corrida normal y regimen estable lado a lado
+        from estado_estacionario import correr_estacionario, tabla_estacionario
+
+        todos = escenarios + [estricto]
+        tabla_comparativa([correr_simulacion(e, silencioso=True) for e in todos])
+        tabla_estacionario([correr_estacionario(dict(e, motor="rapido")) for e in todos])
+        return
+
+    if args.replicas > 1:
+        # Con replicas no se imprime el paso a paso: solo medias e IC
+        from replicas import (comparar_pareado, correr_replicas, medias,
+                              tabla_pareada, tabla_reduccion_varianza,
+                              tabla_replicas)
+
+        resumenes = [correr_replicas(e, args.replicas, args.workers,
+                                     antiteticas=args.antiteticas,
+                                     variable_control=args.variable_control,
+                                     cache=cache)
+                     for e in escenarios]
+        tabla_replicas(resumenes)
+        tabla_comparativa([medias(r) for r in resumenes])
+        if args.antiteticas or args.variable_control:
+            tabla_reduccion_varianza(resumenes)
+
+        # Politicas: mismas semillas en ambas, diferencia pareada
+        tabla_pareada(comparar_pareado(escenarios[0], estricto,
+                                       args.replicas, args.workers, cache=cache))
+        return
+
     # Parte 1: Los 5 escenarios (todos con generalista)
     resultados_escenarios = []
-    for escenario in [ESCENARIO_BASE, ESCENARIO_A, ESCENARIO_B,
-                      ESCENARIO_C, ESCENARIO_D]:
+    for escenario in escenarios:
         kpis = ejecutar_escenario(escenario)
         resultados_escenarios.append(kpis)
 
@@ -656,7 +1212,7 @@ def main():
     print(f"  (Seccion 4.2 - Generalista vs Espera Estricta)")
     print(f"  {'=' * 55}")
 
-    kpis_estricto = ejecutar_escenario(ESCENARIO_BASE_ESTRICTO)
+    kpis_estricto = ejecutar_escenario(estricto)
     tabla_comparativa([resultados_escenarios[0], kpis_estricto])
 
 
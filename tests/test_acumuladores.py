@@ -0,0 +1,107 @@
+"""
+Acumuladores en linea: Welford contra NumPy, cuantiles del t-digest
+contra numpy.quantile y fusion de acumuladores.
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from acumuladores import Acumulador, TDigest  # noqa: E402
+
+CUANTILES = [0.01, 0.1, 0.5, 0.9, 0.99, 0.999]
+
+
+def muestra(distribucion, n, semilla=1):
+    rng = np.random.default_rng(semilla)
+    return {"exponencial": lambda: rng.exponential(3.0, n),
+            "uniforme": lambda: rng.uniform(0.0, 1.0, n),
+            "lognormal": lambda: rng.lognormal(0.0, 1.5, n)}[distribucion]()
+
+
+def error_de_rango(valores, estimado, p):
+    """Que tan lejos de p queda el cuantil estimado, en fraccion de la muestra."""
+    return abs(np.searchsorted(np.sort(valores), estimado) / len(valores) - p)
+
+
+def acumular(valores, **kwargs):
+    a = Acumulador(**kwargs)
+    for x in valores.tolist():
+        a.agregar(x)
+    return a
+
+
+@pytest.mark.parametrize("desplazamiento", [0.0, 1e9])
+def test_welford_igual_a_numpy(desplazamiento):
+    # Con valores grandes y parecidos la formula ingenua pierde todo
+    x = muestra("exponencial", 10_000) + desplazamiento
+    a = acumular(x)
+    assert a.n == len(a) == len(x)
+    assert a.media == pytest.approx(x.mean(), rel=1e-12)
+    assert a.varianza == pytest.approx(x.var(ddof=1), rel=1e-6)
+    assert a.desvio == pytest.approx(x.std(ddof=1), rel=1e-6)
+    assert (a.minimo, a.maximo) == (x.min(), x.max())
+
+
+def test_vacio_y_un_valor():
+    a = Acumulador(cuantiles=True)
+    assert (a.n, a.media, a.varianza, a.cuantil(0.5)) == (0, 0.0, 0.0, 0)
+    a.agregar(4.0)
+    assert (a.media, a.varianza, a.minimo, a.maximo, a.cuantil(0.9)) == (4.0, 0.0, 4.0, 4.0, 4.0)
+
+
+@pytest.mark.parametrize("distribucion", ["exponencial", "uniforme", "lognormal"])
+def test_cuantiles_del_digest(distribucion):
+    x = muestra(distribucion, 100_000)
+    a = acumular(x, cuantiles=True)
+    assert len(a.digest.centroides) < 100          # memoria fija
+    for p in CUANTILES:
+        assert error_de_rango(x, a.cuantil(p), p) < 0.003, p
+    if distribucion != "lognormal":    # la cola larga: ahi solo se mide el rango
+        for p in (0.5, 0.9, 0.99):
+            assert a.cuantil(p) == pytest.approx(np.quantile(x, p), rel=0.01), p
+
+
+def test_cuantiles_con_pocos_valores():
+    # Menos valores que el buffer: se funde todo al pedir el cuantil
+    x = muestra("exponencial", 500)
+    a = acumular(x, cuantiles=True)
+    for p in CUANTILES:
+        assert error_de_rango(x, a.cuantil(p), p) < 0.01, p
+    assert a.cuantil(0.0) == x.min() and a.cuantil(1.0) == x.max()
+
+
+def test_fusionar_acumuladores():
+    x = muestra("lognormal", 60_000)
+    partes = [acumular(x[i::7], cuantiles=True) for i in range(7)]
+    partes.append(Acumulador(cuantiles=True))      # uno vacio no cambia nada
+    todo = Acumulador(cuantiles=True)
+    for parte in partes:
+        todo.fusionar(parte)
+    assert todo.n == len(x)
+    assert todo.media == pytest.approx(x.mean(), rel=1e-12)
+    assert todo.varianza == pytest.approx(x.var(ddof=1), rel=1e-9)
+    assert (todo.minimo, todo.maximo) == (x.min(), x.max())
+    assert len(todo.digest.centroides) < 100
+    for p in CUANTILES:
+        assert error_de_rango(x, todo.cuantil(p), p) < 0.003, p
+    # Las partes quedan como estaban
+    assert sum(p.n for p in partes) == len(x)
+
+
+def test_fusionar_digest_con_valores_sin_fundir():
+    x = muestra("uniforme", 3_000)
+    a, b = TDigest(), TDigest()
+    for v in x[:2_500].tolist():
+        a.agregar(v)
+    for v in x[2_500:].tolist():
+        b.agregar(v)                                 # 500: quedan en el buffer
+    a.fusionar(b)
+    assert len(a) == len(x) and len(b) == 500
+    assert error_de_rango(x, a.cuantil(0.5), 0.5) < 0.01
@@ -0,0 +1,151 @@
+"""
+Formulas de colas de analitico contra valores cerrados conocidos
+(Erlang B/C, M/M/c, Pollaczek-Khinchine) y el caso sin profesionales.
+
+    python -m pytest -q tests
+"""
+
+import math
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analitico import (  # noqa: E402
+    cribar,
+    erlang_b,
+    erlang_c,
+    espera_horizonte,
+    espera_mgc,
+    estimar,
+    momentos_duracion,
+    ocupados,
+    prob_mal_match,
+)
+from simulacion_apoyo_escolar import (  # noqa: E402
+    ESCENARIO_BASE,
+    EVAL_DESVIO,
+    EVAL_MEDIA,
+    EVAL_MINIMO,
+)
+
+
+# -- Erlang --
+
+@pytest.mark.parametrize("c, carga, esperado", [
+    (1, 0.5, 1 / 3),          # A / (1 + A)
+    (2, 1.0, 0.2),            # (1/2) / (1 + 1 + 1/2)
+    (3, 2.0, 4 / 19),         # (8/6) / (1 + 2 + 2 + 8/6)
+])
+def test_erlang_b(c, carga, esperado):
+    assert erlang_b(c, carga) == pytest.approx(esperado)
+
+
+@pytest.mark.parametrize("c, carga, esperado", [
+    (1, 0.5, 0.5),            # M/M/1: rho
+    (2, 1.0, 1 / 3),
+    (3, 2.0, 4 / 9),
+])
+def test_erlang_c(c, carga, esperado):
+    assert erlang_c(c, carga) == pytest.approx(esperado)
+
+
+def test_erlang_c_saturado():
+    assert erlang_c(2, 2.0) == 1.0
+    assert erlang_c(2, 5.0) == 1.0
+
+
+# -- Esperas --
+
+@pytest.mark.parametrize("tasa, c, media, esperado", [
+    (0.5, 1, 1.0, 1.0),       # M/M/1: rho / (mu - lambda)
+    (1.0, 2, 1.0, 1 / 3),     # M/M/2: C / (c mu - lambda)
+    (2.0, 3, 1.0, 4 / 9),     # M/M/3
+    (4.0, 3, 0.5, 4 / 9 / 2),  # la misma con la duracion a la mitad
+])
+def test_espera_mmc(tasa, c, media, esperado):
+    assert espera_mgc(tasa, c, media, cs2=1.0) == pytest.approx(esperado)
+
+
+@pytest.mark.parametrize("cs2", [0.0, 0.25, 1.0, 2.0])
+def test_espera_mg1_pollaczek_khinchine(cs2):
+    # M/G/1: Wq = rho * media * (1 + cs2) / (2 (1 - rho)); Allen-Cunneen es exacta
+    tasa, media = 0.6, 1.0
+    rho = tasa * media
+    assert espera_mgc(tasa, 1, media, cs2) == pytest.approx(
+        rho * media * (1 + cs2) / (2 * (1 - rho)))
+
+
+def test_espera_inestable_o_sin_servidores():
+    assert espera_mgc(2.0, 2, 1.0, 1.0) == math.inf
+    assert espera_mgc(1.0, 0, 1.0, 1.0) == math.inf
+    assert espera_mgc(1.0, -1, 1.0, 1.0) == math.inf
+    assert espera_horizonte(1.0, 0, 1.0, 1.0, T=52, tope=8) == 8
+    assert espera_horizonte(1.0, 0, 1.0, 1.0, T=52) == math.inf
+
+
+def test_espera_horizonte_saturada_es_fluido():
+    # rho = 2, sin tope: (rho - 1) T / (2 rho)
+    assert espera_horizonte(4.0, 1, 0.5, 0.0, T=52, ca2=0.0) == pytest.approx(52 / 4)
+
+
+# -- Servidores ocupados y mal matching --
+
+def test_ocupados_mm1():
+    libres, todos = ocupados(1, 0.25)
+    assert libres == pytest.approx([0.75])
+    assert todos == pytest.approx(0.25)
+
+
+def test_ocupados_suma_uno():
+    libres, todos = ocupados(4, 2.5)
+    assert sum(libres) + todos == pytest.approx(1.0)
+    assert todos == pytest.approx(erlang_c(4, 2.5))
+
+
+def test_prob_mal_match_extremos():
+    assert prob_mal_match(5, 2.0, aptos=5) == pytest.approx(0.0)
+    assert prob_mal_match(5, 2.0, aptos=0) == pytest.approx(1.0)
+    assert prob_mal_match(5, 2.0, aptos=2) < prob_mal_match(5, 2.0, aptos=1)
+
+
+# -- Duraciones truncadas --
+
+def test_momentos_sin_truncar():
+    m1, m2 = momentos_duracion(1.5, 0.5, -100.0)
+    assert m1 == pytest.approx(1.5)
+    assert m2 == pytest.approx(1.5 ** 2 + 0.5 ** 2)
+
+
+def test_momentos_truncados_contra_muestra():
+    x = np.maximum(0.5, np.random.default_rng(0).normal(1.0, 0.8, 2_000_000))
+    m1, m2 = momentos_duracion(1.0, 0.8, 0.5)
+    assert m1 == pytest.approx(x.mean(), rel=2e-3)
+    assert m2 == pytest.approx((x ** 2).mean(), rel=2e-3)
+
+
+# -- Estimacion --
+
+@pytest.mark.parametrize("profesionales", [0, -1])
+def test_sin_profesionales(profesionales):
+    config = dict(ESCENARIO_BASE, num_profesionales=profesionales)
+    e = estimar(config)
+    assert e["saturado"]
+    assert e["rho_prof"] == math.inf
+    assert e["espera_prof"] == math.inf
+    assert e["espera_prom"] == math.inf
+    assert e["ocup_prof"] == 0.0
+    assert e["ocup_vol"] == 0.0
+    assert not cribar(config, espera_max=100)
+
+
+def test_estable_usa_allen_cunneen():
+    # Estable y con un horizonte largo: la transitoria no acota
+    config = dict(ESCENARIO_BASE, num_profesionales=5, tiempo_simulacion=5000)
+    m1, m2 = momentos_duracion(EVAL_MEDIA, EVAL_DESVIO, EVAL_MINIMO)
+    esperado = espera_mgc(config["tasa_llegada"], 5, m1, m2 / m1 ** 2 - 1)
+    assert 0 < esperado < math.inf
+    assert estimar(config)["espera_prof"] == pytest.approx(esperado)
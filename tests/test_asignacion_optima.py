@@ -0,0 +1,100 @@
+"""
+resolver_asignacion contra fuerza bruta en matrices chicas, arrancando
+en frio y en caliente (con los potenciales de otra resolucion o
+cualquiera), y que el matching por lotes no acepte una disciplina que
+no puede respetar.
+
+    python -m pytest -q tests
+"""
+
+import itertools
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asignacion_optima import GRANDE, resolver_asignacion  # noqa: E402
+from simulacion_apoyo_escolar import DISCIPLINAS, ESCENARIO_BASE, crear_simulacion  # noqa: E402
+
+CASOS = 200
+
+
+def fuerza_bruta(costo):
+    filas, columnas = costo.shape
+    return min(sum(costo[i, j] for i, j in enumerate(cols))
+               for cols in itertools.permutations(range(columnas), filas))
+
+
+def matriz(rng):
+    filas = int(rng.integers(1, 6))
+    columnas = int(rng.integers(filas, 7))
+    if rng.random() < 0.5:
+        costo = rng.integers(-5, 6, (filas, columnas)).astype(float)  # con empates
+    else:
+        costo = rng.normal(0, 3, (filas, columnas))
+    # Algunos pares prohibidos, pero siempre con una salida por fila (como
+    # la columna "quedar libre" de la simulacion)
+    prohibidos = rng.random((filas, columnas)) < 0.3
+    prohibidos[np.arange(filas), rng.permutation(columnas)[:filas]] = False
+    costo[prohibidos] = GRANDE
+    return costo
+
+
+def costo_de(costo, columna):
+    assert len(set(columna.tolist())) == len(columna)
+    assert all(0 <= j < costo.shape[1] for j in columna)
+    return costo[np.arange(len(columna)), columna].sum()
+
+
+@pytest.mark.parametrize("semilla", range(CASOS))
+def test_frio_igual_a_fuerza_bruta(semilla):
+    costo = matriz(np.random.default_rng(semilla))
+    columna, _, _ = resolver_asignacion(costo)
+    assert costo_de(costo, columna) == pytest.approx(fuerza_bruta(costo))
+
+
+@pytest.mark.parametrize("semilla", range(CASOS))
+def test_caliente_igual_a_fuerza_bruta(semilla):
+    rng = np.random.default_rng(semilla)
+    costo = matriz(rng)
+    optimo = fuerza_bruta(costo)
+
+    # Potenciales cualesquiera
+    v0 = rng.normal(0, 5, costo.shape[1])
+    columna, _, _ = resolver_asignacion(costo, v0)
+    assert costo_de(costo, columna) == pytest.approx(optimo)
+
+    # Potenciales de la misma matriz ya resuelta y de una vecina (como
+    # entre dos epocas: cambian un poco los costos)
+    _, v, _ = resolver_asignacion(costo)
+    columna, _, _ = resolver_asignacion(costo, v)
+    assert costo_de(costo, columna) == pytest.approx(optimo)
+    vecina = np.where(costo < GRANDE, costo + rng.normal(0, 0.5, costo.shape), GRANDE)
+    columna, _, _ = resolver_asignacion(vecina, v)
+    assert costo_de(vecina, columna) == pytest.approx(fuerza_bruta(vecina))
+
+
+def test_no_modifica_los_potenciales_de_entrada():
+    costo = matriz(np.random.default_rng(0))
+    v0 = np.ones(costo.shape[1])
+    resolver_asignacion(costo, v0)
+    assert (v0 == 1).all()
+
+
+# -- Disciplina --
+
+LOTES = dict(ESCENARIO_BASE, motor="rapido", matching="lotes", tiempo_simulacion=10)
+
+
+@pytest.mark.parametrize("disciplina", [d for d in DISCIPLINAS if d != "fifo"])
+def test_lotes_rechaza_disciplina(disciplina):
+    with pytest.raises(ValueError, match="disciplina"):
+        crear_simulacion(dict(LOTES, disciplina=disciplina))
+
+
+def test_lotes_con_fifo():
+    crear_simulacion(dict(LOTES, disciplina="fifo")).correr()
+    crear_simulacion(LOTES).correr()
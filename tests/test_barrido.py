@@ -0,0 +1,104 @@
+"""
+Barridos: retomar un CSV cortado sin volver a correr lo que ya esta,
+no mezclar filas de otra version del modelo y que el hipercubo latino
+use cada franja de cada rango exactamente una vez.
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import barrido  # noqa: E402
+from barrido import correr_barrido, grilla, hipercubo_latino, leer_barrido  # noqa: E402
+from simulacion_apoyo_escolar import ESCENARIO_BASE  # noqa: E402
+
+BASE = dict(ESCENARIO_BASE, tiempo_simulacion=8, motor="rapido")
+
+
+def correr(puntos, salida):
+    terminados = []
+    filas = correr_barrido(puntos, BASE, replicas=2, workers=1, salida=salida,
+                           al_terminar=lambda fila, hechos, total: terminados.append(fila))
+    return filas, terminados
+
+
+# -- Retomar --
+
+def test_retoma_sin_repetir_puntos(tmp_path):
+    salida = str(tmp_path / "b.csv")
+    puntos = grilla({"num_profesionales": [1, 2, 3]})
+    primeras, terminados = correr(puntos[:2], salida)
+    assert len(terminados) == 2
+
+    filas, terminados = correr(puntos, salida)
+    assert [f["num_profesionales"] for f in terminados] == [3]
+    assert [f["num_profesionales"] for f in filas] == [1, 2, 3]
+    assert filas[:2] == primeras
+    assert len(leer_barrido(salida)) == 3
+
+    _, terminados = correr(puntos, salida)
+    assert terminados == []
+
+
+def test_linea_cortada_se_vuelve_a_correr(tmp_path):
+    salida = str(tmp_path / "b.csv")
+    puntos = grilla({"num_profesionales": [1, 2]})
+    correr(puntos, salida)
+    with open(salida) as f:
+        texto = f.read()
+    with open(salida, "w") as f:
+        f.write(texto[:-20])  # se corto escribiendo la ultima fila
+
+    assert len(leer_barrido(salida)) == 1
+    _, terminados = correr(puntos, salida)
+    assert [f["num_profesionales"] for f in terminados] == [2]
+
+
+def test_guarda_la_version(tmp_path):
+    salida = str(tmp_path / "b.csv")
+    correr([{"num_profesionales": 2}], salida)
+    assert [f["version"] for f in leer_barrido(salida)] == [barrido.version_modelo()]
+
+
+def test_no_mezcla_versiones(tmp_path, monkeypatch):
+    salida = str(tmp_path / "b.csv")
+    puntos = grilla({"num_profesionales": [1, 2]})
+    correr(puntos[:1], salida)
+    with open(salida) as f:
+        antes = f.read()
+
+    monkeypatch.setattr(barrido, "version_modelo", lambda: "otra")
+    with pytest.raises(ValueError, match="otra version"):
+        correr(puntos, salida)
+    with open(salida) as f:
+        assert f.read() == antes
+
+
+# -- Hipercubo latino --
+
+def test_hipercubo_una_vez_por_franja():
+    n = 20
+    puntos = hipercubo_latino({"tasa_llegada": (2.0, 8.0), "prob_x": (0.0, 1.0)}, n, semilla=3)
+    assert len(puntos) == n
+    for clave, (minimo, maximo) in {"tasa_llegada": (2.0, 8.0), "prob_x": (0.0, 1.0)}.items():
+        franjas = sorted(int((p[clave] - minimo) / (maximo - minimo) * n) for p in puntos)
+        assert franjas == list(range(n))
+
+
+def test_hipercubo_enteros_y_categorias():
+    puntos = hipercubo_latino({"num_profesionales": (2, 9),
+                               "permitir_generalista": [True, False]}, 8, semilla=1)
+    assert sorted(p["num_profesionales"] for p in puntos) == list(range(2, 10))
+    assert all(isinstance(p["num_profesionales"], int) for p in puntos)
+    assert sum(p["permitir_generalista"] for p in puntos) == 4
+
+
+def test_hipercubo_reproducible():
+    rangos = {"tasa_llegada": (2.0, 8.0), "num_profesionales": (1, 10)}
+    assert hipercubo_latino(rangos, 10, semilla=5) == hipercubo_latino(rangos, 10, semilla=5)
+    assert hipercubo_latino(rangos, 10, semilla=5) != hipercubo_latino(rangos, 10, semilla=6)
@@ -0,0 +1,86 @@
+"""
+CacheResultados: aciertos y fallos, resultados viejos que se borran
+cuando cambia la version del modelo y recorte LRU al pasar el tope.
+
+    python -m pytest -q tests
+"""
+
+import itertools
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cache_resultados  # noqa: E402
+from cache_resultados import CacheResultados, clave_config, version_modelo  # noqa: E402
+
+
+def config(i):
+    return {"nombre": "Base", "semilla": i, "tasa_llegada": 3.0}
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    return str(tmp_path / "cache" / "resultados.sqlite")
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    """time.time del cache avanzando de a un segundo: el orden de uso es exacto."""
+    segundos = itertools.count(1)
+    monkeypatch.setattr(cache_resultados.time, "time", lambda: float(next(segundos)))
+
+
+def test_acierto_y_fallo(ruta):
+    cache = CacheResultados(ruta, version="v1")
+    assert cache.obtener(config(1)) is None
+    cache.guardar(config(1), {"espera_prom": 1.5})
+    assert cache.obtener(config(1)) == {"espera_prom": 1.5}
+    # Mismo config en otro orden: misma clave
+    assert cache.obtener(dict(reversed(list(config(1).items())))) == {"espera_prom": 1.5}
+    assert cache.obtener(config(2)) is None
+    assert cache.obtener_muchos([config(2), config(1)]) == [None, {"espera_prom": 1.5}]
+    assert len(cache) == 1
+
+
+def test_persiste_entre_instancias(ruta):
+    CacheResultados(ruta, version="v1").guardar(config(1), {"x": 1})
+    assert CacheResultados(ruta, version="v1").obtener(config(1)) == {"x": 1}
+
+
+def test_otra_version_invalida(ruta):
+    CacheResultados(ruta, version="v1").guardar_muchos([config(1), config(2)], [{"x": 1}, {"x": 2}])
+    nuevo = CacheResultados(ruta, version="v2")
+    assert len(nuevo) == 0
+    assert nuevo.obtener(config(1)) is None
+
+
+def test_version_modelo_sigue_el_codigo(ruta, tmp_path, monkeypatch):
+    for nombre in cache_resultados.ARCHIVOS_MODELO:
+        (tmp_path / nombre).write_text("# modelo\n")
+    monkeypatch.setattr(cache_resultados, "DIRECTORIO", str(tmp_path))
+    antes = version_modelo()
+    CacheResultados(ruta).guardar(config(1), {"x": 1})
+    assert CacheResultados(ruta).obtener(config(1)) == {"x": 1}
+
+    (tmp_path / cache_resultados.ARCHIVOS_MODELO[0]).write_text("# modelo cambiado\n")
+    assert version_modelo() != antes
+    assert clave_config(config(1), version_modelo()) != clave_config(config(1), antes)
+    assert CacheResultados(ruta).obtener(config(1)) is None
+
+
+def test_lru_al_pasar_el_tope(ruta, reloj):
+    cache = CacheResultados(ruta, max_entradas=3, version="v1")
+    for i in range(3):
+        cache.guardar(config(i), {"i": i})
+    cache.obtener(config(0))              # 0 pasa a ser el mas reciente
+    cache.guardar(config(3), {"i": 3})    # se pasa del tope: sale el 1
+    assert len(cache) == 3
+    assert cache.obtener(config(1)) is None
+    assert [r["i"] for r in cache.obtener_muchos([config(0), config(2), config(3)])] == [0, 2, 3]
+
+    cache.guardar_muchos([config(4), config(5)], [{"i": 4}, {"i": 5}])
+    assert len(cache) == 3
+    assert cache.obtener_muchos([config(0), config(2), config(3)]).count(None) == 2
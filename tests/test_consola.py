@@ -0,0 +1,53 @@
+"""
+Argumentos de consola de simulacion_apoyo_escolar.py: lo que no se
+entiende o no se puede combinar se rechaza con parser.error (sale con
+codigo 2) antes de correr nada.
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulacion_apoyo_escolar import main, tolerancias_precision  # noqa: E402
+
+
+def test_precision_se_lee_como_diccionario():
+    assert tolerancias_precision("espera_prom=0.1, espera_por_dificultad.Grave.promedio=1") == {
+        "espera_prom": 0.1, "espera_por_dificultad.Grave.promedio": 1.0}
+
+
+@pytest.mark.parametrize("texto", ["espera", "a=b=c", "espera_prom=x", "espera_prom=0",
+                                   "no_existe=1", "voluntarios=1", "nombre=1"])
+def test_precision_invalida(texto, capsys):
+    with pytest.raises(SystemExit) as salida:
+        main(["--precision", texto])
+    assert salida.value.code == 2
+    assert "--precision" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("argumentos", [
+    ["--precision", "espera_prom=0.1", "--replicas", "10"],
+    ["--precision", "espera_prom=0.1", "--estacionario"],
+    ["--instrumentar", "--replicas", "10"],
+    ["--estacionario", "--replicas", "10"],
+    ["--instrumentar", "--estacionario"],
+    ["--instrumentar", "--profile", "perfil.prof"],
+])
+def test_modos_que_no_se_combinan(argumentos, capsys):
+    with pytest.raises(SystemExit) as salida:
+        main(argumentos)
+    assert salida.value.code == 2
+    assert "no se pueden combinar" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("replicas", ["5", "1"])
+def test_antiteticas_con_replicas_impares(replicas, capsys):
+    with pytest.raises(SystemExit) as salida:
+        main(["--replicas", replicas, "--antiteticas"])
+    assert salida.value.code == 2
+    assert "--replicas tiene que ser par" in capsys.readouterr().err
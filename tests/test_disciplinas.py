@@ -0,0 +1,107 @@
+"""
+Disciplinas de la lista de espera: "gravedad" baja la espera de los
+Graves contra "fifo", y "envejecimiento" le pone tope a cuanto puede
+quedar relegado un Leve (con "gravedad" puede no salir nunca).
+
+Las comparaciones van pareadas (mismas semillas) y con varias semillas
+maestras: el IC de la diferencia tiene que quedar del lado esperado con
+todas, y los IC de las distintas semillas tienen que solaparse.
+
+    python -m pytest -q tests
+"""
+
+import itertools
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replicas import comparar_pareado, kpi  # noqa: E402
+from simulacion_apoyo_escolar import (  # noqa: E402
+    ESCENARIO_A,
+    ESCENARIO_B,
+    ESCENARIO_BASE,
+    ListaEspera,
+    Voluntario,
+)
+
+REPLICAS = 30
+SEMILLAS = [1, 2, 3]
+ESCENARIOS = [ESCENARIO_A, ESCENARIO_BASE, ESCENARIO_B]
+
+
+def diferencias(config, a, b, nivel):
+    """IC pareado de la espera de `nivel` con la disciplina b menos con a, por semilla."""
+    clave = f"espera_por_dificultad.{nivel}.promedio"
+    return [kpi(comparar_pareado(dict(config, disciplina=a), dict(config, disciplina=b),
+                                 REPLICAS, workers=1, semilla=s, motor="rapido")["diferencia"],
+                clave)
+            for s in SEMILLAS]
+
+
+def se_solapan(ics):
+    return all(abs(x["media"] - y["media"]) <= x["semi_ancho"] + y["semi_ancho"] + 1e-9
+               for x, y in itertools.combinations(ics, 2))
+
+
+# -- En la simulacion --
+
+@pytest.mark.parametrize("config", ESCENARIOS, ids=lambda e: e["nombre"])
+def test_gravedad_baja_la_espera_de_los_graves(config):
+    ics = diferencias(config, "fifo", "gravedad", "Grave")
+    assert all(d["ic_sup"] < 0 for d in ics)
+    assert se_solapan(ics)
+
+
+@pytest.mark.parametrize("config", ESCENARIOS, ids=lambda e: e["nombre"])
+def test_envejecimiento_relega_menos_a_los_leves(config):
+    ics = diferencias(config, "gravedad", "envejecimiento", "Leve")
+    assert all(d["ic_sup"] < 0 for d in ics)
+    assert se_solapan(ics)
+
+
+@pytest.mark.parametrize("config", [ESCENARIO_BASE, ESCENARIO_B], ids=lambda e: e["nombre"])
+def test_envejecimiento_sigue_priorizando_graves(config):
+    ics = diferencias(config, "fifo", "envejecimiento", "Grave")
+    assert all(d["ic_sup"] < 0 for d in ics)
+    assert se_solapan(ics)
+
+
+# -- En la lista --
+
+def servir_leve_entre_graves(disciplina, ventaja=1.0, paso=0.5, pasos=40):
+    """
+    Un Leve espera desde t=0 y cada `paso` semanas llega un Grave de la
+    misma area y se libera un voluntario. Devuelve cuando llego el
+    ultimo Grave que paso antes que el Leve (None si el Leve no sale).
+    """
+    lista = ListaEspera(disciplina, ventaja)
+    leve = lista.estacionar(1, "matematica", "leve", ahora=0.0)
+    voluntario = Voluntario(0, "Vol-01", 3, "matematica")
+    ultimo = 0.0
+    for k in range(1, pasos + 1):
+        lista.estacionar(3, "matematica", k * paso, ahora=k * paso)
+        lugar = lista.siguiente_para(voluntario, False)
+        if lugar is leve:
+            return ultimo
+        ultimo = lugar.aviso
+    return None
+
+
+def test_gravedad_puede_relegar_para_siempre():
+    assert servir_leve_entre_graves("gravedad") is None
+
+
+def test_fifo_no_relega():
+    assert servir_leve_entre_graves("fifo") == 0.0
+
+
+@pytest.mark.parametrize("ventaja", [0.5, 1.0, 2.0, 5.0])
+def test_envejecimiento_acota_lo_relegado(ventaja):
+    # Un Grave pasa adelante de un Leve solo si llego menos de 2 * ventaja despues
+    ultimo = servir_leve_entre_graves("envejecimiento", ventaja)
+    assert ultimo is not None
+    assert ultimo < 2 * ventaja
+    assert ultimo >= 2 * ventaja - 0.5
@@ -0,0 +1,112 @@
+"""
+MSER-5 y medias por lotes sobre series sinteticas con transitorio
+conocido: el corte tiene que caer donde termina el transitorio, y los
+IC por lotes cubrir la media de una serie correlacionada.
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from estado_estacionario import correr_estacionario, medias_por_lotes, mser  # noqa: E402
+from simulacion_apoyo_escolar import ESCENARIO_BASE  # noqa: E402
+
+SEMILLAS = range(5)
+
+
+def ar1(n, phi, semilla, media=0.0):
+    """Serie AR(1) estacionaria (arranca en la distribucion estable)."""
+    e = np.random.default_rng(semilla).normal(0, 1, n)
+    x = np.empty(n)
+    x[0] = e[0] / np.sqrt(1 - phi ** 2)
+    for i in range(1, n):
+        x[i] = phi * x[i - 1] + e[i]
+    return x + media
+
+
+# -- MSER --
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_mser_escalon(semilla):
+    # 300 observaciones corridas en +5 y despues ruido alrededor de 0
+    serie = np.random.default_rng(semilla).normal(0, 1, 5000)
+    serie[:300] += 5
+    truncado, estacionario = mser(serie)
+    assert 300 <= truncado <= 310
+    assert estacionario
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_mser_decaimiento(semilla):
+    # 10 exp(-t / 100): baja del desvio del ruido en t = 230
+    t = np.arange(5000)
+    serie = 10 * np.exp(-t / 100) + np.random.default_rng(semilla).normal(0, 1, len(t))
+    truncado, estacionario = mser(serie)
+    assert 150 <= truncado <= 500
+    assert estacionario
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_mser_sin_transitorio(semilla):
+    truncado, estacionario = mser(np.random.default_rng(semilla).normal(0, 1, 5000))
+    assert truncado <= 50
+    assert estacionario
+
+
+def test_mser_tendencia_no_es_estacionaria():
+    serie = 0.01 * np.arange(5000) + np.random.default_rng(0).normal(0, 1, 5000)
+    truncado, estacionario = mser(serie)
+    assert truncado == 2500
+    assert not estacionario
+
+
+def test_mser_serie_corta():
+    assert mser([1.0] * 9) == (0, False)
+
+
+# -- Medias por lotes --
+
+def test_lotes_descarta_el_principio():
+    valores = np.arange(105, dtype=float)
+    r = medias_por_lotes(valores, lotes=10)
+    assert r["tam_lote"] == 10
+    assert r["media"] == pytest.approx(valores[5:].mean())
+    assert medias_por_lotes(valores[:9], lotes=10) is None
+
+
+def cobertura(lotes, phi=0.8, n=10_000, repeticiones=200):
+    resumenes = [medias_por_lotes(ar1(n, phi, s, media=3.0), lotes) for s in range(repeticiones)]
+    cubre = np.mean([r["ic_inf"] <= 3.0 <= r["ic_sup"] for r in resumenes])
+    return cubre, np.mean([r["autocorrelacion"] for r in resumenes])
+
+
+def test_lotes_largos_cubren_serie_correlacionada():
+    cubre, autocorrelacion = cobertura(lotes=20)
+    assert cubre >= 0.88
+    assert abs(autocorrelacion) < 0.2
+
+
+def test_lotes_cortos_avisan_autocorrelacion():
+    # Lotes de 5 con phi = 0.8: las medias siguen correlacionadas y el IC queda corto
+    cubre, autocorrelacion = cobertura(lotes=2000)
+    assert cubre < 0.85
+    assert autocorrelacion > 0.3
+
+
+# -- Corrida --
+
+def test_corrida_estable_y_saturada():
+    # Base tiene rho = 2.25 en el Equipo Profesional: la cola crece siempre
+    saturada = correr_estacionario(ESCENARIO_BASE, tiempo=520)
+    assert not saturada["estacionario"]
+
+    estable = correr_estacionario(dict(ESCENARIO_BASE, num_profesionales=6), tiempo=520)
+    assert estable["estacionario"]
+    assert estable["t_truncado"] < 260
+    assert estable["espera_prom"]["ic_inf"] <= estable["espera_prom"]["media"]
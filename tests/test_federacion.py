@@ -0,0 +1,49 @@
+"""
+Federacion: repartir los centros en 1 o en N procesos da exactamente
+el mismo resultado (con y sin equipo regional).
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from federacion import correr_federacion, federacion_ejemplo  # noqa: E402
+
+REDES = [
+    {"nombre": "con regional", "federacion": federacion_ejemplo()},
+    {"nombre": "sin regional", "federacion": federacion_ejemplo(regionales=0)},
+    {"nombre": "chica", "federacion": federacion_ejemplo(n_centros=6, voluntarios=10, tasa=20.0,
+                                                       regionales=2, tiempo=20)},
+]
+
+
+@pytest.fixture(scope="module", params=REDES, ids=lambda e: e["nombre"])
+def serial(request):
+    federacion = request.param["federacion"]
+    return federacion, correr_federacion(federacion, workers=1)
+
+
+@pytest.mark.parametrize("workers", [2, 3, 4])
+def test_mismo_resultado_en_paralelo(serial, workers):
+    federacion, esperado = serial
+    assert correr_federacion(federacion, workers=workers) == esperado
+
+
+def test_total_suma_los_centros(serial):
+    federacion, r = serial
+    assert r["total"]["centros"] == len(federacion["centros"]) == len(r["centros"])
+    for clave in ("llegaron", "atendidos", "no_atendidos", "en_proceso", "derivados"):
+        assert r["total"][clave] == sum(c[clave] for c in r["centros"])
+    if not federacion["profesionales_regionales"]:
+        assert r["total"]["derivados"] == 0
+
+
+def test_demora_regional_positiva():
+    federacion = dict(federacion_ejemplo(n_centros=2, voluntarios=5, tasa=5.0), demora_regional=0)
+    with pytest.raises(ValueError, match="demora_regional"):
+        correr_federacion(federacion, workers=1)
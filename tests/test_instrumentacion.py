@@ -0,0 +1,49 @@
+"""
+Contadores de instrumentacion.py: la politica sale de la simulacion (no
+de los contadores) y el matching por lotes tambien se cuenta.
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from instrumentacion import correr_instrumentado  # noqa: E402
+from simulacion_apoyo_escolar import ESCENARIO_B, ESCENARIO_BASE  # noqa: E402
+
+# Solo matematica, con expertos: todo match es OPTIMO
+SOLO_MATEMATICA = dict(ESCENARIO_BASE, prob_area=[1.0, 0.0, 0.0], voluntarios_spec=[
+    {"nombre": f"Vol-{i}", "expertise": 3, "area": "matematica"} for i in range(4)])
+
+
+def test_permisiva_con_solo_optimos_no_se_reporta_estricta():
+    r, inst = correr_instrumentado(SOLO_MATEMATICA)
+    niveles = inst.reporte()["matching"]["niveles"]
+    assert r["optimos"] > 0
+    assert r["suboptimos"] == r["generalistas"] == 0
+    # Los que no encontraron OPTIMO (no habia nadie libre) siguieron
+    # probando los otros niveles
+    assert niveles["OPTIMO"]["fallos"] > 0
+    assert niveles["SUBOPTIMO"]["intentos"] == niveles["OPTIMO"]["fallos"]
+    assert niveles["GENERALISTA"]["intentos"] == niveles["SUBOPTIMO"]["fallos"]
+
+
+def test_estricta_no_prueba_otros_niveles():
+    _, inst = correr_instrumentado(dict(ESCENARIO_BASE, permitir_generalista=False),
+                                   motor="rapido")
+    niveles = inst.reporte()["matching"]["niveles"]
+    assert niveles["OPTIMO"]["fallos"] > 0
+    assert niveles["SUBOPTIMO"]["intentos"] == niveles["GENERALISTA"]["intentos"] == 0
+
+
+def test_lotes_cuenta_los_pares_asignados():
+    r, inst = correr_instrumentado(dict(ESCENARIO_B, matching="lotes"), motor="rapido")
+    rep = inst.reporte()
+    assert rep["motor"] == "lotes"
+    assert rep["eventos"]["epoca"] > 0
+    niveles = rep["matching"]["niveles"]
+    assert rep["matching"]["llamadas"] == r["total_match"] > 0
+    assert [niveles[n]["aciertos"] for n in niveles] == [
+        r["optimos"], r["suboptimos"], r["generalistas"]]
@@ -0,0 +1,137 @@
+"""
+La lista de espera (ListaEspera) contra la version anterior, en la que
+cada niño sin voluntario volvia a preguntar cada 0.25 semanas.
+
+Las dos versiones tienen que dar la misma espera y el mismo mal matching
+en promedio. Lo que cambia a proposito es el orden entre los que
+esperan: con la lista se atiende primero al que espera desde antes, asi
+que abandonan menos niños que con el sondeo. Y nadie puede esperar
+voluntario mas de max_espera_vol semanas.
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replicas import configs_replicas, resumir_valores  # noqa: E402
+from simulacion_apoyo_escolar import (  # noqa: E402
+    ESCENARIO_A,
+    ESCENARIO_B,
+    ESCENARIO_BASE,
+    ESCENARIO_BASE_ESTRICTO,
+    Simulacion,
+    buscar_voluntario,
+    correr_simulacion,
+)
+
+SEMILLAS = 40
+KPIS = ["espera_prom", "mal_matching"]
+
+
+class SimulacionSondeo(Simulacion):
+    """
+    Referencia: el bucle de la version anterior tal cual. El niño sin
+    voluntario vuelve a preguntar cada 0.25 semanas y se va a las
+    max_espera_vol semanas.
+    """
+
+    def proceso_nino(self, numero, dificultad, area, duracion_eval, duracion):
+        env = self.env
+        self.ninos_llegaron += 1
+        t_inicio = env.now
+
+        t_pre = env.now
+        with self.equipo_prof.request() as turno:
+            yield turno
+            self.espera_prof.agregar(env.now - t_pre)
+            self.tiempo_uso_prof += duracion_eval
+            yield env.timeout(duracion_eval)
+
+        t_pre = env.now
+        voluntario = None
+        while voluntario is None:
+            voluntario, tipo_match = buscar_voluntario(
+                self.pool, dificultad, area, self.permitir_generalista)
+            if voluntario is None:
+                if env.now - t_pre >= self.max_espera_vol:
+                    self.ninos_no_atendidos += 1
+                    self.espera_por_dificultad[dificultad].agregar(env.now - t_pre)
+                    return
+                yield env.timeout(0.25)
+
+        espera_vol = env.now - t_pre
+        self.espera_vol.agregar(espera_vol)
+        self.espera_por_dificultad[dificultad].agregar(espera_vol)
+        self.matches[tipo_match] += 1
+
+        yield env.timeout(duracion)
+        self.pool.tiempo_ocupado[voluntario.indice] += duracion
+        self.ninos_atendidos += 1
+        self.espera.agregar((env.now - t_inicio) - duracion)
+        self.pool.devolver(voluntario)
+
+
+ESCENARIOS = [ESCENARIO_BASE, ESCENARIO_A, ESCENARIO_B, ESCENARIO_BASE_ESTRICTO]
+
+
+@pytest.fixture(scope="module")
+def corridas():
+    """Las dos versiones sobre las mismas semillas, por escenario."""
+    todas = {}
+    for escenario in ESCENARIOS:
+        configs = configs_replicas(escenario, SEMILLAS)
+        todas[escenario["nombre"]] = (
+            [correr_simulacion(c, silencioso=True) for c in configs],
+            [SimulacionSondeo(c).correr() for c in configs])
+    return todas
+
+
+def resumen(corridas):
+    return {k: resumir_valores([r[k] for r in corridas]) for k in KPIS}
+
+
+@pytest.mark.parametrize("escenario", ESCENARIOS, ids=lambda e: e["nombre"])
+def test_misma_media_que_sondeo(corridas, escenario):
+    lista, sondeo = (resumen(c) for c in corridas[escenario["nombre"]])
+    for k in KPIS:
+        a, b = lista[k], sondeo[k]
+        # Los IC 95% de las dos versiones se tienen que solapar
+        assert abs(a["media"] - b["media"]) <= a["semi_ancho"] + b["semi_ancho"] + 1e-9, (
+            f"{k}: lista {a['media']:.3f} +- {a['semi_ancho']:.3f}, "
+            f"sondeo {b['media']:.3f} +- {b['semi_ancho']:.3f}")
+
+
+@pytest.mark.parametrize("escenario", ESCENARIOS, ids=lambda e: e["nombre"])
+def test_lista_abandona_menos_que_sondeo(corridas, escenario):
+    # Esto si cambia a proposito: con la lista el voluntario que se libera
+    # va al que espera desde antes. Con el sondeo se lo lleva el primero
+    # que pregunta (muchas veces un recien evaluado) y algunos de los que
+    # esperan llegan a max_espera_vol aunque pasen voluntarios.
+    lista, sondeo = corridas[escenario["nombre"]]
+    dif = resumir_valores([a["no_atendidos"] - b["no_atendidos"]
+                           for a, b in zip(lista, sondeo)])
+    assert dif["ic_sup"] < 0, (
+        f"no_atendidos lista - sondeo: {dif['media']:.3f} "
+        f"[{dif['ic_inf']:.3f}, {dif['ic_sup']:.3f}]")
+    if escenario["permitir_generalista"]:
+        assert all(r["no_atendidos"] == 0 for r in lista)
+
+
+@pytest.mark.parametrize("motor", ["simpy", "rapido"])
+@pytest.mark.parametrize("escenario", [ESCENARIO_A, ESCENARIO_BASE_ESTRICTO],
+                         ids=lambda e: e["nombre"])
+def test_nadie_espera_mas_que_max_espera_vol(escenario, motor):
+    max_espera = escenario.get("max_espera_vol", 8)
+    for config in configs_replicas(escenario, 10):
+        eventos = []
+        correr_simulacion(config, silencioso=True, motor=motor, traza=eventos.append)
+        asignaciones = [e["espera"] for e in eventos if e["tipo"] == "asignacion"]
+        abandonos = [e["espera"] for e in eventos if e["tipo"] == "abandono"]
+        assert asignaciones
+        assert max(asignaciones) <= max_espera + 1e-9
+        assert all(abs(espera - max_espera) < 1e-9 for espera in abandonos)
@@ -0,0 +1,112 @@
+"""
+Metamodelo: sin ruido el proceso gaussiano pasa por los puntos de
+entrenamiento (y se abre lejos de ellos), el metamodelo reproduce las
+corridas con que se entreno y no predice fuera de su region ni con
+otra version de la simulacion.
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metamodelo  # noqa: E402
+from metamodelo import (  # noqa: E402
+    KPIS,
+    REGION,
+    ProcesoGaussiano,
+    cargar_metamodelo,
+    config_de,
+    entrenar,
+    puntos_muestra,
+    simular_puntos,
+)
+from simulacion_apoyo_escolar import ESCENARIO_BASE, generar_voluntarios  # noqa: E402
+
+# Region chica (horizonte corto) para que entrenar sea barato
+REGION_CHICA = dict(REGION, tiempo_simulacion=(12, 20))
+PUNTOS = 15
+
+
+@pytest.fixture(scope="module")
+def modelo():
+    # Con una replica el ruido es cero: el modelo tiene que interpolar
+    return entrenar(puntos=PUNTOS, replicas=1, region=REGION_CHICA, workers=1)
+
+
+@pytest.fixture(scope="module")
+def entrenamiento():
+    base = dict(ESCENARIO_BASE, motor="rapido")
+    configs = [config_de(p, base) for p in puntos_muestra(PUNTOS, REGION_CHICA)]
+    medias, _ = simular_puntos(configs, 1, workers=1)
+    return configs, medias
+
+
+# -- Proceso gaussiano --
+
+def test_gp_interpola_sin_ruido():
+    rng = np.random.default_rng(0)
+    X = rng.random((30, 2))
+    y = np.sin(4 * X[:, 0]) + X[:, 1] ** 2
+    gp = ProcesoGaussiano().ajustar(X, y, np.zeros(len(y)))
+    media, desvio = gp.predecir(X)
+    assert media == pytest.approx(y, abs=1e-3)
+    assert desvio.max() < 0.01
+
+    _, lejos = gp.predecir(np.array([[3.0, 3.0]]))
+    assert lejos[0] > 10 * desvio.max()
+
+
+def test_gp_con_ruido_no_persigue_el_azar():
+    rng = np.random.default_rng(1)
+    X = rng.random((40, 1))
+    y = 2 * X[:, 0] + rng.normal(0, 0.3, len(X))
+    gp = ProcesoGaussiano().ajustar(X, y, np.full(len(y), 0.09))
+    media, _ = gp.predecir(X)
+    # Se acerca a la recta, no a los puntos con ruido
+    assert np.mean((media - 2 * X[:, 0]) ** 2) < np.mean((y - 2 * X[:, 0]) ** 2) / 2
+
+
+# -- Metamodelo --
+
+def test_reproduce_el_entrenamiento(modelo, entrenamiento):
+    configs, medias = entrenamiento
+    predicho = modelo.predecir_muchos(configs)
+    for kpi in KPIS:
+        assert predicho[kpi]["media"] == pytest.approx(medias[kpi], abs=1e-3), kpi
+
+
+def test_guardar_y_cargar(modelo, entrenamiento, tmp_path):
+    configs, _ = entrenamiento
+    ruta = str(tmp_path / "m.npz")
+    modelo.guardar(ruta)
+    cargado = cargar_metamodelo(ruta)
+    assert cargado.region == modelo.region
+    assert cargado.predecir(configs[0]) == modelo.predecir(configs[0])
+    assert cargar_metamodelo(str(tmp_path / "no_existe.npz")) is None
+
+
+def test_dentro(modelo, entrenamiento):
+    config = entrenamiento[0][0]
+    assert modelo.dentro(config)
+    assert not modelo.dentro(dict(config, tasa_llegada=20.0))
+    assert not modelo.dentro(dict(config, tiempo_simulacion=52))  # fuera de la region chica
+    assert not modelo.dentro(dict(config, num_profesionales=0))
+    assert not modelo.dentro(dict(config, voluntarios_spec=generar_voluntarios(30)))
+    assert not modelo.dentro(dict(config, max_espera_vol=4))
+    otros = [dict(v, expertise=3) for v in config["voluntarios_spec"]]
+    assert not modelo.dentro(dict(config, voluntarios_spec=otros))
+
+
+def test_vigente(modelo, tmp_path, monkeypatch):
+    assert modelo.vigente()
+    ruta = str(tmp_path / "m.npz")
+    modelo.guardar(ruta)
+    monkeypatch.setattr(metamodelo, "version_modelo", lambda: "otra")
+    assert not modelo.vigente()
+    assert not cargar_metamodelo(ruta).vigente()
@@ -0,0 +1,47 @@
+"""
+El motor rapido (heap de eventos) contra el de SimPy: sobre las mismas
+semillas los KPIs tienen que coincidir en distribucion (IC 95% que se
+solapan). Casi siempre salen identicos corrida a corrida; solo pueden
+cambiar empates en el mismo instante.
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replicas import configs_replicas, resumir_valores  # noqa: E402
+from simulacion_apoyo_escolar import (  # noqa: E402
+    ESCENARIO_A,
+    ESCENARIO_B,
+    ESCENARIO_BASE,
+    ESCENARIO_BASE_ESTRICTO,
+    ESCENARIO_C,
+    ESCENARIO_D,
+    correr_simulacion,
+)
+
+SEMILLAS = 40
+KPIS = ["espera_prom", "espera_p90", "espera_prof", "espera_vol", "mal_matching",
+        "atendidos", "no_atendidos", "ocup_prof", "ocup_vol"]
+
+
+@pytest.mark.parametrize("escenario", [
+    ESCENARIO_BASE, ESCENARIO_A, ESCENARIO_B, ESCENARIO_C, ESCENARIO_D,
+    ESCENARIO_BASE_ESTRICTO,
+    dict(ESCENARIO_B, nombre="B largo, numpy", tiempo_simulacion=260, muestreo="numpy"),
+], ids=lambda e: e["nombre"])
+def test_misma_distribucion_que_simpy(escenario):
+    configs = configs_replicas(escenario, SEMILLAS)
+    simpy = [correr_simulacion(c, silencioso=True, motor="simpy") for c in configs]
+    rapido = [correr_simulacion(c, silencioso=True, motor="rapido") for c in configs]
+    for k in KPIS:
+        a = resumir_valores([r[k] for r in simpy])
+        b = resumir_valores([r[k] for r in rapido])
+        assert abs(a["media"] - b["media"]) <= a["semi_ancho"] + b["semi_ancho"] + 1e-9, (
+            f"{k}: simpy {a['media']:.3f} +- {a['semi_ancho']:.3f}, "
+            f"rapido {b['media']:.3f} +- {b['semi_ancho']:.3f}")
@@ -0,0 +1,36 @@
+"""
+muestreo.sortear_replicas contra lo que sortea cada replica al correr:
+la fila i tiene que ser la replica i de configs_replicas.
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from muestreo import AREAS, MuestreoNumpy, sortear_replicas  # noqa: E402
+from replicas import configs_replicas  # noqa: E402
+from simulacion_apoyo_escolar import ESCENARIO_B  # noqa: E402
+
+
+# 50 cae en el primer bloque; 3000 necesita varios de BLOQUE
+@pytest.mark.parametrize("n", [50, 3000])
+@pytest.mark.parametrize("antitetico", [False, True])
+def test_filas_son_las_replicas(antitetico, n):
+    config = dict(ESCENARIO_B, muestreo="numpy", antitetico=antitetico)
+    sorteo = sortear_replicas(config, 4, n, desde=3)
+    for i, c in enumerate(configs_replicas(config, 4, desde=3)):
+        muestreo = MuestreoNumpy(c)
+        llegadas = [muestreo.interarribo() for _ in range(n)]
+        ninos = [muestreo.nino() for _ in range(n)]
+        assert sorteo["interarribos"][i].tolist() == llegadas
+        assert np.allclose(sorteo["llegadas"][i], np.cumsum(llegadas))
+        assert sorteo["dificultad"][i].tolist() == [x[0] for x in ninos]
+        assert [AREAS[a] for a in sorteo["area"][i]] == [x[1] for x in ninos]
+        assert sorteo["duracion_eval"][i].tolist() == [x[2] for x in ninos]
+        assert sorteo["duracion"][i].tolist() == [x[3] for x in ninos]
@@ -0,0 +1,81 @@
+"""
+Optimizador: profesionales_minimos da el menor num_profesionales que
+cumple y el limite de niños sin atencion se respeta (sin el, la
+busqueda se queda con mezclas que dejan abandonar a medio mundo).
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from optimizador import Evaluador, mezcla_holgada, optimizar, profesionales_minimos  # noqa: E402
+from simulacion_apoyo_escolar import ESCENARIO_BASE  # noqa: E402
+
+BASE = dict(ESCENARIO_BASE, tiempo_simulacion=30, motor="rapido")
+ESTRICTO = dict(ESCENARIO_BASE, motor="rapido", permitir_generalista=False)
+REPLICAS = {"replicas_min": 3, "replicas_max": 6, "paso": 3}
+
+
+class EvaluadorUmbral:
+    """Cumple a partir de `umbral` profesionales; anota lo que se pide."""
+
+    def __init__(self, umbral):
+        self.base = BASE
+        self.umbral = umbral
+        self.pedidos = []
+
+    def evaluar(self, candidatos):
+        self.pedidos += [p for p, _ in candidatos]
+        return [{"cumple": p >= self.umbral} for p, _ in candidatos]
+
+
+# -- Profesionales minimos --
+
+@pytest.mark.parametrize("umbral", [1, 2, 4, 5, 6, 9, 17, 30])
+def test_biseccion_da_el_umbral(umbral):
+    evaluador = EvaluadorUmbral(umbral)
+    assert profesionales_minimos(evaluador, (1,) * 9) == umbral
+    assert len(evaluador.pedidos) <= 10
+
+
+def test_ninguno_cumple():
+    assert profesionales_minimos(EvaluadorUmbral(31), (1,) * 9) is None
+
+
+@pytest.mark.parametrize("espera_max", [1.8, 2.5])
+def test_minimo_cumple_y_uno_menos_no(espera_max):
+    evaluador = Evaluador(BASE, espera_max, 100, **REPLICAS)
+    holgada = mezcla_holgada(BASE)
+    minimo = profesionales_minimos(evaluador, holgada)
+    cumplen = [p for p in range(1, minimo + 2)
+               if evaluador.evaluar([(p, holgada)])[0]["cumple"]]
+    assert cumplen[0] == minimo
+    assert cumplen == list(range(minimo, minimo + 2))
+
+
+# -- Limite de sin atencion --
+
+def test_evaluador_rechaza_por_sin_atencion():
+    pocos = (1, 0, 0, 1, 0, 0, 1, 0, 0)
+    fila, = Evaluador(ESTRICTO, 100, 100, sin_atencion_max=5, **REPLICAS).evaluar([(5, pocos)])
+    assert fila["sin_atencion"] - fila["sin_atencion_ic"] > 5
+    assert fila["cumple"] is False
+
+    fila, = Evaluador(ESTRICTO, 100, 100, sin_atencion_max=100, **REPLICAS).evaluar([(5, pocos)])
+    assert fila["cumple"] is True
+
+
+def test_optimizar_respeta_sin_atencion():
+    kwargs = dict(profesionales_extra=0, workers=1, **REPLICAS)
+    con = optimizar(ESTRICTO, 4, 100, sin_atencion_max=5, **kwargs)
+    assert all(f["sin_atencion"] <= 5 for f in con["evaluados"] if f["cumple"])
+
+    # Sin el limite la mezcla mas barata deja irse a muchos mas
+    sin = optimizar(ESTRICTO, 4, 100, sin_atencion_max=100, **kwargs)
+    assert sin["mejor"]["costo"] < con["mejor"]["costo"]
+    assert sin["mejor"]["sin_atencion"] > 5
@@ -0,0 +1,76 @@
+"""
+replicas.py: intervalos de confianza con la t de Student, replicas
+que no dependen de cuantos procesos las corren y reduccion de varianza
+(antiteticas y variables de control) sobre configs fijos.
+
+    python -m pytest -q tests
+"""
+
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replicas import correr_replicas, resumir_valores, t_critico  # noqa: E402
+from simulacion_apoyo_escolar import ESCENARIO_B, ESCENARIO_BASE, ESCENARIO_D  # noqa: E402
+
+# Cuantiles 0.975 de la t de Student (tabla)
+T_975 = {1: 12.7062, 2: 4.3027, 3: 3.1824, 4: 2.7764, 9: 2.2622, 29: 2.0452, 99: 1.9842}
+
+
+@pytest.mark.parametrize("gl", sorted(T_975))
+def test_t_critico(gl):
+    tolerancia = 0.004 if gl == 3 else 0.001
+    assert t_critico(gl) == pytest.approx(T_975[gl], abs=tolerancia)
+
+
+def test_semi_ancho_usa_la_t():
+    r = resumir_valores([1.0, 2.0, 3.0, 4.0, 5.0])
+    assert r["media"] == 3.0
+    assert r["desvio"] == pytest.approx(math.sqrt(2.5))
+    assert r["semi_ancho"] == pytest.approx(t_critico(4) * math.sqrt(2.5) / math.sqrt(5))
+    assert r["semi_ancho"] == pytest.approx(1.9632, abs=1e-3)   # no 1.96 * ...
+    assert (r["ic_inf"], r["ic_sup"]) == (3.0 - r["semi_ancho"], 3.0 + r["semi_ancho"])
+
+
+def test_una_replica_no_tiene_ic():
+    r = resumir_valores([7.0])
+    assert r["semi_ancho"] == 0.0 and r["ic_inf"] == r["ic_sup"] == 7.0
+
+
+def test_paralelo_igual_a_serie():
+    config = dict(ESCENARIO_B, tiempo_simulacion=26)
+    serie = correr_replicas(config, 6, workers=1, motor="rapido")
+    paralelo = correr_replicas(config, 6, workers=3, motor="rapido")
+    assert serie["corridas"] == paralelo["corridas"]
+    assert serie["espera_prom"] == paralelo["espera_prom"]
+    assert len({r["espera_prom"] for r in serie["corridas"]}) > 1   # semillas distintas
+
+
+def test_antiteticas_reducen_varianza():
+    r = correr_replicas(ESCENARIO_BASE, 40, workers=1, motor="rapido", antiteticas=True)
+    assert len(r["pares"]) == 20
+    # Llegadas y espera van con el azar de las llegadas: el par las compensa
+    assert r["reduccion_varianza"]["llegaron"] > 1.5
+    assert r["reduccion_varianza"]["espera_prom"] > 1.5
+
+
+def test_antiteticas_piden_n_par():
+    with pytest.raises(ValueError):
+        correr_replicas(ESCENARIO_BASE, 5, workers=1, antiteticas=True)
+
+
+@pytest.mark.parametrize("escenario, clave, minimo", [
+    (ESCENARIO_BASE, "espera_prom", 1.0),
+    (ESCENARIO_D, "ocup_prof", 10.0),   # casi toda la varianza es de las llegadas
+])
+def test_variable_control_reduce_varianza(escenario, clave, minimo):
+    r = correr_replicas(escenario, 40, workers=1, motor="rapido", variable_control=True)
+    vc = r["variable_control"][clave]
+    assert vc["reduccion_varianza"] > minimo
+    assert vc["semi_ancho"] < vc["semi_ancho_crudo"]
+    assert vc["media_cruda"] == pytest.approx(r[clave]["media"])
+    assert abs(vc["media"] - vc["media_cruda"]) <= vc["semi_ancho_crudo"]
@@ -0,0 +1,121 @@
+"""
+Traza por niño: lo que escribe RegistroNinos se vuelve a leer igual con
+cargar_traza, en Parquet, Arrow IPC y columnas crudas, tambien con mas
+voluntarios de los que entran en un int16.
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulacion_apoyo_escolar import (  # noqa: E402
+    ESCENARIO_B,
+    ESCENARIO_BASE_ESTRICTO,
+    correr_simulacion,
+    generar_voluntarios,
+)
+from traza import COLUMNAS, MATCHES, RegistroNinos, cargar_traza  # noqa: E402
+
+FORMATOS = {
+    "parquet": "traza.parquet",
+    "arrow": "traza.arrow",
+    "columnas": "traza_columnas",
+}
+
+
+def ruta_de(tmp_path, formato):
+    if formato != "columnas":
+        pytest.importorskip("pyarrow")
+    return str(tmp_path / FORMATOS[formato])
+
+
+@pytest.mark.parametrize("formato", list(FORMATOS))
+@pytest.mark.parametrize("escenario", [ESCENARIO_B, ESCENARIO_BASE_ESTRICTO],
+                         ids=lambda e: e["nombre"])
+def test_ida_y_vuelta(tmp_path, formato, escenario):
+    ruta = ruta_de(tmp_path, formato)
+    config = dict(escenario, motor="rapido")
+    eventos = []
+
+    # Lotes chicos: la traza se escribe en varios pedazos
+    with RegistroNinos(ruta, config, tamano_lote=16) as registro:
+        def los_dos(evento):
+            eventos.append(evento)
+            registro(evento)
+        r = correr_simulacion(config, silencioso=True, traza=los_dos)
+    traza = cargar_traza(ruta)
+
+    assert len(traza) == r["llegaron"]
+    assert [traza[n].dtype for n, _, _ in COLUMNAS] == [np.dtype(d) for _, _, d in COLUMNAS]
+    assert int((~np.isnan(traza["fin_intervencion"])).sum()) == r["atendidos"]
+    assert int(traza["abandono"].sum()) == r["no_atendidos"]
+    assert sorted(traza["nino"].tolist()) == list(range(1, r["llegaron"] + 1))
+
+    # Fila por fila contra los eventos de la corrida
+    filas = {int(n): i for i, n in enumerate(traza["nino"])}
+    for e in eventos:
+        i = filas[e["nino"]]
+        if e["tipo"] == "llegada":
+            assert traza["llegada"][i] == e["t"]
+            assert traza["dificultad"][i] == e["dificultad"]
+            assert traza.categoria("area")[traza["area"][i]] == e["area"]
+        elif e["tipo"] == "evaluacion":
+            assert traza["fin_eval"][i] == e["t"] + e["duracion"]
+        elif e["tipo"] == "asignacion":
+            assert traza.categoria("voluntario")[traza["voluntario"][i]] == e["voluntario"]
+            assert MATCHES[traza["match"][i]] == e["match"]
+        elif e["tipo"] == "fin":
+            assert traza["fin_intervencion"][i] == e["t"]
+
+    df = traza.a_dataframe()
+    assert len(df) == len(traza)
+    assert df["abandono"].sum() == r["no_atendidos"]
+    assert traza.metadatos["escenario"] == config["nombre"]
+
+
+@pytest.mark.parametrize("formato", list(FORMATOS))
+def test_formatos_iguales(tmp_path, formato):
+    config = dict(ESCENARIO_B, motor="rapido")
+    with RegistroNinos(str(tmp_path / "referencia"), config) as registro:
+        correr_simulacion(config, silencioso=True, traza=registro)
+    ruta = ruta_de(tmp_path, formato)
+    with RegistroNinos(ruta, config) as registro:
+        correr_simulacion(config, silencioso=True, traza=registro)
+    referencia, traza = cargar_traza(str(tmp_path / "referencia")), cargar_traza(ruta)
+    for nombre, _, _ in COLUMNAS:
+        np.testing.assert_array_equal(traza[nombre], referencia[nombre])
+
+
+@pytest.mark.parametrize("formato", list(FORMATOS))
+def test_voluntarios_mas_alla_de_int16(tmp_path, formato):
+    # 40.000 voluntarios: los codigos pasan 32767 (antes era int16 y se desbordaba)
+    ruta = ruta_de(tmp_path, formato)
+    config = dict(ESCENARIO_B, voluntarios_spec=generar_voluntarios(40_000))
+    nombres = [v["nombre"] for v in config["voluntarios_spec"]]
+    elegidos = [0, 32_767, 32_768, 39_999]
+    with RegistroNinos(ruta, config) as registro:
+        for numero, codigo in enumerate(elegidos, 1):
+            registro({"t": 0.0, "tipo": "llegada", "nino": numero,
+                      "dificultad": 1, "area": "lectura"})
+            registro({"t": 1.0, "tipo": "asignacion", "nino": numero,
+                      "voluntario": nombres[codigo], "match": "OPTIMO"})
+            registro({"t": 5.0, "tipo": "fin", "nino": numero})
+    traza = cargar_traza(ruta)
+    assert traza["voluntario"].dtype == np.int32
+    assert traza["voluntario"].tolist() == elegidos
+    assert [traza.categoria("voluntario")[c] for c in traza["voluntario"]] == [
+        nombres[c] for c in elegidos]
+
+
+def test_corrida_sin_ninos(tmp_path):
+    config = dict(ESCENARIO_B, tiempo_simulacion=0.0, motor="rapido")
+    ruta = str(tmp_path / "vacia")
+    with RegistroNinos(ruta, config) as registro:
+        correr_simulacion(config, silencioso=True, traza=registro)
+    assert len(cargar_traza(ruta)) == 0
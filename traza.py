@@ -0,0 +1,314 @@
+"""
+Traza por niño en formato columnar (Parquet, Arrow IPC o columnas crudas).
+
+RegistroNinos se pasa como traza de una corrida y arma una fila por niño
+con todo su recorrido:
+
+    nino, llegada, dificultad, area, inicio_eval, fin_eval, voluntario,
+    match, fin_intervencion, abandono
+
+Las filas van a columnas tipadas (array.array, sin un diccionario por
+niño) y cada `tamano_lote` niños se bajan a disco, asi una corrida de
+millones de niños no acumula nada en memoria. Solo se guardan aparte los
+niños que todavia estan en el sistema. Las filas quedan en el orden en
+que cada niño sale del sistema (los que siguen adentro, al final). Los
+tiempos que no llegaron a pasar quedan en NaN y los codigos en -1.
+
+Dificultad va como 1-3; area, voluntario y match como codigos enteros,
+con las categorias guardadas en los metadatos del archivo.
+
+Formatos, segun la ruta:
+  - *.parquet           Parquet (hace falta pyarrow)
+  - *.arrow / *.feather Arrow IPC en formato archivo (hace falta pyarrow)
+  - cualquier otra      un directorio con un archivo binario por columna
+                        y un traza.json; solo necesita NumPy
+
+cargar_traza lee cualquiera de los tres mapeando el archivo a memoria,
+sin volver a correr la simulacion:
+
+    with RegistroNinos("trazas/b.arrow", config) as registro:
+        correr_simulacion(config, silencioso=True, traza=registro)
+    traza = cargar_traza("trazas/b.arrow")
+    traza["llegada"], traza.a_dataframe()
+
+Uso desde consola:
+    python traza.py --escenario B --tiempo 520 --salida trazas/b.arrow
+"""
+
+import argparse
+import json
+import math
+import os
+from array import array
+
+import numpy as np
+
+from simulacion_apoyo_escolar import crear_voluntarios
+
+AREAS = ["matematica", "lectura", "grafismo"]
+MATCHES = ["OPTIMO", "SUBOPTIMO", "GENERALISTA"]
+
+# (columna, typecode de array.array, dtype de NumPy)
+COLUMNAS = [
+    ("nino", "q", "int64"),
+    ("llegada", "d", "float64"),
+    ("dificultad", "b", "int8"),
+    ("area", "b", "int8"),
+    ("inicio_eval", "d", "float64"),
+    ("fin_eval", "d", "float64"),
+    ("voluntario", "i", "int32"),
+    ("match", "b", "int8"),
+    ("fin_intervencion", "d", "float64"),
+    ("abandono", "B", "uint8"),
+]
+CATEGORICAS = {"area": "areas", "voluntario": "voluntarios", "match": "matches"}
+
+NAN = math.nan
+
+
+def formato_de(ruta):
+    if ruta.endswith(".parquet"):
+        return "parquet"
+    if ruta.endswith((".arrow", ".feather", ".ipc")):
+        return "arrow"
+    return "columnas"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(
+            "Para trazas Parquet/Arrow hace falta pyarrow (pip install pyarrow); "
+            "sin pyarrow se puede usar un directorio de columnas."
+        ) from None
+    return pyarrow
+
+
+class RegistroNinos:
+    """
+    Traza de una corrida, una fila por niño. Se usa como traza de
+    crear_simulacion / correr_simulacion y hay que cerrarlo al final
+    (o usarlo con `with`) para que se bajen los niños que quedaron.
+    """
+
+    def __init__(self, ruta, config, tamano_lote=65_536):
+        self.ruta = ruta
+        self.formato = formato_de(ruta)
+        self.tamano_lote = tamano_lote
+        self.voluntarios = [v.nombre for v in crear_voluntarios(config["voluntarios_spec"])]
+        self._codigo_vol = {nombre: i for i, nombre in enumerate(self.voluntarios)}
+        self._codigo_area = {a: i for i, a in enumerate(AREAS)}
+        self._codigo_match = {m: i for i, m in enumerate(MATCHES)}
+        self.metadatos = {
+            "escenario": config["nombre"],
+            "semilla": str(config.get("semilla")),
+            "areas": AREAS,
+            "voluntarios": self.voluntarios,
+            "matches": MATCHES,
+        }
+        self.en_curso = {}       # numero de niño -> fila a medio llenar (lista)
+        self.filas = 0           # filas ya bajadas a disco
+        self._escritor = None
+        self._archivos = None
+        self._nuevas_columnas()
+
+    def _nuevas_columnas(self):
+        self.columnas = [array(tipo) for _, tipo, _ in COLUMNAS]
+
+    # -- Eventos de la simulacion --
+
+    def __call__(self, evento):
+        tipo = evento["tipo"]
+        numero = evento["nino"]
+        t = evento["t"]
+        if tipo == "llegada":
+            self.en_curso[numero] = [
+                numero, t, evento["dificultad"], self._codigo_area[evento["area"]],
+                NAN, NAN, -1, -1, NAN, 0,
+            ]
+            return
+        fila = self.en_curso[numero]
+        if tipo == "evaluacion":
+            fila[4] = t
+            fila[5] = t + evento["duracion"]
+        elif tipo == "asignacion":
+            fila[6] = self._codigo_vol[evento["voluntario"]]
+            fila[7] = self._codigo_match[evento["match"]]
+        elif tipo == "fin":
+            fila[8] = t
+            self._terminar(numero)
+        elif tipo == "abandono":
+            fila[9] = 1
+            self._terminar(numero)
+
+    def _terminar(self, numero):
+        fila = self.en_curso.pop(numero)
+        for columna, valor in zip(self.columnas, fila):
+            columna.append(valor)
+        if len(self.columnas[0]) >= self.tamano_lote:
+            self._bajar()
+
+    # -- Escritura --
+
+    def _bajar(self):
+        """Escribe el lote actual y empieza columnas nuevas."""
+        n = len(self.columnas[0])
+        if n == 0:
+            return
+        if self.formato == "columnas":
+            self._bajar_columnas()
+        else:
+            self._bajar_arrow()
+        self.filas += n
+        self._nuevas_columnas()
+
+    def _bajar_columnas(self):
+        if self._archivos is None:
+            os.makedirs(self.ruta, exist_ok=True)
+            self._archivos = [open(os.path.join(self.ruta, f"{nombre}.bin"), "wb")
+                              for nombre, _, _ in COLUMNAS]
+        for archivo, columna in zip(self._archivos, self.columnas):
+            columna.tofile(archivo)
+
+    def _esquema(self, pa):
+        return pa.schema(
+            [(nombre, pa.from_numpy_dtype(np.dtype(dtype))) for nombre, _, dtype in COLUMNAS],
+            metadata={"traza": json.dumps(self.metadatos)},
+        )
+
+    def _bajar_arrow(self):
+        pa = _pyarrow()
+        esquema = self._esquema(pa)
+        lote = pa.RecordBatch.from_arrays(
+            [pa.array(np.frombuffer(columna, dtype=dtype))
+             for columna, (_, _, dtype) in zip(self.columnas, COLUMNAS)],
+            schema=esquema,
+        )
+        if self._escritor is None:
+            directorio = os.path.dirname(self.ruta)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+            if self.formato == "parquet":
+                import pyarrow.parquet as pq
+                self._escritor = pq.ParquetWriter(self.ruta, esquema)
+            else:
+                self._escritor = pa.ipc.new_file(self.ruta, esquema)
+        self._escritor.write_batch(lote)
+
+    def cerrar(self):
+        """Baja los niños que siguen en el sistema y cierra el archivo."""
+        for numero in sorted(self.en_curso):
+            self._terminar(numero)
+        self._bajar()
+        if self.formato == "columnas":
+            if self._archivos is None:  # corrida sin niños
+                self._bajar_columnas()
+            for archivo in self._archivos:
+                archivo.close()
+            with open(os.path.join(self.ruta, "traza.json"), "w") as f:
+                json.dump(dict(self.metadatos, filas=self.filas,
+                               columnas=[[n, d] for n, _, d in COLUMNAS]), f, indent=1)
+        else:
+            if self._escritor is None:  # corrida sin niños: archivo vacio
+                self._bajar_arrow()
+            self._escritor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+# -- Lectura --
+
+class Traza:
+    """
+    Columnas de una traza como arrays de NumPy (mapeados a memoria si el
+    formato lo permite) mas sus metadatos.
+    """
+
+    def __init__(self, columnas, metadatos):
+        self.columnas = columnas
+        self.metadatos = metadatos
+
+    def __getitem__(self, nombre):
+        return self.columnas[nombre]
+
+    def __len__(self):
+        return len(self.columnas["nino"])
+
+    def categoria(self, columna):
+        """Nombres de las categorias de area, voluntario o match."""
+        return self.metadatos[CATEGORICAS[columna]]
+
+    def a_dataframe(self):
+        """DataFrame de pandas con las categorias decodificadas (copia)."""
+        import pandas as pd
+
+        df = pd.DataFrame({nombre: self.columnas[nombre] for nombre, _, _ in COLUMNAS})
+        for columna in CATEGORICAS:
+            df[columna] = pd.Categorical.from_codes(df[columna], self.categoria(columna))
+        df["abandono"] = df["abandono"].astype(bool)
+        return df
+
+
+def cargar_traza(ruta):
+    """Lee una traza escrita por RegistroNinos sin copiar las columnas."""
+    formato = formato_de(ruta)
+    if formato == "columnas":
+        with open(os.path.join(ruta, "traza.json")) as f:
+            metadatos = json.load(f)
+        filas = metadatos["filas"]
+        columnas = {}
+        for nombre, dtype in metadatos["columnas"]:
+            archivo = os.path.join(ruta, f"{nombre}.bin")
+            if filas:
+                columnas[nombre] = np.memmap(archivo, dtype=dtype, mode="r", shape=(filas,))
+            else:
+                columnas[nombre] = np.empty(0, dtype=dtype)
+        return Traza(columnas, metadatos)
+
+    pa = _pyarrow()
+    if formato == "parquet":
+        import pyarrow.parquet as pq
+        tabla = pq.read_table(ruta, memory_map=True)
+    else:
+        tabla = pa.ipc.open_file(pa.memory_map(ruta)).read_all()
+    metadatos = json.loads(tabla.schema.metadata[b"traza"])
+    # Con un solo bloque to_numpy no copia; con varios los junta
+    columnas = {nombre: tabla.column(nombre).to_numpy() for nombre, _, _ in COLUMNAS}
+    return Traza(columnas, metadatos)
+
+
+if __name__ == "__main__":
+    import simulacion_apoyo_escolar as sim
+
+    escenarios = {
+        "base": sim.ESCENARIO_BASE, "a": sim.ESCENARIO_A, "b": sim.ESCENARIO_B,
+        "c": sim.ESCENARIO_C, "d": sim.ESCENARIO_D, "estricto": sim.ESCENARIO_BASE_ESTRICTO,
+    }
+    parser = argparse.ArgumentParser(description="Corre un escenario y guarda su traza por niño")
+    parser.add_argument("--escenario", type=str.lower, choices=list(escenarios), default="base")
+    parser.add_argument("--tiempo", type=float, default=None, help="semanas a simular")
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("--motor", choices=["simpy", "rapido"], default="rapido")
+    parser.add_argument("--salida", required=True,
+                        help="archivo .parquet/.arrow o directorio de columnas")
+    args = parser.parse_args()
+
+    config = dict(escenarios[args.escenario], motor=args.motor)
+    if args.tiempo is not None:
+        config["tiempo_simulacion"] = args.tiempo
+    if args.semilla is not None:
+        config["semilla"] = args.semilla
+
+    with RegistroNinos(args.salida, config) as registro:
+        sim.correr_simulacion(config, silencioso=True, traza=registro)
+    traza = cargar_traza(args.salida)
+    atendidos = ~np.isnan(traza["fin_intervencion"])
+    print(f"  Traza: {args.salida} ({len(traza)} niños)")
+    print(f"  Atendidos: {int(atendidos.sum())} | "
+          f"Se fueron: {int(traza['abandono'].sum())} | "
+          f"En el sistema al cierre: {int((~atendidos & (traza['abandono'] == 0)).sum())}")